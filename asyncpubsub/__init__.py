@@ -1,22 +1,30 @@
 # -*- coding : utf-8 -*-
 
+import logging
+
+from asyncpubsub.core import ClosedError
 from asyncpubsub.core.hub import get_hub, Hub, RegistrationError, ChannelRegistrable, EType
 from asyncpubsub.core.publisher import Publisher
 from asyncpubsub.core.subscriber import Subscriber
+from asyncpubsub.core.executor import ExecutorKind
+from asyncpubsub.core.queue import OverflowPolicy, QueueOverflowError, Priority
+from asyncpubsub.core.codec import Codec, CodecRegistry, PickleCodec, BytesCodec, StructCodec
+from asyncpubsub.core.shm import SharedMemorySender, SharedMemoryReceiver
+from asyncpubsub.core.trace import Tracer, TraceEvent
+from asyncpubsub.core.operators import Operator, Throttle, Debounce, Sample, DistinctUntilChanged
+from asyncpubsub.core.filters import Match
+from asyncpubsub.core.rpc import Requester, Responder, NoResponderError, RoundRobin, LeastLoaded
+from asyncpubsub.core.shard import Shard, ShardGroup
+from asyncpubsub.core.durable import SegmentLog, FsyncPolicy
 
-_SHOW_LOG = True
-
-if _SHOW_LOG:
-    import logging
-    import sys
-    root = logging.getLogger()
-    root.setLevel(logging.DEBUG)
-
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setLevel(logging.DEBUG)
-    formatter = logging.Formatter('[%(asctime)s] [%(name)s] [%(levelname)s]: %(message)s')
-    handler.setFormatter(formatter)
-    root.addHandler(handler)
+# The package does not configure logging, applications opt in by configuring
+# the "asyncpubsub" logger or by setting a trace sink, see Hub.set_trace_sink
+logging.getLogger("asyncpubsub").addHandler(logging.NullHandler())
 
 
-__all__ = ["RegistrationError", "ChannelRegistrable", "get_hub", "Hub", "EType", "Publisher", "Subscriber"]
+__all__ = ["RegistrationError", "ChannelRegistrable", "get_hub", "Hub", "EType", "Publisher", "Subscriber",
+           "ExecutorKind", "OverflowPolicy", "QueueOverflowError", "Priority", "SharedMemorySender",
+           "SharedMemoryReceiver", "Codec", "CodecRegistry", "PickleCodec", "BytesCodec", "StructCodec",
+           "Tracer", "TraceEvent", "Operator", "Throttle", "Debounce", "Sample", "DistinctUntilChanged",
+           "Match", "Requester", "Responder", "NoResponderError", "RoundRobin", "LeastLoaded",
+           "Shard", "ShardGroup", "ClosedError", "SegmentLog", "FsyncPolicy"]
@@ -0,0 +1,7 @@
+# -*- coding : utf-8 -*-
+
+import sys
+
+from asyncpubsub.bench.harness import main
+
+sys.exit(main())
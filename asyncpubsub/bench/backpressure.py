@@ -0,0 +1,82 @@
+# -*- coding : utf-8 -*-
+
+import argparse
+import asyncio
+import logging
+import time
+
+from asyncpubsub import Publisher, Subscriber, OverflowPolicy, get_hub
+
+"""
+Benchmark for the behaviour of bounded subscriber queues, messages are
+published in bursts larger than the queue of the subscriber for every
+overflow policy.
+
+usage: python -m asyncpubsub.bench.backpressure [--messages N] [--queue-size N]
+"""
+
+
+_ENTITIES = []
+
+
+async def bench_backpressure(policy, n_messages, queue_size):
+    """
+    Runs the bounded queue benchmark for a given overflow policy
+
+    :param OverflowPolicy policy: overflow policy of the subscriber
+    :param int n_messages: number of messages to be published
+    :param int queue_size: size of the queue of the subscriber, messages are
+                           published in bursts of twice the size
+    :rtype: tuple
+    :returns: published messages per second until the subscriber is idle
+              and the number of messages which were not delivered
+    """
+    get_hub().reset()
+    received = 0
+
+    def callback(msg):
+        nonlocal received
+        received += 1
+
+    publisher = Publisher("bench-channel")
+    key = (lambda msg: msg % 16) if policy is OverflowPolicy.CONFLATE else None
+    subscriber = Subscriber("bench-channel", callback, queue_size=queue_size, overflow=policy, key=key)
+    await asyncio.sleep(0)
+
+    burst = 2 * queue_size
+    messages = list(range(n_messages))
+    start = time.perf_counter()
+    for i in range(0, n_messages, burst):
+        await publisher.publish_many(messages[i:i + burst])
+        await asyncio.sleep(0)
+    # wait until the publisher and the subscriber are idle, with
+    # OverflowPolicy.BLOCK every message is delivered eventually
+    while (publisher.get_stats()["queue_depth"] or subscriber.get_stats()["queue_depth"]
+           or (policy is OverflowPolicy.BLOCK and received < n_messages)):
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+
+    get_hub().reset()
+    # keep the entities alive, their processor tasks are cancelled once the loop is closed
+    _ENTITIES.extend([publisher, subscriber])
+    return n_messages / elapsed, n_messages - received
+
+
+async def _main(args):
+    for policy in OverflowPolicy:
+        rate, lost = await bench_backpressure(policy, args.messages, args.queue_size)
+        print(f"{policy.value:>12}: {rate:>12,.0f} messages/s {lost:>10,} not delivered")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="bounded subscriber queue benchmark")
+    parser.add_argument("--messages", type=int, default=100_000)
+    parser.add_argument("--queue-size", type=int, default=100)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.ERROR)
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
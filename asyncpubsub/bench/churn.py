@@ -0,0 +1,80 @@
+# -*- coding : utf-8 -*-
+
+import argparse
+import logging
+import os
+import time
+
+from asyncpubsub import ChannelRegistrable, EType, Hub
+
+"""
+Benchmark for registration churn, i.e. subscribers repeatedly registered and
+de-registered on a channel with a publisher, under different logging setups;
+
+    debug-logging   the root logger at DEBUG with a stream handler, as
+                    configured on import by earlier versions of the package
+    quiet           no logging configuration, the default
+    trace-sink      a trace sink collecting the structured hub events
+
+usage: python -m asyncpubsub.bench.churn [--subscribers N] [--rounds N]
+"""
+
+
+def _configure(mode, hub):
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    if mode == "debug-logging":
+        handler = logging.StreamHandler(open(os.devnull, "w"))
+        handler.setFormatter(logging.Formatter('[%(asctime)s] [%(name)s] [%(levelname)s]: %(message)s'))
+        root.addHandler(handler)
+        root.setLevel(logging.DEBUG)
+    else:
+        root.setLevel(logging.ERROR)
+
+    if mode == "trace-sink":
+        events = []
+        hub.set_trace_sink(events.append)
+
+
+def bench_churn(mode, n_subscribers, n_rounds):
+    """
+    Runs the churn benchmark for a given logging mode
+
+    :param str mode: one of "debug-logging", "quiet", "trace-sink"
+    :param int n_subscribers: number of subscribers registered per round
+    :param int n_rounds: number of rounds
+    :rtype: float
+    :returns: microseconds per registration and de-registration
+    """
+    hub = Hub()
+    hub.register(ChannelRegistrable("bench-channel", EType.PUBLISHER))
+    subscribers = [ChannelRegistrable("bench-channel", EType.SUBSCRIBER) for _ in range(n_subscribers)]
+    _configure(mode, hub)
+
+    start = time.perf_counter()
+    for _ in range(n_rounds):
+        for subscriber in subscribers:
+            hub.register(subscriber)
+        for subscriber in subscribers:
+            hub.deregister(subscriber)
+    elapsed = time.perf_counter() - start
+
+    _configure("quiet", hub)
+    return elapsed / (n_subscribers * n_rounds) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="subscriber churn benchmark")
+    parser.add_argument("--subscribers", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    for mode in ("debug-logging", "quiet", "trace-sink"):
+        per_subscriber = bench_churn(mode, args.subscribers, args.rounds)
+        print(f"{mode:>14}: {per_subscriber:>8.2f} us per register/deregister")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# -*- coding : utf-8 -*-
+
+import argparse
+import pickle
+import time
+
+from asyncpubsub.core.codec import CodecRegistry, PickleCodec, BytesCodec, StructCodec
+
+"""
+Benchmark for the encode/decode throughput of the codecs at different
+payload sizes. Encoding measures the creation of the framed buffer list,
+i.e. without the copy into a socket or a shared memory segment.
+
+usage: python -m asyncpubsub.bench.codec [--duration SECONDS]
+"""
+
+SIZES = {"64B": 64, "4KB": 4 * 1024, "1MB": 1024 * 1024}
+
+
+def _cases(size):
+    """
+    Returns the benchmarked (name, codec, message) cases for a payload size
+    """
+    n_doubles = size // 8
+    return [
+        ("pickle", PickleCodec(), {"payload": bytes(size)}),
+        ("pickle-oob", PickleCodec(), {"payload": pickle.PickleBuffer(bytearray(size))}),
+        ("bytes", BytesCodec(), bytes(size)),
+        ("bytes-nocopy", BytesCodec(copy=False), bytes(size)),
+        ("struct", StructCodec(f"!{n_doubles}d"), tuple(float(i) for i in range(n_doubles))),
+    ]
+
+
+def bench_codec(codec, message, size, duration):
+    """
+    Runs the encode/decode benchmark for a codec
+
+    :param Codec codec: codec to be benchmarked
+    :param Any message: message to be encoded
+    :param int size: payload size of the message in bytes
+    :param float duration: minimum duration of each measurement in seconds
+    :rtype: tuple
+    :returns: encode and decode throughput in MB/s
+    """
+    registry = CodecRegistry()
+    registry.register("bench-channel", codec)
+
+    n, start = 0, time.perf_counter()
+    while time.perf_counter() - start < duration:
+        for _ in range(16):
+            registry.encode("bench-channel", message)
+        n += 16
+    encode_rate = n * size / (time.perf_counter() - start) / 1e6
+
+    data = memoryview(b"".join(registry.encode("bench-channel", message)))
+    n, start = 0, time.perf_counter()
+    while time.perf_counter() - start < duration:
+        for _ in range(16):
+            registry.decode("bench-channel", data)
+        n += 16
+    decode_rate = n * size / (time.perf_counter() - start) / 1e6
+    return encode_rate, decode_rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="codec throughput benchmark")
+    parser.add_argument("--duration", type=float, default=0.2, help="duration of each measurement")
+    args = parser.parse_args()
+
+    print(f"{'codec':>12} {'size':>5} {'encode MB/s':>14} {'decode MB/s':>14}")
+    for label, size in SIZES.items():
+        for name, codec, message in _cases(size):
+            encode_rate, decode_rate = bench_codec(codec, message, size, args.duration)
+            print(f"{name:>12} {label:>5} {encode_rate:>14,.1f} {decode_rate:>14,.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# -*- coding : utf-8 -*-
+
+import argparse
+import asyncio
+import logging
+import tempfile
+import time
+
+from asyncpubsub import Publisher, Subscriber, SegmentLog, FsyncPolicy, get_hub
+
+"""
+Benchmark for the throughput of a durable channel under every fsync policy,
+compared against a channel without a log, and for the rate at which a
+subscriber replays the log from its start. The messages are published in
+batches, with FsyncPolicy.BATCH every batch is flushed with a single fsync.
+The results depend on the file system of the directory, temporary
+directories are often memory backed.
+
+usage: python -m asyncpubsub.bench.durable [--messages N] [--batch N] [--size N] [--directory DIR]
+"""
+
+
+_ENTITIES = []
+
+
+async def bench_durable(policy, n_messages, batch_size, message_size, directory=None):
+    """
+    Runs the durable channel benchmark for a given fsync policy
+
+    :param Optional[FsyncPolicy] policy: fsync policy of the log, no log if None
+    :param int n_messages: number of messages to be published
+    :param int batch_size: number of messages per publish_many call
+    :param int message_size: size of the bytes messages
+    :param Optional[str] directory: directory the temporary logs are created
+                                    in, the default temporary directory if None
+    :rtype: tuple
+    :returns: delivered messages per second, messages per second replayed
+              from the log or None without a log
+    """
+    get_hub().reset()
+    with tempfile.TemporaryDirectory(dir=directory) as log_directory:
+        log = SegmentLog(log_directory, fsync=policy) if policy is not None else None
+        publisher = Publisher("bench-channel", durable=log)
+        done = asyncio.get_running_loop().create_future()
+        received = 0
+
+        def batch_callback(msgs):
+            nonlocal received
+            received += len(msgs)
+            if received == n_messages:
+                done.set_result(None)
+
+        subscriber = Subscriber("bench-channel", batch_callback=batch_callback)
+        message = bytes(message_size)
+        batch = [message] * batch_size
+
+        start = time.perf_counter()
+        for _ in range(n_messages // batch_size):
+            await publisher.publish_many(batch)
+            await asyncio.sleep(0)
+        await done
+        rate = n_messages / (time.perf_counter() - start)
+
+        replay_rate = None
+        if log is not None:
+            replayed = asyncio.get_running_loop().create_future()
+            count = 0
+
+            def replay_callback(msgs):
+                nonlocal count
+                count += len(msgs)
+                if count == n_messages:
+                    replayed.set_result(None)
+
+            start = time.perf_counter()
+            replayer = Subscriber("bench-channel", batch_callback=replay_callback, from_offset=0)
+            await replayed
+            replay_rate = n_messages / (time.perf_counter() - start)
+            _ENTITIES.append(replayer)
+
+        await publisher.aclose()
+    get_hub().reset()
+    _ENTITIES.append(subscriber)
+    return rate, replay_rate
+
+
+async def _main(args):
+    n_messages = args.messages // args.batch * args.batch
+    for policy in (None, *FsyncPolicy):
+        rate, replay_rate = await bench_durable(policy, n_messages, args.batch, args.size, args.directory)
+        name = policy.value if policy is not None else "no log"
+        line = f"{name:>10}: {rate:>12,.0f} messages/s"
+        if replay_rate is not None:
+            line += f", replayed {replay_rate:>12,.0f} messages/s"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="durable channel throughput benchmark")
+    parser.add_argument("--messages", type=int, default=100_000)
+    parser.add_argument("--batch", type=int, default=100)
+    parser.add_argument("--size", type=int, default=128, help="size of the messages in bytes")
+    parser.add_argument("--directory", help="directory of the temporary logs")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.ERROR)
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
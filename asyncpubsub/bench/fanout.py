@@ -0,0 +1,82 @@
+# -*- coding : utf-8 -*-
+
+import argparse
+import asyncio
+import logging
+import time
+
+from asyncpubsub import Publisher, Subscriber, get_hub
+
+"""
+Benchmark for the fan-out of a single channel to a growing number of
+subscribers. The number of messages is scaled down with the number of
+subscribers so that every run performs a similar number of deliveries.
+
+usage: python -m asyncpubsub.bench.fanout [--deliveries N] [--max-subscribers N]
+"""
+
+
+_ENTITIES = []
+
+
+async def bench_fanout(n_subscribers, n_deliveries, batch_size=100):
+    """
+    Runs the fan-out benchmark for a given number of subscribers
+
+    :param int n_subscribers: number of subscribers on the channel
+    :param int n_deliveries: approximate number of deliveries
+    :param int batch_size: number of messages per publish_many call
+    :rtype: float
+    :returns: delivered messages per second
+    """
+    get_hub().reset()
+    n_messages = max(1, n_deliveries // n_subscribers)
+    expected = n_messages * n_subscribers
+    received = 0
+    done = asyncio.get_running_loop().create_future()
+
+    def callback(msg):
+        nonlocal received
+        received += 1
+        if received == expected:
+            done.set_result(None)
+
+    publisher = Publisher("bench-channel")
+    subscribers = [Subscriber("bench-channel", callback) for _ in range(n_subscribers)]
+    # let the processor tasks of the subscribers start before measuring
+    await asyncio.sleep(0)
+
+    messages = list(range(n_messages))
+    start = time.perf_counter()
+    for i in range(0, n_messages, batch_size):
+        await publisher.publish_many(messages[i:i + batch_size])
+        await asyncio.sleep(0)
+    await done
+    elapsed = time.perf_counter() - start
+
+    get_hub().reset()
+    # keep the entities alive, their processor tasks are cancelled once the loop is closed
+    _ENTITIES.extend([publisher, *subscribers])
+    return expected / elapsed
+
+
+async def _main(args):
+    n_subscribers = 1
+    while n_subscribers <= args.max_subscribers:
+        rate = await bench_fanout(n_subscribers, args.deliveries)
+        print(f"{n_subscribers:>7} subscribers: {rate:>12,.0f} deliveries/s")
+        n_subscribers *= 10
+
+
+def main():
+    parser = argparse.ArgumentParser(description="single channel fan-out benchmark")
+    parser.add_argument("--deliveries", type=int, default=200_000)
+    parser.add_argument("--max-subscribers", type=int, default=10_000)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.ERROR)
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# -*- coding : utf-8 -*-
+
+import argparse
+import asyncio
+import logging
+import time
+
+from asyncpubsub import Publisher, Subscriber, Match, get_hub
+
+"""
+Benchmark for routing the messages of a channel to subscribers interested in
+a single account each, comparing filtering in the callbacks, predicate
+filters and indexed Match filters.
+
+usage: python -m asyncpubsub.bench.filters [--messages N] [--subscribers N]
+"""
+
+
+_ENTITIES = []
+
+
+async def bench_filters(mode, n_messages, n_subscribers):
+    """
+    Runs the routing benchmark for a given mode
+
+    :param str mode: one of "callback", "predicate", "match"
+    :param int n_messages: number of messages to be published
+    :param int n_subscribers: number of subscribers, one per account
+    :rtype: float
+    :returns: published messages per second
+    """
+    get_hub().reset()
+    publisher = Publisher("bench-channel")
+    received = 0
+    done = asyncio.get_running_loop().create_future()
+
+    def make_subscriber(account):
+        def callback(fill):
+            nonlocal received
+            if mode == "callback" and fill["account"] != account:
+                return
+            received += 1
+            if received == n_messages:
+                done.set_result(None)
+
+        if mode == "predicate":
+            return Subscriber("bench-channel", callback, where=lambda fill: fill["account"] == account)
+        if mode == "match":
+            return Subscriber("bench-channel", callback, where=Match("account", account))
+        return Subscriber("bench-channel", callback)
+
+    subscribers = [make_subscriber(account) for account in range(n_subscribers)]
+    fills = [{"account": i % n_subscribers, "qty": i} for i in range(n_messages)]
+
+    start = time.perf_counter()
+    publisher.publish_many_nowait(fills)
+    await done
+    elapsed = time.perf_counter() - start
+
+    get_hub().reset()
+    # keep the entities alive, their processor tasks are cancelled once the loop is closed
+    _ENTITIES.extend([publisher, *subscribers])
+    return n_messages / elapsed
+
+
+async def _main(args):
+    for mode in ("callback", "predicate", "match"):
+        rate = await bench_filters(mode, args.messages, args.subscribers)
+        print(f"{mode:>9}: {rate:>12,.0f} messages/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="content filter routing benchmark")
+    parser.add_argument("--messages", type=int, default=100_000)
+    parser.add_argument("--subscribers", type=int, default=50)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.ERROR)
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
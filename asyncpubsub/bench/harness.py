@@ -0,0 +1,257 @@
+# -*- coding : utf-8 -*-
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import platform
+import sys
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from asyncpubsub import OverflowPolicy, FsyncPolicy
+from asyncpubsub.bench.backpressure import bench_backpressure
+from asyncpubsub.bench.churn import bench_churn
+from asyncpubsub.bench.durable import bench_durable
+from asyncpubsub.bench.fanout import bench_fanout
+from asyncpubsub.bench.latency import bench_latency
+from asyncpubsub.bench.memory import bench_memory, bench_dropped
+from asyncpubsub.bench.registration import bench_registration
+from asyncpubsub.bench.throughput import bench_throughput
+
+"""
+Harness running the benchmark suite and writing the results as JSON, which
+can be compared against the results of an earlier run. Every metric records
+whether higher or lower values are better, metrics which changed for the
+worse by more than the threshold are reported as regressions and make the
+harness exit with status 1.
+
+usage: python -m asyncpubsub.bench [--quick] [--only SUITE ...] [--output FILE]
+                                   [--compare BASELINE] [--input FILE] [--threshold F]
+
+    python -m asyncpubsub.bench --output baseline.json
+    python -m asyncpubsub.bench --compare baseline.json --output current.json
+    python -m asyncpubsub.bench --input current.json --compare baseline.json
+"""
+
+FORMAT_VERSION = 1
+
+HIGHER = "higher"
+LOWER = "lower"
+
+Metric = namedtuple('Metric', 'value unit better')
+
+
+def _scaled(n, scale):
+    return max(1, int(n * scale))
+
+
+async def _throughput(scale):
+    metrics = {}
+    for mode in ("per-message", "publish-many", "batch-callback", "ring"):
+        rate = await bench_throughput(mode, _scaled(100_000, scale), 1, 100)
+        metrics[f"throughput.{mode}"] = Metric(rate, "deliveries/s", HIGHER)
+    return metrics
+
+
+async def _fanout(scale):
+    metrics = {}
+    max_subscribers = 10_000 if scale >= 1 else 1000
+    n_subscribers = 1
+    while n_subscribers <= max_subscribers:
+        rate = await bench_fanout(n_subscribers, _scaled(200_000, scale))
+        metrics[f"fanout.{n_subscribers}"] = Metric(rate, "deliveries/s", HIGHER)
+        n_subscribers *= 10
+    return metrics
+
+
+async def _latency(scale):
+    metrics = {}
+    for mode in ("queued", "eager"):
+        p50, p99 = await bench_latency(mode, _scaled(20_000, scale), 1)
+        metrics[f"latency.{mode}.p50"] = Metric(p50, "us", LOWER)
+        metrics[f"latency.{mode}.p99"] = Metric(p99, "us", LOWER)
+    return metrics
+
+
+async def _churn(scale):
+    metrics = {"churn.register_deregister": Metric(bench_churn("quiet", 1000, _scaled(20, scale)), "us", LOWER)}
+    result = bench_registration(_scaled(100_000, scale))
+    for name in ("register_us", "deregister_us", "register_many_us", "deregister_many_us"):
+        metrics[f"churn.{name[:-3]}"] = Metric(result[name], "us", LOWER)
+    return metrics
+
+
+async def _backpressure(scale):
+    metrics = {}
+    for policy in OverflowPolicy:
+        rate, lost = await bench_backpressure(policy, _scaled(100_000, scale), 100)
+        metrics[f"backpressure.{policy.value}"] = Metric(rate, "messages/s", HIGHER)
+        # the number of lost messages depends on scheduling, it is reported only
+        metrics[f"backpressure.{policy.value}.lost"] = Metric(lost, "messages", None)
+    return metrics
+
+
+async def _memory(scale):
+    metrics = {"memory.subscriber": Metric(await bench_memory(_scaled(10_000, scale)), "bytes", LOWER)}
+    lifecycle_us, retained = await bench_dropped(_scaled(1_000_000, scale))
+    metrics["memory.dropped.lifecycle"] = Metric(lifecycle_us, "us", LOWER)
+    metrics["memory.dropped.retained"] = Metric(retained, "objects", LOWER)
+    return metrics
+
+
+async def _durable(scale):
+    metrics = {}
+    for policy in FsyncPolicy:
+        rate, replay_rate = await bench_durable(policy, _scaled(100, scale) * 100, 100, 128)
+        metrics[f"durable.{policy.value}"] = Metric(rate, "messages/s", HIGHER)
+        metrics[f"durable.{policy.value}.replay"] = Metric(replay_rate, "messages/s", HIGHER)
+    return metrics
+
+
+SUITES = {"throughput": _throughput,
+          "fanout": _fanout,
+          "latency": _latency,
+          "churn": _churn,
+          "backpressure": _backpressure,
+          "memory": _memory,
+          "durable": _durable}
+
+
+async def run_suites(names, scale=1.0, log=None):
+    """
+    Runs the given suites of the benchmark
+
+    :param Iterable[str] names: names of the suites, see SUITES
+    :param float scale: factor applied to the number of messages and
+                        entities of every benchmark default=1.0
+    :param Optional[callable] log: callable invoked with a line of text for
+                                   every measured metric
+    :rtype: dict
+    :returns: metrics keyed by name
+    """
+    metrics = {}
+    for name in names:
+        for metric_name, metric in (await SUITES[name](scale)).items():
+            metrics[metric_name] = metric
+            if log is not None:
+                log(f"{metric_name:<40} {metric.value:>16,.2f} {metric.unit}")
+    return metrics
+
+
+def to_document(metrics, quick=False):
+    """
+    Returns the JSON serializable results of a run
+
+    :param dict metrics: metrics keyed by name
+    :param bool quick: if the run used the reduced sizes
+    :rtype: dict
+    """
+    return {"version": FORMAT_VERSION,
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": quick,
+            "metrics": {name: metric._asdict() for name, metric in metrics.items()}}
+
+
+Comparison = namedtuple('Comparison', 'name baseline current change status')
+
+
+def compare(baseline, current, threshold=0.1):
+    """
+    Compares the metrics of two runs
+
+    :param dict baseline: document of the earlier run, see `to_document`
+    :param dict current: document of the current run
+    :param float threshold: relative change for the worse which is reported
+                            as a regression default=0.1
+    :rtype: list of Comparison, status is one of "regression", "improvement",
+            "ok", "info", "new" and "missing"
+    """
+    baseline_metrics = baseline["metrics"]
+    current_metrics = current["metrics"]
+    comparisons = []
+
+    for name in dict.fromkeys([*baseline_metrics, *current_metrics]):
+        old = baseline_metrics.get(name)
+        new = current_metrics.get(name)
+        if old is None:
+            comparisons.append(Comparison(name, None, new["value"], None, "new"))
+            continue
+        if new is None:
+            comparisons.append(Comparison(name, old["value"], None, None, "missing"))
+            continue
+
+        if old["value"]:
+            change = (new["value"] - old["value"]) / old["value"]
+        else:
+            # e.g. objects retained by a leak, any growth from zero is reported
+            change = math.copysign(math.inf, new["value"]) if new["value"] else 0.0
+        better = new.get("better")
+        if better is None:
+            status = "info"
+        else:
+            gain = change if better == HIGHER else -change
+            if gain < -threshold:
+                status = "regression"
+            elif gain > threshold:
+                status = "improvement"
+            else:
+                status = "ok"
+        comparisons.append(Comparison(name, old["value"], new["value"], change, status))
+    return comparisons
+
+
+def _format_value(value):
+    return f"{value:>16,.2f}" if value is not None else f"{'-':>16}"
+
+
+def _print_comparisons(comparisons):
+    print(f"{'metric':<40} {'baseline':>16} {'current':>16} {'change':>9}  status")
+    for c in comparisons:
+        change = f"{c.change:>+9.1%}" if c.change is not None else f"{'-':>9}"
+        print(f"{c.name:<40} {_format_value(c.baseline)} {_format_value(c.current)} {change}  {c.status}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m asyncpubsub.bench", description="asyncpubsub benchmark suite")
+    parser.add_argument("--quick", action="store_true", help="run with reduced sizes")
+    parser.add_argument("--only", nargs="+", choices=list(SUITES), help="suites to be run")
+    parser.add_argument("--output", help="file the JSON results are written to")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON results of an earlier run")
+    parser.add_argument("--input", help="JSON results used instead of running the suite")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="relative change reported as a regression default=0.1")
+    args = parser.parse_args(argv)
+
+    logging.getLogger().setLevel(logging.ERROR)
+
+    if args.input is not None:
+        with open(args.input) as f:
+            document = json.load(f)
+    else:
+        scale = 0.1 if args.quick else 1.0
+        metrics = asyncio.run(run_suites(args.only or list(SUITES), scale, log=print))
+        document = to_document(metrics, quick=args.quick)
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+
+    if args.compare is None:
+        return 0
+
+    with open(args.compare) as f:
+        baseline = json.load(f)
+    if baseline.get("quick") != document.get("quick"):
+        print("warning: comparing runs with different sizes", file=sys.stderr)
+
+    comparisons = compare(baseline, document, args.threshold)
+    _print_comparisons(comparisons)
+    regressions = [c for c in comparisons if c.status == "regression"]
+    if regressions:
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+        return 1
+    return 0
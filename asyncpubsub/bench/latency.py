@@ -0,0 +1,83 @@
+# -*- coding : utf-8 -*-
+
+import argparse
+import asyncio
+import logging
+import time
+
+from asyncpubsub import Publisher, Subscriber, get_hub
+
+"""
+Benchmark for the latency between a publish call and the invocation of a
+synchronous callback, comparing the queued delivery against eager publishers.
+
+usage: python -m asyncpubsub.bench.latency [--messages N] [--subscribers N]
+"""
+
+
+_ENTITIES = []
+
+
+def _percentile(samples, fraction):
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+async def bench_latency(mode, n_messages, n_subscribers):
+    """
+    Runs the latency benchmark for a given mode, messages are published one
+    at a time and the next message is only published once the previous one
+    was received by all the subscribers
+
+    :param str mode: one of "queued", "eager"
+    :param int n_messages: number of messages to be published
+    :param int n_subscribers: number of subscribers on the channel
+    :rtype: tuple
+    :returns: p50 and p99 latencies in microseconds
+    """
+    get_hub().reset()
+    publisher = Publisher("bench-channel", eager=mode == "eager")
+    latencies = []
+    received = 0
+    done = None
+
+    def callback(sent):
+        nonlocal received
+        latencies.append(time.perf_counter() - sent)
+        received += 1
+        if received == n_subscribers and done is not None:
+            done.set_result(None)
+
+    subscribers = [Subscriber("bench-channel", callback) for _ in range(n_subscribers)]
+    loop = asyncio.get_running_loop()
+    for _ in range(n_messages):
+        received = 0
+        done = loop.create_future()
+        publisher.publish_nowait(time.perf_counter())
+        if received < n_subscribers:
+            await done
+
+    get_hub().reset()
+    # keep the entities alive, their processor tasks are cancelled once the loop is closed
+    _ENTITIES.extend([publisher, *subscribers])
+    latencies.sort()
+    return _percentile(latencies, 0.5) * 1e6, _percentile(latencies, 0.99) * 1e6
+
+
+async def _main(args):
+    for mode in ("queued", "eager"):
+        p50, p99 = await bench_latency(mode, args.messages, args.subscribers)
+        print(f"{mode:>7}: p50 {p50:>8.1f} us    p99 {p99:>8.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="publish to callback latency benchmark")
+    parser.add_argument("--messages", type=int, default=20_000)
+    parser.add_argument("--subscribers", type=int, default=1)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.ERROR)
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# -*- coding : utf-8 -*-
+
+import argparse
+import asyncio
+import gc
+import logging
+import time
+import tracemalloc
+
+from asyncpubsub import Publisher, Subscriber, get_hub
+
+"""
+Benchmark for the memory allocated per subscriber, including its queue,
+its processor task and its registration with the hub, measured with
+tracemalloc. The churn mode creates and drops short-lived subscribers on a
+busy channel and reports the objects retained once they are collected,
+which are expected to be none.
+
+usage: python -m asyncpubsub.bench.memory [--subscribers N] [--churn N]
+"""
+
+
+_ENTITIES = []
+
+
+async def bench_memory(n_subscribers):
+    """
+    Runs the memory benchmark for a given number of subscribers
+
+    :param int n_subscribers: number of subscribers on the channel
+    :rtype: float
+    :returns: bytes allocated per subscriber
+    """
+    get_hub().reset()
+    publisher = Publisher("bench-channel")
+
+    def callback(msg):
+        pass
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        subscribers = [Subscriber("bench-channel", callback) for _ in range(n_subscribers)]
+        # the processor tasks of the subscribers wait for their first message
+        await asyncio.sleep(0)
+        allocated = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+    get_hub().reset()
+    # keep the entities alive, their processor tasks are cancelled once the loop is closed
+    _ENTITIES.extend([publisher, *subscribers])
+    return allocated / n_subscribers
+
+
+async def bench_dropped(n_subscribers, publish_every=100):
+    """
+    Runs the churn benchmark creating and dropping a given number of
+    subscribers, one at a time
+
+    :param int n_subscribers: number of subscribers created and dropped
+    :param int publish_every: number of subscribers created between two
+                              messages published on the channel default=100
+    :rtype: tuple
+    :returns: microseconds per subscriber lifecycle, number of objects
+              retained after the subscribers were dropped
+    """
+    get_hub().reset()
+    publisher = Publisher("bench-channel")
+
+    def callback(msg):
+        pass
+
+    # warm up the caches of the hub and the event loop
+    for _ in range(publish_every):
+        Subscriber("bench-channel", callback)
+    publisher.publish_nowait(None)
+    await asyncio.sleep(0.01)
+
+    gc.collect()
+    before = len(gc.get_objects())
+    start = time.perf_counter()
+    for i in range(n_subscribers):
+        Subscriber("bench-channel", callback)
+        if i % publish_every == 0:
+            publisher.publish_nowait(i)
+            await asyncio.sleep(0)
+    # the processor tasks of the last subscribers are cancelled on the next iterations
+    await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    retained = len(gc.get_objects()) - before
+
+    if len(get_hub().get_registered()) != 1:
+        raise RuntimeError("dropped subscribers are still registered")
+    publisher.close()
+    return elapsed / n_subscribers * 1e6, max(0, retained)
+
+
+async def _main(args):
+    per_subscriber = await bench_memory(args.subscribers)
+    print(f"{per_subscriber:>10,.0f} bytes per subscriber")
+    lifecycle_us, retained = await bench_dropped(args.churn)
+    print(f"{lifecycle_us:>10,.2f} us per dropped subscriber, {retained:,} objects retained")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="memory per subscriber benchmark")
+    parser.add_argument("--subscribers", type=int, default=10_000)
+    parser.add_argument("--churn", type=int, default=1_000_000, help="subscribers created and dropped")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.ERROR)
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
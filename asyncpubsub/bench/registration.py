@@ -0,0 +1,82 @@
+# -*- coding : utf-8 -*-
+
+import argparse
+import logging
+import time
+
+from asyncpubsub import ChannelRegistrable, EType, Hub
+
+"""
+Benchmark for Hub registration and de-registration. For each channel count a
+publisher and a subscriber are registered and de-registered, the reported
+timings are per registered object and should stay flat as the number of
+channels grows.
+
+usage: python -m asyncpubsub.bench.registration [--max-channels N]
+"""
+
+
+def _make_registrables(n_channels):
+    publishers = [ChannelRegistrable(f"channel-{i}", EType.PUBLISHER) for i in range(n_channels)]
+    subscribers = [ChannelRegistrable(f"channel-{i}", EType.SUBSCRIBER) for i in range(n_channels)]
+    return publishers, subscribers
+
+
+def bench_registration(n_channels):
+    """
+    Runs the registration benchmark for a given number of channels
+
+    :param int n_channels: number of channels to be registered
+    :rtype: dict
+    """
+    publishers, subscribers = _make_registrables(n_channels)
+    n_objects = 2 * n_channels
+    hub = Hub()
+
+    start = time.perf_counter()
+    for subscriber in subscribers:
+        hub.register(subscriber)
+    for publisher in publishers:
+        hub.register(publisher)
+    register_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for subscriber in subscribers:
+        hub.deregister(subscriber)
+    for publisher in publishers:
+        hub.deregister(publisher)
+    deregister_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    hub.register_many(subscribers + publishers)
+    register_many_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    hub.deregister_many(subscribers + publishers)
+    deregister_many_time = time.perf_counter() - start
+
+    return {"channels": n_channels,
+            "register_us": register_time / n_objects * 1e6,
+            "deregister_us": deregister_time / n_objects * 1e6,
+            "register_many_us": register_many_time / n_objects * 1e6,
+            "deregister_many_us": deregister_many_time / n_objects * 1e6}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hub registration benchmark")
+    parser.add_argument("--max-channels", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.ERROR)
+
+    print(f"{'channels':>10} {'register':>12} {'deregister':>12} {'reg_many':>12} {'dereg_many':>12}  (us/object)")
+    n_channels = 1000
+    while n_channels <= args.max_channels:
+        result = bench_registration(n_channels)
+        print(f"{result['channels']:>10} {result['register_us']:>12.3f} {result['deregister_us']:>12.3f} "
+              f"{result['register_many_us']:>12.3f} {result['deregister_many_us']:>12.3f}")
+        n_channels *= 10
+
+
+if __name__ == "__main__":
+    main()
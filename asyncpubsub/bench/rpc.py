@@ -0,0 +1,107 @@
+# -*- coding : utf-8 -*-
+
+import argparse
+import asyncio
+import logging
+import time
+
+from asyncpubsub import Publisher, Subscriber, Requester, Responder, get_hub
+
+"""
+Benchmark for request/reply round trips, comparing Requester/Responder
+against correlating replies by hand with a temporary reply channel per
+request.
+
+usage: python -m asyncpubsub.bench.rpc [--requests N] [--concurrency N]
+"""
+
+
+_ENTITIES = []
+
+
+async def bench_manual(n_requests, concurrency):
+    """
+    Runs requests with a publisher for the service channel, every request
+    creates a reply subscriber and a reply publisher
+
+    :param int n_requests: number of requests
+    :param int concurrency: number of requests in flight
+    :rtype: float
+    :returns: round trips per second
+    """
+    get_hub().reset()
+    requests = Publisher("bench-service")
+    ids = iter(range(n_requests))
+
+    def serve(request):
+        reply_to, payload = request
+        publisher = Publisher(reply_to)
+        publisher.publish_nowait(payload)
+        _ENTITIES.append(publisher)
+
+    responder = Subscriber("bench-service", serve)
+
+    async def request(payload):
+        reply_to = f"bench-reply-{next(ids)}"
+        future = asyncio.get_running_loop().create_future()
+        subscriber = Subscriber(reply_to, future.set_result)
+        await requests.publish((reply_to, payload))
+        try:
+            return await future
+        finally:
+            get_hub().deregister(subscriber)
+            _ENTITIES.append(subscriber)
+
+    elapsed = await _run(request, n_requests, concurrency)
+    get_hub().reset()
+    _ENTITIES.extend([requests, responder])
+    return n_requests / elapsed
+
+
+async def bench_rpc(n_requests, concurrency):
+    """
+    Runs requests with a Requester and a Responder
+
+    :param int n_requests: number of requests
+    :param int concurrency: number of requests in flight
+    :rtype: float
+    :returns: round trips per second
+    """
+    get_hub().reset()
+    responder = Responder("bench-service", lambda payload: payload)
+    requester = Requester("bench-service")
+    elapsed = await _run(requester.request, n_requests, concurrency)
+    get_hub().reset()
+    _ENTITIES.append(responder)
+    return n_requests / elapsed
+
+
+async def _run(request, n_requests, concurrency):
+    async def worker(n):
+        for i in range(n):
+            await request(i)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(n_requests // concurrency) for _ in range(concurrency)))
+    return time.perf_counter() - start
+
+
+async def _main(args):
+    n_requests = args.requests - args.requests % args.concurrency
+    for name, bench in (("manual", bench_manual), ("rpc", bench_rpc)):
+        rate = await bench(n_requests, args.concurrency)
+        print(f"{name:>6}: {rate:>10,.0f} round trips/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="request/reply round trip benchmark")
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=1)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.ERROR)
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# -*- coding : utf-8 -*-
+
+import argparse
+import asyncio
+import logging
+import threading
+import time
+
+from asyncpubsub import Publisher, Subscriber, get_hub
+
+"""
+Benchmark for publishing from producer threads comparing the batched
+hand-over of publish_threadsafe against scheduling every message on the event
+loop with loop.call_soon_threadsafe.
+
+usage: python -m asyncpubsub.bench.threadsafe [--messages N] [--threads N]
+"""
+
+
+_ENTITIES = []
+
+
+class _CountingPublisher(Publisher):
+
+    def __init__(self, channel_name):
+        super().__init__(channel_name)
+        self.wakeups = 0
+
+    def _handoff(self):
+        self.wakeups += 1
+        super()._handoff()
+
+
+class _Counter:
+
+    def __init__(self, expected):
+        self.expected = expected
+        self.received = 0
+        self.done = asyncio.get_event_loop().create_future()
+
+    def batch_callback(self, msgs):
+        self.received += len(msgs)
+        if self.received == self.expected:
+            self.done.set_result(None)
+
+
+async def bench_threadsafe(mode, n_messages, n_threads):
+    """
+    Runs the thread-safe publishing benchmark for a given mode
+
+    :param str mode: one of "call-soon", "handoff"
+    :param int n_messages: number of messages to be published by each thread
+    :param int n_threads: number of producer threads
+    :rtype: tuple
+    :returns: published messages per second and number of loop wakeups
+    """
+    get_hub().reset()
+    loop = asyncio.get_running_loop()
+    counter = _Counter(n_messages * n_threads)
+    publisher = _CountingPublisher("bench-channel")
+    subscriber = Subscriber("bench-channel", batch_callback=counter.batch_callback)
+
+    if mode == "handoff":
+        def produce():
+            publish = publisher.publish_threadsafe
+            for i in range(n_messages):
+                publish(i)
+    else:
+        def produce():
+            call_soon_threadsafe, publish = loop.call_soon_threadsafe, publisher.publish_nowait
+            for i in range(n_messages):
+                call_soon_threadsafe(publish, i)
+
+    threads = [threading.Thread(target=produce) for _ in range(n_threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    await counter.done
+    elapsed = time.perf_counter() - start
+    for thread in threads:
+        thread.join()
+
+    wakeups = publisher.wakeups if mode == "handoff" else n_messages * n_threads
+    get_hub().reset()
+    # keep the entities alive, their processor tasks are cancelled once the loop is closed
+    _ENTITIES.extend([publisher, subscriber])
+    return n_messages * n_threads / elapsed, wakeups
+
+
+async def _main(args):
+    for mode in ("call-soon", "handoff"):
+        rate, wakeups = await bench_threadsafe(mode, args.messages, args.threads)
+        print(f"{mode:>10}: {rate:>12,.0f} messages/s {wakeups:>10,} loop wakeups")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="thread-safe publishing benchmark")
+    parser.add_argument("--messages", type=int, default=100_000, help="messages per thread")
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.ERROR)
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# -*- coding : utf-8 -*-
+
+import argparse
+import asyncio
+import logging
+import time
+
+from asyncpubsub import Publisher, Subscriber, get_hub
+
+"""
+Benchmark for single channel throughput comparing per-message publishing
+and delivery against the batched publish_many / batch_callback path and the
+shared ring buffer delivery.
+
+usage: python -m asyncpubsub.bench.throughput [--messages N] [--subscribers N] [--batch N]
+"""
+
+
+_ENTITIES = []
+
+
+class _Counter:
+
+    def __init__(self, expected):
+        self.expected = expected
+        self.received = 0
+        self.done = asyncio.get_event_loop().create_future()
+
+    def callback(self, msg):
+        self.received += 1
+        if self.received == self.expected:
+            self.done.set_result(None)
+
+    def batch_callback(self, msgs):
+        self.received += len(msgs)
+        if self.received == self.expected:
+            self.done.set_result(None)
+
+
+async def bench_throughput(mode, n_messages, n_subscribers, batch_size):
+    """
+    Runs the throughput benchmark for a given mode
+
+    :param str mode: one of "per-message", "publish-many", "batch-callback", "ring"
+    :param int n_messages: number of messages to be published
+    :param int n_subscribers: number of subscribers on the channel
+    :param int batch_size: number of messages per publish_many call
+    :rtype: float
+    :returns: delivered messages per second
+    """
+    get_hub().reset()
+    counter = _Counter(n_messages * n_subscribers)
+    publisher = Publisher("bench-channel", ring_size=batch_size * 4 if mode == "ring" else 0)
+    if mode == "batch-callback":
+        subscribers = [Subscriber("bench-channel", batch_callback=counter.batch_callback)
+                       for _ in range(n_subscribers)]
+    else:
+        subscribers = [Subscriber("bench-channel", counter.callback) for _ in range(n_subscribers)]
+
+    messages = list(range(n_messages))
+    start = time.perf_counter()
+    if mode == "per-message":
+        for msg in messages:
+            await publisher.publish(msg)
+            # yield to the loop as an application publishing one message per event would
+            await asyncio.sleep(0)
+    else:
+        for i in range(0, n_messages, batch_size):
+            await publisher.publish_many(messages[i:i + batch_size])
+            await asyncio.sleep(0)
+    await counter.done
+    elapsed = time.perf_counter() - start
+
+    get_hub().reset()
+    # keep the entities alive, their processor tasks are cancelled once the loop is closed
+    _ENTITIES.extend([publisher, *subscribers])
+    return n_messages * n_subscribers / elapsed
+
+
+async def _main(args):
+    for mode in ("per-message", "publish-many", "batch-callback", "ring"):
+        rate = await bench_throughput(mode, args.messages, args.subscribers, args.batch)
+        print(f"{mode:>15}: {rate:>14,.0f} deliveries/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="single channel throughput benchmark")
+    parser.add_argument("--messages", type=int, default=100_000)
+    parser.add_argument("--subscribers", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=100)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.ERROR)
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+# -*- coding : utf-8 -*-
+
+from asyncpubsub.broker.protocol import DEFAULT_PORT
+from asyncpubsub.broker.server import Broker
+from asyncpubsub.broker.client import BrokerBridge
+
+__all__ = ["Broker", "BrokerBridge", "DEFAULT_PORT"]
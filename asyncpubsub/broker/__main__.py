@@ -0,0 +1,37 @@
+# -*- coding : utf-8 -*-
+
+import argparse
+import asyncio
+import logging
+
+from asyncpubsub.broker import Broker, DEFAULT_PORT
+
+"""
+usage: python -m asyncpubsub.broker [--host HOST] [--port PORT] [--unix PATH]
+"""
+
+
+async def _main(args):
+    broker = await Broker().start(host=args.host, port=args.port, path=args.unix)
+    try:
+        await broker.serve_forever()
+    finally:
+        await broker.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="asyncpubsub message broker")
+    parser.add_argument("--host", default=None, help="host to bind, binds all interfaces by default")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", default=None, help="path of a unix socket to listen on instead of TCP")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.INFO)
+    try:
+        asyncio.run(_main(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+# -*- coding : utf-8 -*-
+
+import asyncio
+import logging
+from functools import partial
+
+from asyncpubsub.core import EType
+from asyncpubsub.core.hub import get_hub
+from asyncpubsub.core.publisher import Publisher
+from asyncpubsub.core.subscriber import Subscriber
+from asyncpubsub.broker.protocol import (FrameProtocol, encode_frame, encode_publish, decode_publish,
+                                         DEFAULT_PORT, SUBSCRIBE, UNSUBSCRIBE, ANNOUNCE, RETRACT,
+                                         INTEREST, DISINTEREST, PUBLISH)
+
+
+class _BridgeConnection(FrameProtocol):
+
+    def __init__(self, bridge):
+        super().__init__()
+        self.bridge = bridge
+
+    def connection_lost(self, exc):
+        super().connection_lost(exc)
+        self.bridge._disconnected(exc)
+
+    def frame_received(self, frame_type, body):
+        self.bridge._frame_received(frame_type, body)
+
+
+class BrokerBridge:
+
+    """
+    Bridge sharing the channels of the local hub with other hubs through a
+    Broker. The bridge keeps the broker informed about the local publishers
+    and the channels wanted by the local subscribers;
+
+    - messages of a local Publisher are forwarded to the broker, but only
+      while a remote hub has subscribers for the channel
+    - messages of remote channels wanted by local subscribers are published
+      locally by proxy publishers created by the bridge
+
+    :param str host: host of the broker default="localhost"
+    :param int port: port of the broker
+    :param Optional[str] path: path of the unix socket of the broker, if given
+                               host and port are ignored
+
+    .. note:: A channel can only be published by one hub, a local Publisher
+              cannot be created for a channel which is currently published by
+              a proxy publisher of the bridge.
+
+    >>> bridge = BrokerBridge("localhost", 7878)
+    >>> await bridge.connect()
+    >>> subscriber = Subscriber("remote-channel", lambda msg: print(msg))
+    """
+
+    def __init__(self, host="localhost", port=DEFAULT_PORT, path=None):
+        self._host = host
+        self._port = port
+        self._path = path
+        self._hub = get_hub()
+        self._connection = None
+        self._sync_handle = None
+        self._announced = set()
+        self._subscribed = set()
+        self._proxies = {}
+        self._forwarders = {}
+        self._own = set()
+
+    @property
+    def logger(self):
+        return logging.getLogger('asyncpubsub.bridge')
+
+    @property
+    def connected(self):
+        return self._connection is not None and self._connection.connected
+
+    @property
+    def proxies(self):
+        """
+        Returns the proxy publishers of the remote channels by channel name
+
+        :rtype: dict
+        """
+        return dict(self._proxies)
+
+    async def connect(self):
+        """
+        Coroutine for connecting to the broker, the local channels are
+        synchronized with the broker right away
+        """
+        loop = asyncio.get_running_loop()
+        if self._path is not None:
+            _, self._connection = await loop.create_unix_connection(lambda: _BridgeConnection(self), self._path)
+        else:
+            _, self._connection = await loop.create_connection(lambda: _BridgeConnection(self),
+                                                               self._host, self._port)
+        self._hub.add_observer(self._on_hub_change)
+        self._sync()
+
+    async def close(self):
+        """
+        Coroutine for disconnecting from the broker, the proxy publishers are
+        removed from the hub
+        """
+        if self._connection is not None:
+            self._connection.close()
+        self._detach()
+
+    def _disconnected(self, exc):
+        if exc is not None:
+            self.logger.warning(f"connection to broker lost, {exc}")
+        self._detach()
+
+    def _detach(self):
+        self._hub.remove_observer(self._on_hub_change)
+        if self._sync_handle is not None:
+            self._sync_handle.cancel()
+            self._sync_handle = None
+        for entity in self._own:
+            self._hub.deregister(entity)
+        self._own.clear()
+        self._proxies.clear()
+        self._forwarders.clear()
+        self._announced.clear()
+        self._subscribed.clear()
+        self._connection = None
+
+    def _on_hub_change(self, channel_registrable, registered):
+        # changes are synchronized once per iteration of the event loop
+        if self._sync_handle is None:
+            self._sync_handle = asyncio.get_event_loop().call_soon(self._sync)
+
+    def _sync(self):
+        """
+        Internal method sending the difference between the channels of the
+        local hub and the state known by the broker
+        """
+        self._sync_handle = None
+        if not self.connected:
+            return
+
+        registered = [obj for obj in self._hub.get_registered() if obj not in self._own]
+        publishers = {obj.channel_name for obj in registered if obj.etype == EType.PUBLISHER}
+        subscriptions = {obj.channel_name for obj in registered
+                         if obj.etype == EType.SUBSCRIBER
+                         and (obj.is_pattern or obj.channel_name not in publishers)}
+
+        send = self._connection.send
+        for channel_name in publishers - self._announced:
+            send(encode_frame(ANNOUNCE, channel_name.encode()))
+        for channel_name in self._announced - publishers:
+            send(encode_frame(RETRACT, channel_name.encode()))
+            self._dispose(self._forwarders.pop(channel_name, None))
+        for pattern in subscriptions - self._subscribed:
+            send(encode_frame(SUBSCRIBE, pattern.encode()))
+        for pattern in self._subscribed - subscriptions:
+            send(encode_frame(UNSUBSCRIBE, pattern.encode()))
+        self._announced = publishers
+        self._subscribed = subscriptions
+
+        for channel_name, proxy in list(self._proxies.items()):
+            if not self._hub.get_subscribers(proxy):
+                self._dispose(self._proxies.pop(channel_name))
+
+    def _dispose(self, entity):
+        if entity is not None:
+            self._own.discard(entity)
+            self._hub.deregister(entity)
+
+    def _frame_received(self, frame_type, body):
+        if frame_type == PUBLISH:
+            channel_name, messages = decode_publish(self._hub.codecs, body)
+            self._publish_remote(channel_name, messages)
+            return
+
+        channel_name = body.decode()
+        if frame_type == INTEREST:
+            if channel_name in self._announced and channel_name not in self._forwarders:
+                forwarder = Subscriber(channel_name, batch_callback=partial(self._forward, channel_name))
+                self._own.add(forwarder)
+                self._forwarders[channel_name] = forwarder
+        elif frame_type == DISINTEREST:
+            self._dispose(self._forwarders.pop(channel_name, None))
+        else:
+            self.logger.warning(f"broker sent unknown frame type {frame_type}")
+
+    def _forward(self, channel_name, messages):
+        if self._connection is not None:
+            self._connection.send(encode_publish(self._hub.codecs, channel_name, messages))
+
+    def _publish_remote(self, channel_name, messages):
+        proxy = self._proxies.get(channel_name)
+        if proxy is None:
+            if self._hub.get_publisher(channel_name) is not None:
+                self.logger.debug(f"dropping remote messages of local channel {channel_name}")
+                return
+            proxy = Publisher(channel_name)
+            self._own.add(proxy)
+            self._proxies[channel_name] = proxy
+        proxy.publish_many_nowait(messages)
@@ -0,0 +1,178 @@
+# -*- coding : utf-8 -*-
+
+import asyncio
+import logging
+import struct
+
+"""
+Wire protocol shared by the broker and the bridge. Every frame is prefixed
+with its length;
+
+    frame:   [length: u32][type: u8][body]
+    body:    channel name (utf-8) for every type except PUBLISH
+    PUBLISH: [channel length: u16][channel][message]*
+
+Integers are big-endian. A PUBLISH frame carries a whole batch of messages,
+every message is framed by the codec registry, see asyncpubsub.core.codec.
+"""
+
+DEFAULT_PORT = 7878
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+# client -> broker
+SUBSCRIBE = 1
+UNSUBSCRIBE = 2
+ANNOUNCE = 3
+RETRACT = 4
+# broker -> client
+INTEREST = 5
+DISINTEREST = 6
+# both directions
+PUBLISH = 7
+
+_FRAME = struct.Struct("!IB")
+_CHANNEL = struct.Struct("!H")
+
+
+def encode_frame(frame_type, body):
+    """
+    Function returns the parts of a frame with a given body
+
+    :param int frame_type: type of the frame
+    :param bytes body: body of the frame
+    :rtype: list
+    """
+    return [_FRAME.pack(len(body) + 1, frame_type), body]
+
+
+def encode_publish(codecs, channel_name, messages):
+    """
+    Function returns the parts of a PUBLISH frame carrying a batch of messages.
+    The buffers of the encoded messages are not copied, they are part of the
+    returned list
+
+    :param CodecRegistry codecs: registry of the codecs
+    :param str channel_name: name of the channel
+    :param Iterable[Any] messages: messages to be sent
+    :rtype: list
+    """
+    channel = channel_name.encode()
+    parts = [None, _CHANNEL.pack(len(channel)), channel]
+    for message in messages:
+        parts.extend(codecs.encode(channel_name, message))
+    parts[0] = _FRAME.pack(sum(len(part) for part in parts[1:]) + 1, PUBLISH)
+    return parts
+
+
+def decode_channel(body):
+    """
+    Function returns the channel name of a PUBLISH frame body
+
+    :param bytes body: body of a PUBLISH frame
+    :rtype: str
+    """
+    length, = _CHANNEL.unpack_from(body)
+    return bytes(body[_CHANNEL.size:_CHANNEL.size + length]).decode()
+
+
+def decode_publish(codecs, body):
+    """
+    Function returns the channel name and the messages of a PUBLISH frame body
+
+    :param CodecRegistry codecs: registry of the codecs
+    :param bytes body: body of a PUBLISH frame
+    :rtype: tuple
+    """
+    length, = _CHANNEL.unpack_from(body)
+    offset = _CHANNEL.size + length
+    channel_name = bytes(body[_CHANNEL.size:offset]).decode()
+    messages = []
+    view = memoryview(body)
+    while offset < len(body):
+        message, offset = codecs.decode(channel_name, view, offset)
+        messages.append(message)
+    return channel_name, messages
+
+
+class FrameProtocol(asyncio.Protocol):
+
+    """
+    Protocol splitting the received data into frames and coalescing the
+    outgoing frames. Frames sent during one iteration of the event loop are
+    written to the transport with a single write.
+
+    Subclasses implement `frame_received`.
+    """
+
+    def __init__(self):
+        self._transport = None
+        self._buffer = bytearray()
+        self._pending = []
+        self._flush_handle = None
+
+    @property
+    def logger(self):
+        return logging.getLogger(f"asyncpubsub.broker.{self.__class__.__name__}")
+
+    @property
+    def connected(self):
+        return self._transport is not None and not self._transport.is_closing()
+
+    def connection_made(self, transport):
+        self._transport = transport
+
+    def connection_lost(self, exc):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._pending.clear()
+        self._transport = None
+
+    def data_received(self, data):
+        buffer = self._buffer
+        buffer += data
+        offset = 0
+        while len(buffer) - offset >= _FRAME.size:
+            length, frame_type = _FRAME.unpack_from(buffer, offset)
+            if length > MAX_FRAME_SIZE:
+                self.logger.error(f"frame of {length} bytes exceeds the limit, closing connection")
+                self._transport.close()
+                return
+            end = offset + 4 + length
+            if len(buffer) < end:
+                break
+            body = bytes(buffer[offset + _FRAME.size:end])
+            offset = end
+            try:
+                self.frame_received(frame_type, body)
+            except Exception:
+                self.logger.exception(f"failed to handle frame of type {frame_type}")
+        if offset:
+            del buffer[:offset]
+
+    def frame_received(self, frame_type, body):
+        raise NotImplementedError()
+
+    def send(self, parts):
+        """
+        Method for sending the parts of a frame, the frame is written along
+        with the other frames sent in the same iteration of the event loop
+
+        :param list parts: parts of the frame
+        """
+        if self._transport is None:
+            return
+        self._pending.extend(parts)
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_event_loop().call_soon(self._flush)
+
+    def _flush(self):
+        self._flush_handle = None
+        if self._transport is not None and self._pending:
+            self._transport.writelines(self._pending)
+        self._pending = []
+
+    def close(self):
+        if self._transport is not None:
+            self._flush()
+            self._transport.close()
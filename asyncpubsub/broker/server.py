@@ -0,0 +1,181 @@
+# -*- coding : utf-8 -*-
+
+import asyncio
+import logging
+
+from asyncpubsub.core.topic import TopicTrie, is_pattern, matches, validate_pattern
+from asyncpubsub.broker.protocol import (FrameProtocol, encode_frame, decode_channel,
+                                         SUBSCRIBE, UNSUBSCRIBE, ANNOUNCE, RETRACT,
+                                         INTEREST, DISINTEREST, PUBLISH)
+
+
+class _BrokerConnection(FrameProtocol):
+
+    def __init__(self, broker):
+        super().__init__()
+        self.broker = broker
+        self.subscriptions = set()
+        self.announced = set()
+        self.interest = set()
+
+    def connection_made(self, transport):
+        super().connection_made(transport)
+        self.broker._connected(self)
+
+    def connection_lost(self, exc):
+        super().connection_lost(exc)
+        self.broker._disconnected(self)
+
+    def frame_received(self, frame_type, body):
+        self.broker._frame_received(self, frame_type, body)
+
+    def __str__(self):
+        return f"{self.__class__.__name__}(id={id(self):#x})"
+
+
+class Broker:
+
+    """
+    Broker routing messages between the bridges of multiple hubs. Messages are
+    only routed to the connections which subscribed to the channel of the
+    message, and publishing bridges are told whether anyone is interested in
+    their channels so that uninteresting messages are never sent.
+
+    The broker does not decode the messages, PUBLISH frames are forwarded as
+    received.
+
+    >>> broker = Broker()
+    >>> await broker.start(port=7878)
+    >>> await broker.serve_forever()
+    """
+
+    def __init__(self):
+        self._server = None
+        self._connections = set()
+        self._subscriptions = TopicTrie()
+        self._routes = {}
+        self._announced = {}
+
+    @property
+    def logger(self):
+        return logging.getLogger('asyncpubsub.broker')
+
+    @property
+    def sockets(self):
+        return self._server.sockets if self._server is not None else ()
+
+    async def start(self, host=None, port=0, path=None):
+        """
+        Coroutine for starting to accept connections over TCP or, if a path is
+        given, over a unix socket
+
+        :param Optional[str] host: host to bind, None binds all interfaces
+        :param int port: port to bind, 0 picks a free port
+        :param Optional[str] path: path of the unix socket
+        """
+        loop = asyncio.get_running_loop()
+        if path is not None:
+            self._server = await loop.create_unix_server(lambda: _BrokerConnection(self), path)
+        else:
+            self._server = await loop.create_server(lambda: _BrokerConnection(self), host, port)
+        self.logger.info(f"listening on {', '.join(str(s.getsockname()) for s in self.sockets)}")
+        return self
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is None:
+            return
+        self._server.close()
+        for connection in list(self._connections):
+            connection.close()
+        await self._server.wait_closed()
+        self._server = None
+
+    def _connected(self, connection):
+        self._connections.add(connection)
+        self.logger.debug(f"{connection} connected")
+
+    def _disconnected(self, connection):
+        self._connections.discard(connection)
+        for pattern in list(connection.subscriptions):
+            self._unsubscribe(connection, pattern)
+        for channel_name in list(connection.announced):
+            self._retract(connection, channel_name)
+        self.logger.debug(f"{connection} disconnected")
+
+    def _frame_received(self, connection, frame_type, body):
+        if frame_type == PUBLISH:
+            self._route(connection, decode_channel(body), body)
+            return
+
+        channel_name = body.decode()
+        if frame_type == SUBSCRIBE:
+            self._subscribe(connection, channel_name)
+        elif frame_type == UNSUBSCRIBE:
+            self._unsubscribe(connection, channel_name)
+        elif frame_type == ANNOUNCE:
+            self._announce(connection, channel_name)
+        elif frame_type == RETRACT:
+            self._retract(connection, channel_name)
+        else:
+            self.logger.warning(f"{connection} sent unknown frame type {frame_type}")
+
+    def _match(self, channel_name):
+        # the routes are resolved once per channel and subscription change
+        route = self._routes.get(channel_name)
+        if route is None:
+            route = self._routes[channel_name] = self._subscriptions.match(channel_name)
+        return route
+
+    def _route(self, connection, channel_name, body):
+        parts = encode_frame(PUBLISH, body)
+        for target in self._match(channel_name):
+            if target is not connection:
+                target.send(parts)
+
+    def _subscribe(self, connection, pattern):
+        if is_pattern(pattern):
+            validate_pattern(pattern)
+        connection.subscriptions.add(pattern)
+        self._subscriptions.add(pattern, connection)
+        self._subscriptions_changed(pattern)
+
+    def _unsubscribe(self, connection, pattern):
+        connection.subscriptions.discard(pattern)
+        self._subscriptions.remove(pattern, connection)
+        self._subscriptions_changed(pattern)
+
+    def _subscriptions_changed(self, pattern):
+        self._routes.clear()
+        for channel_name in self._announced:
+            if matches(pattern, channel_name):
+                self._update_interest(channel_name)
+
+    def _announce(self, connection, channel_name):
+        connection.announced.add(channel_name)
+        self._announced.setdefault(channel_name, set()).add(connection)
+        self._update_interest(channel_name)
+
+    def _retract(self, connection, channel_name):
+        connection.announced.discard(channel_name)
+        connection.interest.discard(channel_name)
+        publishers = self._announced.get(channel_name)
+        if publishers is not None:
+            publishers.discard(connection)
+            if not publishers:
+                del self._announced[channel_name]
+
+    def _update_interest(self, channel_name):
+        subscribers = self._match(channel_name)
+        for publisher in self._announced.get(channel_name, ()):
+            interested = any(s is not publisher for s in subscribers)
+            if interested == (channel_name in publisher.interest):
+                continue
+            if interested:
+                publisher.interest.add(channel_name)
+                publisher.send(encode_frame(INTEREST, channel_name.encode()))
+            else:
+                publisher.interest.discard(channel_name)
+                publisher.send(encode_frame(DISINTEREST, channel_name.encode()))
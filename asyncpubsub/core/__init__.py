@@ -4,6 +4,14 @@ import logging
 import string
 from enum import IntFlag
 
+from asyncpubsub.core.topic import WILDCARDS, is_pattern, validate_pattern
+
+_LOGGER = logging.getLogger('asyncpubsub')
+
+
+class ClosedError(Exception):
+    pass
+
 
 class EType(IntFlag):
     """
@@ -17,6 +25,7 @@ class EType(IntFlag):
 class ChannelRegistrable:
 
     _VALID_CHARS = set(string.ascii_letters + string.digits + '-' + '_' + '.')
+    _logger = None
 
     """
     Base class for entities which are performing operations on message
@@ -27,21 +36,32 @@ class ChannelRegistrable:
         if not (channel_name and isinstance(channel_name, str)):
             raise TypeError("arg channel_name must be a valid non-empty str")
 
-        if not all(c in self._VALID_CHARS for c in channel_name):
+        if not isinstance(etype, EType):
+            raise TypeError('arg etype must be of type EType')
+
+        # Subscribers are allowed to use wildcards for subscribing to multiple channels
+        valid_chars = self._VALID_CHARS | WILDCARDS if etype == EType.SUBSCRIBER else self._VALID_CHARS
+
+        if not all(c in valid_chars for c in channel_name):
             raise ValueError(("arg channel_name contains invalid characters, "
                               "supported characters are ;"
-                              "[A-Z], [a-z], [0-9], ['-', '_', '.']"))
+                              "[A-Z], [a-z], [0-9], ['-', '_', '.'] "
+                              "and additionally ['*', '#'] for subscribers"))
 
-        if not isinstance(etype, EType):
-            raise TypeError('arg etype must be of type EType')
+        if is_pattern(channel_name):
+            validate_pattern(channel_name)
 
         self._channel_name = channel_name
         self._etype = etype
 
     @property
     def logger(self):
-        return logging.getLogger((f"asyncpubsub.{self.__class__.__name__}."
-                                  f"{self._channel_name}"))
+        # Looked up once per instance, logging.getLogger takes a module lock
+        logger = self._logger
+        if logger is None:
+            logger = self._logger = logging.getLogger((f"asyncpubsub.{self.__class__.__name__}."
+                                                       f"{self._channel_name}"))
+        return logger
 
     @property
     def channel_name(self):
@@ -51,6 +71,10 @@ class ChannelRegistrable:
     def etype(self):
         return self._etype
 
+    @property
+    def is_pattern(self):
+        return is_pattern(self._channel_name)
+
     def __str__(self):
         return (f"{self.__class__.__name__}(name={self._channel_name}, "
                 f"etype={self._etype.name})")
@@ -60,7 +84,28 @@ class ChannelRegistrable:
 
 
 def task_done_callback(name, ft):
+    # Processor tasks are cancelled whenever an entity is closed or garbage collected
     if ft.cancelled():
-        logging.warning(f"{name} task cancelled!")
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug(f"{name} task cancelled!")
     elif ft.exception():
-        logging.error(f"{name} encountered error {ft.exception()}")
+        _LOGGER.error(f"{name} encountered error {ft.exception()}")
+
+
+async def run_processor(ref):
+    """
+    Runs the processor of an entity given by a weak reference. The entity is
+    only referenced while it processes messages, not while it waits for them,
+    so that dropped entities are garbage collected together with their queues
+
+    :param weakref.ref ref: reference of an entity implementing `_process`, a
+                            coroutine returning an awaitable which completes
+                            once further messages are available
+    """
+    while True:
+        entity = ref()
+        if entity is None:
+            return
+        waiter = await entity._process()
+        del entity
+        await waiter
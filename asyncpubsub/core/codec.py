@@ -0,0 +1,258 @@
+# -*- coding : utf-8 -*-
+
+import pickle
+import struct
+
+"""
+Serialization of messages leaving the process. Messages delivered within the
+process are never serialized, subscribers receive the published objects.
+
+Codecs encode a message into a list of buffers instead of a single bytes
+object, so that large payloads can be written to a socket or a shared memory
+segment without being concatenated first. An encoded message is framed as;
+
+    [codec id: u8][number of buffers: u8][buffer length: u32]*n [buffer]*n
+"""
+
+_HEADER = struct.Struct("!BB")
+_LENGTH = struct.Struct("!I")
+
+
+def _flat(buffer):
+    # memoryviews of other formats are cast to bytes so that every buffer
+    # can be sliced and measured in bytes
+    if isinstance(buffer, memoryview) and (buffer.format != 'B' or buffer.ndim != 1):
+        return buffer.cast('B')
+    return buffer
+
+
+class Codec:
+
+    """
+    Base class of the codecs. User-defined codecs have to use an id between
+    128 and 255, the lower ids are reserved for the codecs of the package.
+
+    >>> class JsonCodec(Codec):
+    ...     id = 128
+    ...     def encode(self, message):
+    ...         return [json.dumps(message).encode()]
+    ...     def decode(self, buffers):
+    ...         return json.loads(bytes(buffers[0]))
+    """
+
+    id = None
+
+    def encode(self, message):
+        """
+        Method returns the buffers of an encoded message
+
+        :param Any message: message to be encoded
+        :rtype: list of bytes-like objects
+        """
+        raise NotImplementedError()
+
+    def decode(self, buffers):
+        """
+        Method returns the message decoded from its buffers. The buffers are
+        only valid until the method returns, unless stated otherwise by the
+        transport
+
+        :param list[memoryview] buffers: buffers returned by encode
+        :rtype: Any
+        """
+        raise NotImplementedError()
+
+    def decode_transient(self, buffers):
+        """
+        Method returns the message decoded from buffers which are reused once
+        the method returns, e.g. by a shared memory segment. The message must
+        not reference the buffers, by default copies of the buffers are
+        decoded. Codecs whose messages never reference the buffers decode
+        them directly
+
+        :param list[memoryview] buffers: buffers returned by encode
+        :rtype: Any
+        """
+        return self.decode([bytes(buffer) for buffer in buffers])
+
+
+class PickleCodec(Codec):
+
+    """
+    Codec using pickle protocol 5. Objects supporting out-of-band buffers,
+    e.g. bytearray, PickleBuffer or numpy arrays, are not copied into the
+    pickle stream but passed on as separate buffers.
+    """
+
+    id = 1
+
+    def encode(self, message):
+        buffers = []
+        data = pickle.dumps(message, protocol=5, buffer_callback=buffers.append)
+        return [data, *(buffer.raw() for buffer in buffers)]
+
+    def decode(self, buffers):
+        return pickle.loads(buffers[0], buffers=buffers[1:])
+
+    def decode_transient(self, buffers):
+        # The pickle stream is always copied into new objects, only the
+        # out-of-band buffers are referenced by the message
+        return pickle.loads(buffers[0], buffers=[bytearray(buffer) for buffer in buffers[1:]])
+
+
+class BytesCodec(Codec):
+
+    """
+    Codec passing bytes-like messages through without any conversion
+
+    :param bool copy: if False the decoded messages are memoryviews referencing
+                      the received data instead of bytes copies default=True
+    """
+
+    id = 2
+
+    def __init__(self, copy=True):
+        self._copy = copy
+
+    def encode(self, message):
+        if not isinstance(message, (bytes, bytearray, memoryview)):
+            raise TypeError(f"{self.__class__.__name__} can only encode bytes-like messages")
+        return [message]
+
+    def decode(self, buffers):
+        return bytes(buffers[0]) if self._copy else buffers[0]
+
+    def decode_transient(self, buffers):
+        return bytes(buffers[0])
+
+
+class StructCodec(Codec):
+
+    """
+    Codec packing messages with a fixed schema
+
+    :param str fmt: format of the messages, see the struct module
+    :param Optional[callable] factory: callable creating a message from the
+                                       unpacked values, e.g. a namedtuple class.
+                                       Messages are decoded as tuples if None
+
+    >>> Tick = namedtuple("Tick", "bid ask")
+    >>> codec = StructCodec("!dd", Tick._make)
+    """
+
+    id = 3
+
+    def __init__(self, fmt, factory=None):
+        self._struct = struct.Struct(fmt)
+        self._factory = factory
+
+    def encode(self, message):
+        return [self._struct.pack(*message)]
+
+    def decode(self, buffers):
+        values = self._struct.unpack_from(buffers[0])
+        return values if self._factory is None else self._factory(values)
+
+    decode_transient = decode
+
+
+_PICKLE = PickleCodec()
+_BYTES = BytesCodec()
+_BUILTIN = {_PICKLE.id: _PICKLE, _BYTES.id: _BYTES}
+
+
+class CodecRegistry:
+
+    """
+    Registry of the codecs used for the channels of a hub. Channels without a
+    registered codec send bytes-like messages as is and pickle all other
+    messages.
+
+    >>> registry = get_hub().codecs
+    >>> registry.register("ticks", StructCodec("!dd"))
+    >>> parts = registry.encode("ticks", (1.1, 1.2))
+    >>> registry.decode("ticks", memoryview(b"".join(parts)))
+    ((1.1, 1.2), 22)
+    """
+
+    def __init__(self):
+        self._codecs = {}
+
+    def register(self, channel_name, codec):
+        """
+        Method for setting the codec of a channel
+
+        :param str channel_name: name of the channel
+        :param Codec codec: codec used for the messages of the channel
+        """
+        if not isinstance(codec, Codec):
+            raise TypeError("arg codec must be of type Codec")
+        if not isinstance(codec.id, int) or not 0 < codec.id < 256:
+            raise ValueError("codec id must be an int between 1 and 255")
+        self._codecs[channel_name] = codec
+
+    def unregister(self, channel_name):
+        self._codecs.pop(channel_name, None)
+
+    def get(self, channel_name):
+        """
+        Method returns the codec registered for a channel
+
+        :param str channel_name: name of the channel
+        :rtype: Optional[Codec]
+        """
+        return self._codecs.get(channel_name)
+
+    def clear(self):
+        self._codecs.clear()
+
+    def encode(self, channel_name, message):
+        """
+        Method returns the framed buffers of an encoded message, the buffers
+        returned by the codec are not copied
+
+        :param str channel_name: name of the channel
+        :param Any message: message to be encoded
+        :rtype: list
+        """
+        codec = self._codecs.get(channel_name)
+        if codec is None:
+            codec = _BYTES if isinstance(message, (bytes, bytearray, memoryview)) else _PICKLE
+
+        buffers = [_flat(buffer) for buffer in codec.encode(message)]
+        header = [_HEADER.pack(codec.id, len(buffers))]
+        header.extend(_LENGTH.pack(len(buffer)) for buffer in buffers)
+        return [b"".join(header), *buffers]
+
+    def decode(self, channel_name, view, offset=0, transient=False):
+        """
+        Method decodes a framed message from a buffer
+
+        :param str channel_name: name of the channel
+        :param memoryview view: buffer holding the framed message
+        :param int offset: offset of the framed message in the buffer
+        :param bool transient: if True the buffer is reused once the method
+                               returns, see `Codec.decode_transient`
+                               default=False
+        :returns: the message and the offset following the framed message
+        :rtype: tuple
+        :raises: ValueError if the message was encoded by an unknown codec
+        """
+        codec_id, n_buffers = _HEADER.unpack_from(view, offset)
+        offset += _HEADER.size
+        lengths = struct.unpack_from(f"!{n_buffers}I", view, offset)
+        offset += _LENGTH.size * n_buffers
+
+        buffers = []
+        for length in lengths:
+            buffers.append(view[offset:offset + length])
+            offset += length
+
+        codec = self._codecs.get(channel_name)
+        if codec is None or codec.id != codec_id:
+            codec = _BUILTIN.get(codec_id)
+            if codec is None:
+                raise ValueError(f"no codec with id {codec_id} registered for channel {channel_name}")
+        if transient:
+            return codec.decode_transient(buffers), offset
+        return codec.decode(buffers), offset
@@ -0,0 +1,629 @@
+# -*- coding : utf-8 -*-
+
+"""
+Durable channels backed by an append-only log of segment files. The messages
+of a durable publisher are encoded with the codec of the channel, see
+`asyncpubsub.core.codec`, and appended to the log before they are delivered.
+Every message is assigned an offset, its sequence number in the log starting
+at 0, subscribers created with `from_offset` replay the messages from the log
+before the live messages.
+
+The log is a directory of segment files, a segment is rotated once it
+reaches the segment size. Every segment has a sparse index mapping an offset
+to the position of its record every `index_interval` bytes, a record is
+located by a binary search in the index followed by a short scan. Segments
+are read through mmap. Records are framed as;
+
+    [length of the encoded message: u32][crc32 of the encoded message: u32][encoded message]
+
+>>> log = SegmentLog("/var/lib/app/audit", fsync=FsyncPolicy.BATCH)
+>>> publisher = Publisher("audit", durable=log)
+>>> subscriber = Subscriber("audit", store_event, from_offset=0)
+"""
+
+import bisect
+import logging
+import mmap
+import os
+import struct
+import zlib
+from enum import Enum
+
+_LOGGER = logging.getLogger('asyncpubsub.durable')
+
+_RECORD = struct.Struct("!II")
+_INDEX_ENTRY = struct.Struct("!QQ")
+_LOG_SUFFIX = ".log"
+_INDEX_SUFFIX = ".index"
+
+_fdatasync = getattr(os, 'fdatasync', os.fsync)
+
+
+class FsyncPolicy(Enum):
+    """
+    Policies defining when the appended messages are flushed to the disk.
+    Messages are written to the files before they are delivered with every
+    policy, they survive a crash of the process but only the flushed
+    messages survive a crash of the host.
+
+    BATCH:    the messages appended by the publisher at once, i.e. every
+              message published since its previous wakeup, are flushed with
+              a single fsync before they are delivered (group commit)
+    INTERVAL: the appended messages are flushed at most once per fsync
+              interval, messages are delivered before they are flushed
+    NEVER:    flushing is left to the operating system
+    """
+    BATCH = "batch"
+    INTERVAL = "interval"
+    NEVER = "never"
+
+
+class SegmentLog:
+
+    """
+    Append-only log of the messages of a durable channel, NOT thread-safe.
+    A log is attached to a single publisher, see the durable arg of
+    `Publisher`. Existing segments in the directory are recovered when the
+    log is attached, a partially written record at the end of the log is
+    discarded.
+
+    :param str directory: directory of the segment files, created if it does
+                          not exist. A directory is used by a single channel
+    :param int segment_size: size in bytes from which a segment is rotated
+                             default=64 MiB
+    :param int index_interval: number of bytes between two entries of the
+                               index of a segment default=4096
+    :param FsyncPolicy fsync: policy defining when the messages are flushed
+                              to the disk default=FsyncPolicy.BATCH
+    :param float fsync_interval: maximum number of seconds messages remain
+                                 unflushed with FsyncPolicy.INTERVAL
+                                 default=1.0
+
+    .. note:: The fsync runs on the event loop. With FsyncPolicy.BATCH the
+              publisher delivers the next messages once the previous ones
+              are flushed, the messages published in the meantime are
+              flushed together.
+
+    .. note:: The log stays readable once it is closed, the segments are
+              mapped again on demand.
+
+    >>> log = SegmentLog("/var/lib/app/audit", segment_size=16 << 20, fsync=FsyncPolicy.INTERVAL)
+    >>> publisher = Publisher("audit", durable=log)
+    >>> publisher.log.read(0, 100)
+    """
+
+    def __init__(self, directory, segment_size=64 << 20, index_interval=4096,
+                 fsync=FsyncPolicy.BATCH, fsync_interval=1.0):
+        if not isinstance(directory, (str, os.PathLike)):
+            raise TypeError("arg directory must be a str or a path-like object")
+
+        if not isinstance(segment_size, int) or segment_size <= 0:
+            raise ValueError("arg segment_size must be a positive int")
+
+        if not isinstance(index_interval, int) or index_interval <= 0:
+            raise ValueError("arg index_interval must be a positive int")
+
+        if not isinstance(fsync, FsyncPolicy):
+            raise TypeError("arg fsync must be of type FsyncPolicy")
+
+        if fsync_interval <= 0:
+            raise ValueError("arg fsync_interval must be a positive number")
+
+        self._directory = os.fspath(directory)
+        self._segment_size = segment_size
+        self._index_interval = index_interval
+        self._fsync = fsync
+        self._fsync_interval = fsync_interval
+        self._channel_name = None
+        self._codecs = None
+        self._timers = None
+        self._timer = None
+        self._segments = []
+        self._bases = []
+        self._log_fd = None
+        self._index_fd = None
+        self._end_offset = 0
+        self._synced_offset = 0
+        self._closed = False
+
+    @property
+    def directory(self):
+        return self._directory
+
+    @property
+    def fsync(self):
+        return self._fsync
+
+    @property
+    def channel_name(self):
+        return self._channel_name
+
+    @property
+    def start_offset(self):
+        """
+        Offset of the oldest message in the log
+        """
+        return self._bases[0] if self._bases else 0
+
+    @property
+    def end_offset(self):
+        """
+        Offset which will be assigned to the next appended message
+        """
+        return self._end_offset
+
+    @property
+    def synced_offset(self):
+        """
+        Offset up to which the messages were flushed to the disk
+        """
+        return self._synced_offset
+
+    @property
+    def segments(self):
+        """
+        Number of segment files
+        """
+        return len(self._segments)
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def bind(self, channel_name, codecs, timers):
+        """
+        Method used by the publisher for attaching the log, the existing
+        segments are recovered and the last one is opened for appending
+
+        :param str channel_name: name of the channel
+        :param asyncpubsub.core.codec.CodecRegistry codecs: codecs of the hub
+        :param asyncpubsub.core.timers.TimerQueue timers: timers of the hub
+        """
+        if self._channel_name is not None:
+            raise ValueError(f"{self.__class__.__name__} is already used by another publisher")
+        self._channel_name = channel_name
+        self._codecs = codecs
+        self._timers = timers
+
+        os.makedirs(self._directory, exist_ok=True)
+        bases = sorted(int(name[:-len(_LOG_SUFFIX)]) for name in os.listdir(self._directory)
+                       if name.endswith(_LOG_SUFFIX) and name[:-len(_LOG_SUFFIX)].isdigit())
+        for base in bases:
+            self._add_segment(_Segment(self._directory, base))
+
+        if self._segments:
+            self._end_offset = self._recover(self._segments[-1])
+            self._open_segment(self._segments[-1])
+        else:
+            self._create_segment(0)
+        # Recovered messages of the previous runs count as flushed
+        self._synced_offset = self._end_offset
+
+    def _add_segment(self, segment):
+        self._segments.append(segment)
+        self._bases.append(segment.base)
+
+    def _recover(self, segment):
+        """
+        Internal method scanning the last segment from its last index entry,
+        the log is truncated after the last complete record. Returns the end
+        offset of the log
+        """
+        size = os.path.getsize(segment.log_path)
+        segment.load_index(size)
+        offset, position = segment.last_entry()
+
+        with open(segment.log_path, 'rb') as f:
+            f.seek(position)
+            data = f.read()
+        view = memoryview(data)
+        end = 0
+        while end + _RECORD.size <= len(view):
+            length, crc = _RECORD.unpack_from(view, end)
+            stop = end + _RECORD.size + length
+            if stop > len(view) or zlib.crc32(view[end + _RECORD.size:stop]) != crc:
+                break
+            end = stop
+            offset += 1
+        view.release()
+
+        if position + end != size:
+            _LOGGER.warning(f"discarding {size - position - end} bytes of a partially written record "
+                            f"at the end of {segment.log_path}")
+            os.truncate(segment.log_path, position + end)
+        segment.size = position + end
+        if not segment.offsets:
+            segment.offsets.append(segment.base)
+            segment.positions.append(0)
+        # The index is rewritten as some of its entries may be lost
+        with open(segment.index_path, 'wb') as f:
+            f.write(b"".join(_INDEX_ENTRY.pack(o, p) for o, p in zip(segment.offsets, segment.positions)))
+        return offset
+
+    def _create_segment(self, base):
+        # The current segment stays open until the files of the new one are
+        # created, a failed rotation is retried by the next append
+        segment = _Segment(self._directory, base)
+        segment.offsets.append(base)
+        segment.positions.append(0)
+        log_fd, index_fd = _open_files(segment, os.O_TRUNC)
+        try:
+            _write_all(index_fd, _INDEX_ENTRY.pack(base, 0))
+        except OSError:
+            os.close(log_fd)
+            os.close(index_fd)
+            raise
+        self._close_fds()
+        self._log_fd, self._index_fd = log_fd, index_fd
+        self._add_segment(segment)
+        if self._fsync is not FsyncPolicy.NEVER:
+            _sync_directory(self._directory)
+
+    def _open_segment(self, segment):
+        self._log_fd, self._index_fd = _open_files(segment)
+
+    def _close_fds(self):
+        for fd in (self._log_fd, self._index_fd):
+            if fd is not None:
+                os.close(fd)
+        self._log_fd = self._index_fd = None
+
+    def encode(self, message):
+        """
+        Method returns the record of a message encoded with the codec of the
+        channel, see `append_encoded`
+
+        :param Any message: message to be encoded
+        :rtype: bytes
+        :raises: the exceptions of the codec if it cannot encode the message
+        """
+        # The buffers of a message are joined for computing its checksum in a
+        # single call, the batch is joined for the write anyway
+        return b"".join(self._codecs.encode(self._channel_name, message))
+
+    def append(self, messages):
+        """
+        Method appending messages to the log, the messages of a call are
+        encoded before any of them is written and written at once. Messages
+        are flushed according to the fsync policy by `commit`
+
+        :param Iterable[Any] messages: messages to be appended
+        :returns: offset of the first appended message
+        :rtype: int
+        :raises: ValueError if the log is not attached or closed
+        :raises: the exceptions of the codec, no message is appended then
+        :raises: OSError, see `append_encoded`
+        """
+        if self._log_fd is None:
+            raise ValueError(f"{self.__class__.__name__} of {self._channel_name} is not open")
+        encode = self._codecs.encode
+        channel_name = self._channel_name
+        return self.append_encoded([b"".join(encode(channel_name, message)) for message in messages])
+
+    def append_encoded(self, records):
+        """
+        Method appending messages encoded by `encode`, the records of a call
+        are written at once. Used by the publisher for skipping the messages
+        which cannot be encoded
+
+        :param Iterable[bytes] records: encoded messages to be appended
+        :returns: offset of the first appended message
+        :rtype: int
+        :raises: ValueError if the log is not attached or closed
+        :raises: OSError if writing the files fails, the records before
+                 `end_offset` were appended and the log remains usable
+        """
+        if self._log_fd is None:
+            raise ValueError(f"{self.__class__.__name__} of {self._channel_name} is not open")
+
+        first = self._end_offset
+        segment = self._segments[-1]
+        offset = first
+        position = segment.size
+        indexed = segment.positions[-1]
+        parts = []
+        entries = []
+        pack = _RECORD.pack
+        for data in records:
+            length = len(data)
+            if position > 0 and position + _RECORD.size + length > self._segment_size:
+                self._write(segment, parts, entries, offset, position)
+                parts, entries = [], []
+                self._rotate(offset)
+                segment = self._segments[-1]
+                position = indexed = 0
+            if position - indexed >= self._index_interval:
+                entries.append((offset, position))
+                indexed = position
+            parts.append(pack(length, zlib.crc32(data)))
+            parts.append(data)
+            offset += 1
+            position += _RECORD.size + length
+
+        self._write(segment, parts, entries, offset, position)
+        return first
+
+    def _write(self, segment, parts, entries, offset, position):
+        if not parts:
+            return
+        try:
+            _write_all(self._log_fd, b"".join(parts))
+            if entries:
+                _write_all(self._index_fd, b"".join(_INDEX_ENTRY.pack(o, p) for o, p in entries))
+        except OSError:
+            self._discard_partial_write(segment)
+            raise
+        if entries:
+            for o, p in entries:
+                segment.offsets.append(o)
+                segment.positions.append(p)
+        segment.size = position
+        self._end_offset = offset
+
+    def _discard_partial_write(self, segment):
+        # The files are truncated to their last complete record and index
+        # entry so that the next append follows the last appended message
+        try:
+            os.ftruncate(self._log_fd, segment.size)
+            os.ftruncate(self._index_fd, len(segment.offsets) * _INDEX_ENTRY.size)
+        except OSError:
+            _LOGGER.exception(f"failed to discard a partially written record of {segment.log_path}")
+
+    def _rotate(self, base):
+        # The sealed segment is flushed before the next one is created
+        if self._fsync is not FsyncPolicy.NEVER:
+            self.sync()
+        self._create_segment(base)
+
+    def commit(self):
+        """
+        Method flushing the appended messages according to the fsync policy,
+        invoked by the publisher once per batch of appended messages
+
+        :raises: OSError if the flush fails, the messages remain unflushed
+                 and are flushed by the next commit
+        """
+        if self._synced_offset == self._end_offset:
+            return
+        if self._fsync is FsyncPolicy.BATCH:
+            self.sync()
+        elif self._fsync is FsyncPolicy.INTERVAL and self._timer is None:
+            self._timer = self._timers.call_later(self._fsync_interval, self._on_timer)
+
+    def _on_timer(self):
+        self._timer = None
+        if self._log_fd is None:
+            return
+        try:
+            self.sync()
+        except OSError:
+            # The messages are flushed by the timer of the next commit
+            _LOGGER.exception(f"failed to flush {self}")
+
+    def sync(self):
+        """
+        Method flushing the appended messages to the disk regardless of the
+        fsync policy
+        """
+        if self._log_fd is None or self._synced_offset == self._end_offset:
+            return
+        _fdatasync(self._log_fd)
+        self._synced_offset = self._end_offset
+
+    def read(self, offset, max_n=1024):
+        """
+        Method returns the messages of the log starting at a given offset
+
+        :param int offset: offset of the first message, offsets before the
+                           start of the log are read from its start
+        :param int max_n: maximum number of messages returned default=1024
+        :rtype: list
+        """
+        return self.reader(offset).read(max_n)
+
+    def reader(self, offset, end_offset=None):
+        """
+        Method returns a new reader of the log
+
+        :param int offset: offset of the first message to be read
+        :param Optional[int] end_offset: offset at which the reader stops, the
+                                         current end of the log if None
+        :rtype: LogReader
+        """
+        if end_offset is None:
+            end_offset = self._end_offset
+        return LogReader(self, max(offset, self.start_offset), end_offset)
+
+    def _locate(self, offset):
+        """
+        Internal method returning the segment holding a given offset and the
+        position of the closest indexed record at or before it
+        """
+        segment = self._segments[bisect.bisect_right(self._bases, offset) - 1]
+        i = bisect.bisect_right(segment.offsets, offset) - 1
+        return segment, segment.offsets[i], segment.positions[i]
+
+    def _next_segment(self, segment):
+        i = bisect.bisect_right(self._bases, segment.base)
+        return self._segments[i] if i < len(self._segments) else None
+
+    def close(self):
+        """
+        Method flushing the appended messages, unless the fsync policy is
+        FsyncPolicy.NEVER, and closing the files. Closing a closed log has no
+        effect
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._timer is not None:
+            self._timers.cancel(self._timer)
+            self._timer = None
+        if self._log_fd is not None and self._fsync is not FsyncPolicy.NEVER:
+            self.sync()
+        self._close_fds()
+        for segment in self._segments:
+            segment.unmap()
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(directory={self._directory}, fsync={self._fsync.value})"
+
+
+class LogReader:
+
+    """
+    Read cursor over a SegmentLog. A reader is not meant to be instantiated
+    directly, use `SegmentLog.reader` instead.
+
+    :param SegmentLog log: log to be read
+    :param int offset: offset of the next message to be read
+    :param int end_offset: offset at which the reader stops
+    """
+
+    __slots__ = ('_log', '_offset', '_end_offset')
+
+    def __init__(self, log, offset, end_offset):
+        self._log = log
+        self._offset = offset
+        self._end_offset = end_offset
+
+    @property
+    def offset(self):
+        """
+        Offset of the next message to be read
+        """
+        return self._offset
+
+    @property
+    def end_offset(self):
+        return self._end_offset
+
+    def done(self):
+        return self._offset >= self._end_offset
+
+    def read(self, max_n=1024):
+        """
+        Method returns the next messages, at most max_n
+
+        :param int max_n: maximum number of messages returned default=1024
+        :rtype: list
+        """
+        n = min(max_n, self._end_offset - self._offset)
+        if n <= 0:
+            return []
+
+        log = self._log
+        decode = log._codecs.decode
+        channel_name = log._channel_name
+        segment, offset, position = log._locate(self._offset)
+        messages = []
+        while len(messages) < n and segment is not None:
+            view = segment.view(position)
+            if view is not None:
+                size = len(view)
+                while position < size and len(messages) < n:
+                    length = _RECORD.unpack_from(view, position)[0]
+                    if offset >= self._offset:
+                        messages.append(decode(channel_name, view, position + _RECORD.size)[0])
+                    position += _RECORD.size + length
+                    offset += 1
+                view.release()
+            if len(messages) < n:
+                segment = log._next_segment(segment)
+                position = 0
+        self._offset += len(messages)
+        return messages
+
+
+class _Segment:
+
+    __slots__ = ('base', 'log_path', 'index_path', 'size', 'offsets', 'positions', '_map')
+
+    def __init__(self, directory, base):
+        self.base = base
+        self.log_path = os.path.join(directory, f"{base:020d}{_LOG_SUFFIX}")
+        self.index_path = os.path.join(directory, f"{base:020d}{_INDEX_SUFFIX}")
+        self.size = 0
+        self.offsets = []
+        self.positions = []
+        self._map = None
+        if os.path.exists(self.log_path):
+            self.size = os.path.getsize(self.log_path)
+            self.load_index(self.size)
+
+    def load_index(self, size):
+        """
+        Loads the complete entries of the index pointing into the first size
+        bytes of the segment
+        """
+        self.offsets = []
+        self.positions = []
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, 'rb') as f:
+            data = f.read()
+        for offset, position in _INDEX_ENTRY.iter_unpack(data[:len(data) - len(data) % _INDEX_ENTRY.size]):
+            if position >= size or (self.positions and position <= self.positions[-1]):
+                break
+            self.offsets.append(offset)
+            self.positions.append(position)
+
+    def last_entry(self):
+        if self.offsets:
+            return self.offsets[-1], self.positions[-1]
+        return self.base, 0
+
+    def view(self, position):
+        """
+        Returns a memoryview of the written part of the segment, None if
+        position is at its end. The segment is mapped again once it grew
+        """
+        if position >= self.size:
+            return None
+        if self._map is None or len(self._map) < self.size:
+            self.unmap()
+            with open(self.log_path, 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(self._map)[:self.size]
+
+    def unmap(self):
+        if self._map is None:
+            return
+        try:
+            self._map.close()
+        except BufferError:
+            # Decoded messages still reference the mapping, it is closed once
+            # they are garbage collected
+            pass
+        self._map = None
+
+
+def _open_files(segment, flags=0):
+    flags |= os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, 'O_BINARY', 0)
+    log_fd = os.open(segment.log_path, flags, 0o644)
+    try:
+        index_fd = os.open(segment.index_path, flags, 0o644)
+    except OSError:
+        os.close(log_fd)
+        raise
+    return log_fd, index_fd
+
+
+def _write_all(fd, data):
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def _sync_directory(directory):
+    # Makes the creation of a segment file durable, not supported on every platform
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
@@ -0,0 +1,32 @@
+# -*- coding : utf-8 -*-
+
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from enum import Enum
+
+
+class ExecutorKind(Enum):
+    """
+    Kinds of executors running the synchronous callbacks of subscribers
+
+    INLINE:  callbacks are called on the event loop
+    THREAD:  callbacks are called in the thread pool shared by the hub
+    PROCESS: callbacks are called in the process pool shared by the hub,
+             callbacks and messages must be picklable
+    """
+    INLINE = 'inline'
+    THREAD = 'thread'
+    PROCESS = 'process'
+
+
+def create_executor(kind):
+    """
+    Function returns a new executor of a given kind
+
+    :param ExecutorKind kind: kind of the executor
+    :rtype: Optional[concurrent.futures.Executor]
+    """
+    if kind is ExecutorKind.THREAD:
+        return ThreadPoolExecutor(thread_name_prefix="asyncpubsub")
+    if kind is ExecutorKind.PROCESS:
+        return ProcessPoolExecutor()
+    return None
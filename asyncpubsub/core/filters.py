@@ -0,0 +1,170 @@
+# -*- coding : utf-8 -*-
+
+"""
+Content filters of subscribers, evaluated by the publisher before the
+messages are queued. A filter is either a predicate or a declarative `Match`
+on a field of the messages. Matches are indexed per channel, routing a
+message to the subscribers matching a field costs a single dict lookup
+regardless of the number of subscribers.
+
+>>> subscriber = Subscriber("fills", on_fill, where=Match("account", "ACC-1"))
+>>> subscriber = Subscriber("fills", on_large_fill, where=lambda fill: fill["qty"] > 1000)
+"""
+
+import logging
+from functools import partial
+from weakref import WeakSet, ref
+
+_LOGGER = logging.getLogger('asyncpubsub.filters')
+_MISSING = object()
+
+
+def _get_field(field, message):
+    try:
+        return message[field]
+    except (KeyError, IndexError, TypeError):
+        return getattr(message, field, _MISSING)
+
+
+class Match:
+
+    """
+    Equality filter on a field of the messages, messages without the field
+    are not matched
+
+    :param Union[str, callable] field: key or attribute name of the field,
+                                       or a callable returning the field of
+                                       a message
+    :param Hashable values: values of the field which are matched
+
+    >>> Match("account", "ACC-1", "ACC-2")
+    >>> Match(attrgetter("order.account"), "ACC-1")
+    """
+
+    __slots__ = ('_field', '_values', '_getter')
+
+    def __init__(self, field, *values):
+        if isinstance(field, str):
+            self._getter = partial(_get_field, field)
+        elif callable(field):
+            self._getter = field
+        else:
+            raise TypeError("arg field must be a str or a callable")
+
+        if not values:
+            raise ValueError("at least one value must be given")
+
+        self._field = field
+        self._values = frozenset(values)
+
+    @property
+    def field(self):
+        return self._field
+
+    @property
+    def values(self):
+        return self._values
+
+    @property
+    def getter(self):
+        return self._getter
+
+    def __call__(self, message):
+        try:
+            return self._getter(message) in self._values
+        except TypeError:
+            # unhashable field values never match
+            return False
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self._field!r}, {', '.join(map(repr, self._values))})"
+
+
+class RoutingTable:
+
+    """
+    Subscribers of a channel grouped by their filters, built by the hub once
+    per topology change of the channel. Subscribers with a `Match` filter are
+    indexed by field and value, other filters are evaluated per subscriber.
+    The table only holds weak references of the subscribers.
+
+    :param Collection subscribers: subscribers of the channel
+    """
+
+    __slots__ = ('_subscribers', '_unfiltered', '_predicates', '_indexes')
+
+    def __init__(self, subscribers):
+        self._subscribers = WeakSet(subscribers)
+        self._unfiltered = []
+        self._predicates = []
+        self._indexes = {}
+
+        for subscriber in subscribers:
+            where = getattr(subscriber, 'where', None)
+            if where is None:
+                self._unfiltered.append(ref(subscriber))
+            elif isinstance(where, Match):
+                _, index = self._indexes.setdefault(where.field, (where.getter, {}))
+                for value in where.values:
+                    index.setdefault(value, []).append(ref(subscriber))
+            else:
+                # The predicate is looked up when routing, it may reference
+                # the subscriber
+                self._predicates.append(ref(subscriber))
+
+    @property
+    def subscribers(self):
+        return self._subscribers
+
+    def route(self, messages):
+        """
+        Method returns the messages to be delivered to every subscriber,
+        subscribers without any matching message are omitted
+
+        :param list messages: messages published together
+        :rtype: Iterable of tuples (subscriber, list), the messages keep
+                their order
+        """
+        routed = []
+        for subscriber_ref in self._unfiltered:
+            subscriber = subscriber_ref()
+            if subscriber is not None:
+                routed.append((subscriber, messages))
+
+        if not self._predicates and not self._indexes:
+            return routed
+
+        for getter, index in self._indexes.values():
+            selected = {}
+            for message in messages:
+                try:
+                    subscribers = index.get(getter(message))
+                except TypeError:
+                    # unhashable field values never match
+                    continue
+                except Exception:
+                    _LOGGER.exception("field of a Match filter raised an exception")
+                    continue
+                if subscribers is not None:
+                    for subscriber_ref in subscribers:
+                        selected.setdefault(subscriber_ref, []).append(message)
+            for subscriber_ref, selected_messages in selected.items():
+                subscriber = subscriber_ref()
+                if subscriber is not None:
+                    routed.append((subscriber, selected_messages))
+
+        for subscriber_ref in self._predicates:
+            subscriber = subscriber_ref()
+            if subscriber is None:
+                continue
+            predicate = subscriber.where
+            selected = []
+            for message in messages:
+                try:
+                    if predicate(message):
+                        selected.append(message)
+                except Exception:
+                    subscriber.logger.exception("filter raised an exception")
+            if selected:
+                routed.append((subscriber, selected))
+        return routed
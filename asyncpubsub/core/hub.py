@@ -1,11 +1,21 @@
 # -*- coding : utf-8 -*-
 
+import asyncio
 import logging
+from functools import partial
 from itertools import chain
+from weakref import WeakKeyDictionary, WeakSet, ref
 
 from asyncpubsub.core import EType, ChannelRegistrable
+from asyncpubsub.core.codec import CodecRegistry
+from asyncpubsub.core.executor import ExecutorKind, create_executor
+from asyncpubsub.core.filters import RoutingTable
+from asyncpubsub.core.topic import TopicTrie, matches
+from asyncpubsub.core.timers import TimerQueue
+from asyncpubsub.core.trace import Tracer
 
 _HUB = None
+_LOGGER = logging.getLogger('asyncpubsub.hub')
 
 
 def get_hub():
@@ -19,28 +29,206 @@ class RegistrationError(Exception):
     pass
 
 
+class _Channel:
+
+    """
+    Internal registry record holding every entity registered on a single
+    channel name. Keeping these records keyed by channel name allows the
+    Hub to perform registrations and lookups without scanning unrelated
+    channels. For a wildcard pattern the record holds the pattern subscribers
+    in `subscribers` and never has a publisher.
+
+    `resolved` caches the union of the subscribers and the matching pattern
+    subscribers for the channel, it is valid as long as `resolved_version`
+    equals the Hub's pattern version. `routes` caches the RoutingTable of
+    these subscribers and is valid as long as `routes_version` equals the
+    Hub's pattern version. `responders` caches the responders serving
+    requests on the channel, see `asyncpubsub.core.rpc`.
+
+    Entities are only weakly referenced by the records and the caches.
+    """
+
+    __slots__ = ('_publisher', 'subscribers', 'dangling', 'unknown',
+                 'resolved', 'resolved_version', 'routes', 'routes_version',
+                 'responders')
+
+    def __init__(self):
+        self._publisher = None
+        self.subscribers = WeakSet()
+        self.dangling = WeakSet()
+        self.unknown = WeakSet()
+        self.resolved = None
+        self.resolved_version = -1
+        self.routes = None
+        self.routes_version = -1
+        self.responders = None
+
+    @property
+    def publisher(self):
+        return None if self._publisher is None else self._publisher()
+
+    @publisher.setter
+    def publisher(self, publisher):
+        self._publisher = None if publisher is None else ref(publisher)
+
+    def invalidate(self):
+        self.resolved = None
+        self.routes = None
+        self.responders = None
+
+    def is_empty(self):
+        return (self.publisher is None and not self.subscribers
+                and not self.dangling and not self.unknown)
+
+    def __iter__(self):
+        if self.publisher is not None:
+            yield self.publisher
+        yield from self.subscribers
+        yield from self.dangling
+        yield from self.unknown
+
+
 class Hub:
 
     """
     An instance of this class is meant to be the central naming service which
     provides lookups for publishers and subscribers facilitating communication
-    between them. Please note, The asyncpubsub package assumes that a singleton
-    pattern will be followed for this class.
+    between them. Please note, entities use the hub returned by `get_hub`
+    unless they are given a hub explicitly. The hub only holds weak references
+    to its entities, an entity is deregistered once it is closed or garbage
+    collected. A hub and its entities are NOT thread-safe, additional hubs
+    are meant for event loops running in other threads, see
+    `asyncpubsub.core.shard`.
+
+    :param bool stats: enables the instrumentation of the publishers and
+                       subscribers registered with the hub, see `stats`
+                       default=True
     """
 
-    def __init__(self):
-        self._publisher_subscriber_map = {}
-        self._dangling_subscribers = set()
-        self._unknown_registered = set()
+    def __init__(self, stats=True):
+        self._stats_enabled = stats
+        self._channels = {}
+        self._publisher_subscriber_map = WeakKeyDictionary()
+        self._dangling_subscribers = WeakSet()
+        self._unknown_registered = WeakSet()
+        # The patterns store weak references of the subscribers, the
+        # references of collected subscribers are pruned on the next lookup
+        self._patterns = TopicTrie()
+        self._collected_patterns = []
+        self._pattern_subscribers = WeakKeyDictionary()
+        self._pattern_version = 0
+        self._observers = []
+        self._codecs = CodecRegistry()
+        self._executors = {}
+        self._owned_executors = set()
+        self._tracer = Tracer('asyncpubsub.hub')
+        self._timers = None
 
     @property
     def logger(self):
-        return logging.getLogger('asyncpubsub.hub')
+        return _LOGGER
+
+    @property
+    def tracer(self):
+        return self._tracer
+
+    def set_trace_sink(self, sink):
+        """
+        Method for receiving the registration events of the hub as structured
+        TraceEvent records, see `asyncpubsub.core.trace`. The events are
+        also written to the DEBUG level of the "asyncpubsub.hub" logger, the
+        sink is kept when the hub is reset
+
+        :param Optional[callable] sink: callable which will be invoked with
+                                        every event, None removes the sink
+        """
+        self._tracer.set_sink(sink)
+
+    @property
+    def codecs(self):
+        """
+        Returns the registry of the codecs used for delivering the messages of
+        the channels to other processes
+
+        :rtype: asyncpubsub.core.codec.CodecRegistry
+        """
+        return self._codecs
+
+    @property
+    def timers(self):
+        """
+        Returns the timers shared by the entities of the hub, created on first
+        use for the current event loop. The timers are created again for the
+        current event loop once the previous loop is closed, e.g. with a loop
+        per `asyncio.run` call
+
+        :rtype: asyncpubsub.core.timers.TimerQueue
+        """
+        if self._timers is None or self._timers.loop.is_closed():
+            self._timers = TimerQueue()
+        return self._timers
+
+    @property
+    def stats_enabled(self):
+        return self._stats_enabled
+
+    def get_executor(self, kind):
+        """
+        Method returns the executor of a given kind shared by all the
+        subscribers of the hub. Executors which were not set with
+        `set_executor` are created on first use
+
+        :param ExecutorKind kind: kind of the executor
+        :rtype: Optional[concurrent.futures.Executor]
+        """
+        if not isinstance(kind, ExecutorKind):
+            raise TypeError("arg kind must be of type ExecutorKind")
+
+        if kind is ExecutorKind.INLINE:
+            return None
+
+        executor = self._executors.get(kind)
+        if executor is None:
+            executor = self._executors[kind] = create_executor(kind)
+            self._owned_executors.add(executor)
+        return executor
+
+    def set_executor(self, kind, executor):
+        """
+        Method for setting the executor of a given kind shared by all the
+        subscribers of the hub. Executors set by the user are never shut down
+        by the hub
+
+        :param ExecutorKind kind: ExecutorKind.THREAD or ExecutorKind.PROCESS
+        :param concurrent.futures.Executor executor: executor to be shared
+        """
+        if kind not in (ExecutorKind.THREAD, ExecutorKind.PROCESS):
+            raise ValueError("arg kind must be ExecutorKind.THREAD or ExecutorKind.PROCESS")
+        self._executors[kind] = executor
+
+    def add_observer(self, observer):
+        """
+        Method for adding an observer which will be called with the entity and
+        a bool, True for registrations and False for de-registrations, after
+        every change of the registered entities
+
+        :param callable observer: callable object accepting (ChannelRegistrable, bool)
+        """
+        self._observers.append(observer)
+
+    def remove_observer(self, observer):
+        if observer in self._observers:
+            self._observers.remove(observer)
+
+    def _notify_observers(self, channel_registrable, registered):
+        for observer in self._observers:
+            observer(channel_registrable, registered)
 
     def iter_registered(self):
         return chain(self._publisher_subscriber_map.keys(),
                      *self._publisher_subscriber_map.values(),
-                     self._dangling_subscribers, self._unknown_registered)
+                     self._dangling_subscribers, self._unknown_registered,
+                     self._pattern_subscribers.keys())
 
     def get_registered(self, channels=[], etype=EType.ANY):
         """
@@ -53,14 +241,38 @@ class Hub:
         if isinstance(channels, str):
             channels = [channels]
 
-        ret = []
-        channel_cmp = lambda x: True if not channels else x in channels
+        if channels:
+            records = (self._channels.get(name) for name in dict.fromkeys(channels))
+            registered = chain.from_iterable(r for r in records if r is not None)
+        else:
+            registered = self.iter_registered()
+
+        return [obj for obj in registered if obj.etype in etype]
+
+    def get_publisher(self, channel_name):
+        """
+        Method returns the publisher registered for a given channel name
 
-        for obj in self.iter_registered():
-            if channel_cmp(obj.channel_name) and obj.etype in etype:
-                ret.append(obj)
+        :param str channel_name: name of the channel
+        :rtype: Optional[ChannelRegistrable]
+        """
+        channel = self._channels.get(channel_name)
+        return None if channel is None else channel.publisher
 
-        return ret
+    def get_publishers(self, subscriber):
+        """
+        Method returns a list of publishers which a given subscriber is currently
+        subscribed to. A subscriber using a wildcard pattern can be subscribed to
+        multiple publishers
+
+        :param ChannelRegistrable subscriber: subscriber instance
+        :rtype: list
+        """
+        if subscriber in self._pattern_subscribers:
+            return list(self._pattern_subscribers[subscriber])
+        if not self.is_mapped_channel_registrable(subscriber):
+            return []
+        return [self.get_publisher(subscriber.channel_name)]
 
     def register(self, channel_registrable):
         """
@@ -78,62 +290,120 @@ class Hub:
             raise TypeError("arg channel_registrable must be of type ChannelRegistrable")
 
         if channel_registrable.etype == EType.PUBLISHER:
+            publisher = self.get_publisher(channel_registrable.channel_name)
 
-            if channel_registrable in self._publisher_subscriber_map:
-                self.logger.debug(f"{channel_registrable} already registered, skipping registration!")
+            if publisher is channel_registrable:
+                if self._tracer.enabled:
+                    self._tracer.emit("already_registered", obj=channel_registrable)
                 return
 
             # Only allow 1 publisher to publish on a given channel
-            same_name_publishers = self.get_registered(channels=[channel_registrable.channel_name],
-                                                       etype=EType.PUBLISHER)
-            if same_name_publishers:
+            if publisher is not None:
                 raise RegistrationError((f"{channel_registrable.__class__.__name__} with channel_name "
                                          f"{channel_registrable.channel_name} already exists!"))
 
-            self._publisher_subscriber_map[channel_registrable] = set()
+        self._register(channel_registrable)
+        if self._observers:
+            self._notify_observers(channel_registrable, True)
 
-            # Handle all the dangling subscribers for this publisher
-            added_subscribers = []
+    def register_many(self, channel_registrables):
+        """
+        Method for registering multiple instances of ChannelRegistrable with the Hub.
+        All the instances are validated before any of them is registered, therefore
+        either all or none of the instances will be registered.
 
-            for subscriber in self._dangling_subscribers:
-                if subscriber.channel_name == channel_registrable.channel_name:
-                    self._publisher_subscriber_map[channel_registrable].add(subscriber)
-                    added_subscribers.append(subscriber)
-                    self.logger.debug(f"added dangling subscriber {subscriber} for {channel_registrable}")
+        :param Iterable[ChannelRegistrable] channel_registrables: instances to be registered
+        :raises: TypeError, RegistrationError
+        """
+        channel_registrables = list(channel_registrables)
+        publishers = {}
 
-            for subscriber in added_subscribers:
-                self.logger.debug(f"removed dangling subscriber {subscriber}, No longer dangling!")
-                self._dangling_subscribers.remove(subscriber)
+        for channel_registrable in channel_registrables:
+            if not isinstance(channel_registrable, ChannelRegistrable):
+                raise TypeError("arg channel_registrables must only contain ChannelRegistrable instances")
 
-        elif channel_registrable.etype == EType.SUBSCRIBER:
+            if channel_registrable.etype != EType.PUBLISHER:
+                continue
+
+            channel_name = channel_registrable.channel_name
+            publisher = publishers.setdefault(channel_name, channel_registrable)
+            registered_publisher = self.get_publisher(channel_name)
+            if publisher is not channel_registrable or registered_publisher not in (None, channel_registrable):
+                raise RegistrationError((f"{channel_registrable.__class__.__name__} with channel_name "
+                                         f"{channel_name} already exists!"))
 
-            subscribed_publisher = self.get_registered(channels=[channel_registrable.channel_name],
-                                                       etype=EType.PUBLISHER)
+        for channel_registrable in channel_registrables:
+            if channel_registrable is not self.get_publisher(channel_registrable.channel_name):
+                self._register(channel_registrable)
+                if self._observers:
+                    self._notify_observers(channel_registrable, True)
 
-            if subscribed_publisher:
-                assert len(subscribed_publisher) == 1, f"multiple publishers found for {channel_registrable}"
-                subscribed_publisher, *_ = subscribed_publisher
+        if self._tracer.enabled:
+            self._tracer.emit("registered_many", count=len(channel_registrables))
 
-            for registered_publisher in self._publisher_subscriber_map:
-                if registered_publisher.channel_name == channel_registrable.channel_name:
-                    break
-            else:
-                registered_publisher = None
+    def _register(self, channel_registrable):
+        tracer = self._tracer if self._tracer.enabled else None
+        channel = self._channels.get(channel_registrable.channel_name)
+        if channel is None:
+            channel = self._channels[channel_registrable.channel_name] = _Channel()
+
+        if channel_registrable.etype == EType.PUBLISHER:
+            channel.publisher = channel_registrable
+            channel.invalidate()
+            self._publisher_subscriber_map[channel_registrable] = channel.subscribers
 
-            if registered_publisher is not None:
-                self._publisher_subscriber_map[registered_publisher].add(channel_registrable)
-                self.logger.debug(f'added subscriber {channel_registrable} for {registered_publisher}')
+            # Handle all the dangling subscribers for this publisher
+            for subscriber in channel.dangling:
+                channel.subscribers.add(subscriber)
+                self._dangling_subscribers.discard(subscriber)
+                if tracer is not None:
+                    tracer.emit("dangling_subscriber_added", subscriber=subscriber, publisher=channel_registrable)
+            channel.dangling.clear()
+
+            # Match the publisher against all the registered patterns
+            for subscriber in self._match_patterns(channel_registrable.channel_name):
+                self._pattern_subscribers[subscriber].add(channel_registrable)
+                if tracer is not None:
+                    tracer.emit("pattern_subscriber_added", subscriber=subscriber, publisher=channel_registrable)
+
+        elif channel_registrable.etype == EType.SUBSCRIBER:
+
+            if channel_registrable.is_pattern:
+                self._register_pattern_subscriber(channel_registrable, channel)
+            elif channel.publisher is not None:
+                channel.subscribers.add(channel_registrable)
+                channel.invalidate()
+                if tracer is not None:
+                    tracer.emit("subscriber_added", subscriber=channel_registrable, publisher=channel.publisher)
             else:
+                channel.dangling.add(channel_registrable)
+                channel.responders = None
                 self._dangling_subscribers.add(channel_registrable)
-                self.logger.debug(f"added subscriber {channel_registrable} into dangling subscribers")
+                if tracer is not None:
+                    tracer.emit("subscriber_dangling", subscriber=channel_registrable)
 
         else:
-            if channel_registrable in self._unknown_registered:
-                self.logger.debug(f"{channel_registrable} already registered, skipping registration!")
+            if channel_registrable in channel.unknown:
+                if tracer is not None:
+                    tracer.emit("already_registered", obj=channel_registrable)
             else:
+                channel.unknown.add(channel_registrable)
                 self._unknown_registered.add(channel_registrable)
 
-        self.logger.debug(f"registered object of type {channel_registrable.__class__.__name__}")
+        if tracer is not None:
+            tracer.emit("registered", obj=channel_registrable)
+
+    def _register_pattern_subscriber(self, subscriber, channel):
+        pattern = subscriber.channel_name
+        channel.subscribers.add(subscriber)
+        self._prune_patterns()
+        self._patterns.add(pattern, ref(subscriber, partial(_pattern_collected, self._collected_patterns, pattern)))
+        self._pattern_subscribers[subscriber] = WeakSet(publisher for publisher in self._publisher_subscriber_map
+                                                        if matches(pattern, publisher.channel_name))
+        self._pattern_version += 1
+        if self._tracer.enabled:
+            self._tracer.emit("pattern_registered", subscriber=subscriber,
+                              publishers=len(self._pattern_subscribers[subscriber]))
 
     def deregister(self, channel_registrable):
         """
@@ -142,30 +412,67 @@ class Hub:
 
         :param ChannelRegistrable registrable: instance to be de-registered
         """
+        tracer = self._tracer if self._tracer.enabled else None
+        channel = self._channels.get(channel_registrable.channel_name)
+
+        if channel is None:
+            if tracer is not None:
+                tracer.emit("not_registered", obj=channel_registrable)
+            return
 
         if channel_registrable.etype == EType.PUBLISHER:
-            subscribers = self._publisher_subscriber_map.pop(channel_registrable, set())
-            self.logger.debug(f"removed publisher {channel_registrable}")
-            for subscriber in subscribers:
-                self._dangling_subscribers.add(subscriber)
+            if channel.publisher is channel_registrable:
+                channel.publisher = None
+                subscribers = self._publisher_subscriber_map.pop(channel_registrable)
+                if tracer is not None:
+                    tracer.emit("publisher_removed", publisher=channel_registrable)
+                channel.dangling |= subscribers
+                self._dangling_subscribers |= subscribers
+                channel.subscribers = WeakSet()
+                channel.invalidate()
+
+                for subscriber in self._match_patterns(channel_registrable.channel_name):
+                    self._pattern_subscribers[subscriber].discard(channel_registrable)
+
+        elif channel_registrable in self._pattern_subscribers:
+            self._prune_patterns()
+            del self._pattern_subscribers[channel_registrable]
+            self._patterns.remove(channel_registrable.channel_name, ref(channel_registrable))
+            channel.subscribers.discard(channel_registrable)
+            self._pattern_version += 1
+            if tracer is not None:
+                tracer.emit("pattern_subscriber_removed", subscriber=channel_registrable)
 
         elif channel_registrable.etype == EType.SUBSCRIBER:
+            channel.dangling.discard(channel_registrable)
+            channel.responders = None
             self._dangling_subscribers.discard(channel_registrable)
 
-            associated_publisher = None
-
-            for publisher, subscribers in self._publisher_subscriber_map.items():
-                if channel_registrable in subscribers:
-                    associated_publisher = publisher
-                    break
-
-            if associated_publisher is not None:
-                self._publisher_subscriber_map[associated_publisher].remove(channel_registrable)
-                self.logger.debug(f"removed subscriber {channel_registrable} for {associated_publisher}")
+            if channel_registrable in channel.subscribers:
+                channel.subscribers.remove(channel_registrable)
+                channel.invalidate()
+                if tracer is not None:
+                    tracer.emit("subscriber_removed", subscriber=channel_registrable, publisher=channel.publisher)
         else:
+            channel.unknown.discard(channel_registrable)
             self._unknown_registered.discard(channel_registrable)
 
-        self.logger.debug(f"deregistered {channel_registrable}")
+        if channel.is_empty():
+            del self._channels[channel_registrable.channel_name]
+
+        if tracer is not None:
+            tracer.emit("deregistered", obj=channel_registrable)
+        if self._observers:
+            self._notify_observers(channel_registrable, False)
+
+    def deregister_many(self, channel_registrables):
+        """
+        Method for de-registration of multiple channel registrables.
+
+        :param Iterable[ChannelRegistrable] channel_registrables: instances to be de-registered
+        """
+        for channel_registrable in channel_registrables:
+            self.deregister(channel_registrable)
 
     def is_registered(self, channel_registrable):
         """
@@ -173,10 +480,13 @@ class Hub:
 
         :param ChannelRegistrable channel_registrable: instance to check for registration
         """
-        for registered in self.iter_registered():
-            if channel_registrable is registered:
-                return True
-        return False
+        channel = self._channels.get(channel_registrable.channel_name)
+        if channel is None:
+            return False
+        return (channel_registrable is channel.publisher
+                or channel_registrable in channel.subscribers
+                or channel_registrable in channel.dangling
+                or channel_registrable in channel.unknown)
 
     def is_mapped_channel_registrable(self, channel_registrable):
         """
@@ -184,29 +494,197 @@ class Hub:
 
         :param ChannelRegistrable channel_registrable: instance to check for registration
         """
-        for registered in chain(self._publisher_subscriber_map.keys(), *self._publisher_subscriber_map.values()):
-            if registered is channel_registrable:
-                return True
-        return False
+        if channel_registrable in self._pattern_subscribers:
+            return bool(self._pattern_subscribers[channel_registrable])
+
+        channel = self._channels.get(channel_registrable.channel_name)
+        if channel is None:
+            return False
+        return channel_registrable is channel.publisher or channel_registrable in channel.subscribers
 
     def get_subscribers(self, publisher):
         """
         Method returns a set of subscribers which have currently subscribed to a given
-        publisher
+        publisher, including the subscribers with matching wildcard patterns. The
+        set is a snapshot, the hub itself references the subscribers weakly
+
+        :param asyncpubsub.Publisher publisher: publisher instance
+        :rtype: Set
+        """
+        if self._collected_patterns:
+            self._prune_patterns()
+
+        subscribers = self._publisher_subscriber_map.get(publisher)
+        if subscribers is None:
+            return set()
+
+        if not self._pattern_subscribers:
+            return set(subscribers)
+
+        # The pattern subscribers are resolved once per channel and topology change
+        channel = self._channels[publisher.channel_name]
+        if channel.resolved is None or channel.resolved_version != self._pattern_version:
+            channel.resolved = subscribers | self._match_patterns(publisher.channel_name)
+            channel.resolved_version = self._pattern_version
+        return set(channel.resolved)
+
+    def get_routes(self, publisher):
+        """
+        Method returns the subscribers of a given publisher grouped by their
+        filters, see `asyncpubsub.core.filters`. The table is built once per
+        topology change of the channel
 
         :param asyncpubsub.Publisher publisher: publisher instance
-        :rtype: set
+        :rtype: asyncpubsub.core.filters.RoutingTable
+        """
+        channel = self._channels.get(publisher.channel_name)
+        if channel is None or channel.publisher is not publisher:
+            return RoutingTable(())
+
+        routes = channel.routes
+        if routes is None or channel.routes_version != self._pattern_version:
+            routes = channel.routes = RoutingTable(self.get_subscribers(publisher))
+            channel.routes_version = self._pattern_version
+        return routes
+
+    def get_responders(self, service_name):
+        """
+        Method returns the responders serving requests on a given channel,
+        see `asyncpubsub.core.rpc`. Responders do not require a publisher
+
+        :param str service_name: name of the service channel
+        :rtype: tuple
+        """
+        channel = self._channels.get(service_name)
+        if channel is None:
+            return ()
+
+        responders = channel.responders
+        if responders is None:
+            responders = channel.responders = tuple(
+                ref(subscriber) for subscriber in chain(channel.subscribers, channel.dangling)
+                if getattr(subscriber, 'handler', None) is not None)
+        return tuple(responder for responder in map(_deref, responders) if responder is not None)
+
+    def _prune_patterns(self):
+        # The trie is not modified by the weakref callbacks, these may run
+        # while a lookup iterates over it
+        collected = self._collected_patterns
+        while collected:
+            self._patterns.remove(*collected.pop())
+
+    def _match_patterns(self, channel_name):
+        return {subscriber for subscriber in map(_deref, self._patterns.match(channel_name))
+                if subscriber is not None}
+
+    async def drain(self):
+        """
+        Coroutine which waits until the messages published so far have been
+        processed by the subscribers, see `Publisher.flush`, and every
+        registered subscriber has processed the messages it received, see
+        `Subscriber.drain`. Messages published by the callbacks in the
+        meantime are not waited for
+        """
+        registered = list(dict.fromkeys(self.iter_registered()))
+        flushes = [entity.flush() for entity in registered if hasattr(entity, 'flush')]
+        if flushes:
+            await asyncio.gather(*flushes)
+        drains = [entity.drain() for entity in registered if hasattr(entity, 'drain')]
+        if drains:
+            await asyncio.gather(*drains)
+
+    def enable_stats(self):
+        """
+        Method for enabling the instrumentation of all the registered and
+        future publishers and subscribers
         """
-        return self._publisher_subscriber_map.get(publisher, set())
+        self._set_stats_enabled(True)
+
+    def disable_stats(self):
+        """
+        Method for disabling the instrumentation of all the registered and
+        future publishers and subscribers. Disabled instrumentation has no
+        cost on the publishing and delivery of messages
+        """
+        self._set_stats_enabled(False)
+
+    def _set_stats_enabled(self, enabled):
+        self._stats_enabled = enabled
+        method_name = 'enable_stats' if enabled else 'disable_stats'
+        for channel_registrable in self.iter_registered():
+            method = getattr(channel_registrable, method_name, None)
+            if method is not None:
+                method()
+
+    def stats(self):
+        """
+        Method returns a snapshot of the counters of all the registered publishers
+        and subscribers. The snapshot is a dict of the form;
+
+        {"enabled": bool,
+         "publishers": {channel_name: {"published": int, "delivered": int, "errors": int,
+                                       "queue_depth": int, "queue_high_water": int,
+                                       "subscribers": int}},
+         "subscribers": {channel_name: [{"delivered": int, "errors": int, "dropped": int,
+                                         "conflated": int, "missed": int, "lag": int,
+                                         "queue_depth": int, "queue_high_water": int,
+                                         "callback_latency": {"buckets": tuple, "counts": tuple,
+                                                              "count": int, "sum": float}}]}}
+
+        Entities without instrumentation are omitted.
+
+        :rtype: dict
+        """
+        publishers = {}
+        subscribers = {}
+
+        for channel_registrable in self.iter_registered():
+            get_stats = getattr(channel_registrable, 'get_stats', None)
+            snapshot = get_stats() if get_stats is not None else None
+            if snapshot is None:
+                continue
+
+            if channel_registrable.etype == EType.PUBLISHER:
+                snapshot["subscribers"] = len(self.get_subscribers(channel_registrable))
+                publishers[channel_registrable.channel_name] = snapshot
+            else:
+                subscribers.setdefault(channel_registrable.channel_name, []).append(snapshot)
+
+        return {"enabled": self._stats_enabled,
+                "publishers": publishers,
+                "subscribers": subscribers}
 
     def reset(self):
         """
         Method resets the hub's state to default state
 
-        .. warning:: Calling this will deregister all the registered entities and all communication
-                     channels will no longer be active. User caution is advised!
+        .. warning:: Calling this will deregister all the registered entities and remove all the
+                     observers, all communication channels will no longer be active. User caution
+                     is advised!
         """
+        self._channels.clear()
         self._publisher_subscriber_map.clear()
         self._dangling_subscribers.clear()
         self._unknown_registered.clear()
+        self._patterns.clear()
+        self._collected_patterns.clear()
+        self._pattern_subscribers.clear()
+        self._pattern_version += 1
+        self._observers.clear()
+        self._codecs.clear()
+        for executor in self._owned_executors:
+            executor.shutdown(wait=False)
+        self._owned_executors.clear()
+        self._executors.clear()
+        if self._timers is not None:
+            self._timers.clear()
+            self._timers = None
         self.logger.warning(f"{self.__class__.__name__} reset")
+
+
+def _deref(reference):
+    return reference()
+
+
+def _pattern_collected(collected, pattern, reference):
+    collected.append((pattern, reference))
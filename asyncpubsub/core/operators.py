@@ -0,0 +1,194 @@
+# -*- coding : utf-8 -*-
+
+"""
+Flow operators shaping the messages received by a subscriber. Operators are
+applied when a message reaches the subscriber, before it is queued, so that
+suppressed messages take no queue slot and cause no wakeup. Operators emitting
+messages later, e.g. at the end of an interval, use the timers of the hub.
+
+>>> subscriber = Subscriber("prices", refresh_ui, operators=[DistinctUntilChanged(), Throttle(0.1)])
+"""
+
+_UNSET = object()
+
+
+class Operator:
+
+    """
+    Base class of the flow operators. An operator instance holds the state of
+    a single subscriber and cannot be shared.
+    """
+
+    def __init__(self):
+        self._emit = None
+        self._timers = None
+
+    def bind(self, emit, timers):
+        """
+        Method used by the subscriber for attaching the operator
+
+        :param callable emit: callable passing a message emitted later on to
+                              the following operators and the queue
+        :param asyncpubsub.core.timers.TimerQueue timers: timers of the hub
+        """
+        if self._emit is not None:
+            raise ValueError(f"{self.__class__.__name__} is already used by another subscriber")
+        self._emit = emit
+        self._timers = timers
+
+    def push(self, message):
+        """
+        Method invoked with every received message
+
+        :param Any message: received message
+        :returns: True if the message passes immediately
+        :rtype: bool
+        """
+        raise NotImplementedError()
+
+    def close(self):
+        """
+        Method cancelling the pending emissions of the operator
+        """
+
+
+class _TimedOperator(Operator):
+
+    def __init__(self, interval):
+        super().__init__()
+        if not isinstance(interval, (int, float)) or interval <= 0:
+            raise ValueError("arg interval must be a positive number")
+        self._interval = interval
+        self._timer = None
+        self._latest = _UNSET
+
+    @property
+    def interval(self):
+        return self._interval
+
+    def _emit_latest(self):
+        message, self._latest = self._latest, _UNSET
+        if message is not _UNSET:
+            self._emit(message)
+
+    def close(self):
+        if self._timer is not None:
+            self._timers.cancel(self._timer)
+            self._timer = None
+        self._latest = _UNSET
+
+
+class Throttle(_TimedOperator):
+
+    """
+    Passes at most one message per interval, the first message of an interval
+    passes immediately
+
+    :param float interval: length of the interval in seconds
+    :param bool trailing: if True the latest suppressed message of an interval
+                          is emitted at its end default=False
+    """
+
+    def __init__(self, interval, trailing=False):
+        super().__init__(interval)
+        self._trailing = trailing
+        self._window_end = float('-inf')
+
+    def push(self, message):
+        now = self._timers.time()
+        if now >= self._window_end:
+            if self._timer is not None:
+                # the trailing message of the previous interval is still pending
+                self._timers.cancel(self._timer)
+                self._timer = None
+                self._emit_latest()
+            self._open_window(now)
+            return True
+        if self._trailing:
+            self._latest = message
+        return False
+
+    def _open_window(self, now):
+        self._window_end = now + self._interval
+        if self._trailing and self._timer is None:
+            self._timer = self._timers.call_at(self._window_end, self._on_window_end)
+
+    def _on_window_end(self):
+        self._timer = None
+        if self._latest is not _UNSET:
+            # the trailing message opens the next interval
+            self._open_window(self._timers.time())
+            self._emit_latest()
+
+
+class Debounce(_TimedOperator):
+
+    """
+    Emits the latest message once no message was received for an interval
+
+    :param float interval: quiet period in seconds
+    """
+
+    def __init__(self, interval):
+        super().__init__(interval)
+        self._deadline = 0.0
+
+    def push(self, message):
+        self._latest = message
+        # The timer is not moved for every message, it is re-armed for the
+        # latest deadline when it expires
+        self._deadline = self._timers.time() + self._interval
+        if self._timer is None:
+            self._timer = self._timers.call_at(self._deadline, self._on_timer)
+        return False
+
+    def _on_timer(self):
+        if self._deadline > self._timers.time():
+            self._timer = self._timers.call_at(self._deadline, self._on_timer)
+            return
+        self._timer = None
+        self._emit_latest()
+
+
+class Sample(_TimedOperator):
+
+    """
+    Emits the latest message received within every interval, intervals start
+    with the first message received after the previous emission
+
+    :param float interval: length of the interval in seconds
+    """
+
+    def push(self, message):
+        self._latest = message
+        if self._timer is None:
+            self._timer = self._timers.call_later(self._interval, self._on_timer)
+        return False
+
+    def _on_timer(self):
+        self._timer = None
+        self._emit_latest()
+
+
+class DistinctUntilChanged(Operator):
+
+    """
+    Suppresses messages equal to the previously passed message
+
+    :param Optional[callable] key: callable returning the value compared
+                                   instead of the message default=None
+    """
+
+    def __init__(self, key=None):
+        super().__init__()
+        if key is not None and not callable(key):
+            raise TypeError("arg key must be a callable")
+        self._key = key
+        self._last = _UNSET
+
+    def push(self, message):
+        value = message if self._key is None else self._key(message)
+        if self._last is not _UNSET and value == self._last:
+            return False
+        self._last = value
+        return True
@@ -1,20 +1,49 @@
 # -*- coding : utf-8 -*-
 
 import asyncio
+from collections import deque
 from functools import partial
+from weakref import ref
 
-from asyncpubsub.core import EType, ChannelRegistrable, task_done_callback
+from asyncpubsub.core import EType, ChannelRegistrable, ClosedError, task_done_callback, run_processor
+from asyncpubsub.core.durable import SegmentLog
 from asyncpubsub.core.hub import get_hub
+from asyncpubsub.core.queue import QueueOverflowError, LaneQueue, Priority, lane_depths
+from asyncpubsub.core.retention import Retention
+from asyncpubsub.core.ring import RingBuffer
+from asyncpubsub.core.stats import PublisherStats
+from asyncpubsub.core.subscriber import Subscriber
 
 
 class Publisher(ChannelRegistrable):
 
     """
-    Publisher class. NOT thread-safe
+    Publisher class. NOT thread-safe, except for the `publish_threadsafe`
+    and `publish_many_threadsafe` methods
     Handles publishing messages over channels
 
     :param str channel_name: unique name used for publishing messages
-    :param int queue_size: size of internal queue used for buffering messages
+    :param int queue_size: size of internal queue used for buffering messages,
+                           shared by all the priority lanes
+    :param int ring_size: if positive, messages are delivered through a shared
+                          ring buffer of the given size instead of being copied
+                          into the queue of every subscriber default=0
+    :param bool eager: if True, synchronous callbacks of the subscribers are
+                       invoked directly by the publish calls instead of
+                       passing the messages through the queues default=False
+    :param int retain: number of delivered messages retained for subscribers
+                       created with `replay`, 1 retains the last value only
+                       default=0
+    :param Optional[float] retain_for: if set, retained messages are discarded
+                                       after retain_for seconds, without a
+                                       limit on their number unless retain
+                                       is set default=None
+    :param Optional[SegmentLog] durable: log the messages are appended to
+                                         before they are delivered, see
+                                         `asyncpubsub.core.durable`
+                                         default=None
+    :param Optional[Hub] hub: hub the publisher is registered with, the hub
+                              returned by `get_hub` if None default=None
 
     .. note:: In most use cases the internal queue should never become full.
               However if the publisher is constantly publishing messages
@@ -25,59 +54,662 @@ class Publisher(ChannelRegistrable):
 
     .. note:: Only one publisher can publish over a given channel name
 
+    .. note:: With a ring buffer every message is appended once regardless of
+              the number of subscribers, each subscriber only keeps a read
+              cursor. Subscribers lagging behind by more than ring_size
+              messages will miss the overwritten messages and are notified
+              about the number of missed messages.
+
+    .. note:: Messages published from other threads are collected in a buffer
+              and handed over to the event loop of the publisher in batches,
+              the event loop is woken up at most once per batch instead of
+              once per message.
+
+    .. note:: Eager publishers deliver a message before the publish call
+              returns to every subscriber with a synchronous callback and an
+              empty queue. Coroutine callbacks, callbacks run by an executor
+              and subscribers with queued messages receive the message through
+              the queues as usual, the order of the messages is preserved for
+              every subscriber. Eager publishing cannot be combined with a
+              ring buffer.
+
+    .. note:: Messages can be published with a Priority. Every priority has
+              its own lane in the queue of the publisher and in the queues of
+              the subscribers, the lanes are served according to
+              `asyncpubsub.core.queue.LANE_WEIGHTS` so that high priority
+              messages overtake queued messages of lower priorities without
+              starving them. Messages of the same priority keep their order.
+              Ring buffers deliver the messages of all the priorities in the
+              order they are read from the queue of the publisher.
+
+    .. note:: The filters of the subscribers, see the where arg of
+              `Subscriber`, are evaluated by the publisher before the
+              messages are queued. Subscribers filtering on the same field
+              with `Match` are indexed, each message is routed with a single
+              lookup per field. With a ring buffer the filters are evaluated
+              by the subscribers when reading the buffer.
+
+    .. note:: Messages are retained once they are delivered to the current
+              subscribers, a subscriber created with `replay` therefore
+              receives every message exactly once; either from the retained
+              history or live.
+
+    .. note:: Every message of a durable publisher is assigned an offset,
+              starting at 0 for the first message ever appended to its log.
+              The offset of the next message is returned by `offset`,
+              subscribers created with `from_offset` replay the messages of
+              the log before the live messages, including subscribers
+              created before the publisher. Durable publishing cannot be
+              combined with eager publishing.
+
+    .. note:: The hub references the publisher weakly, a publisher which is
+              no longer referenced is closed once it is garbage collected.
+              See `close` and `aclose` for closing it deterministically.
+
     >>> publisher = Publisher("hello-world-channel")
     >>> await publisher.publish("hello world!")
+    >>> await publisher.publish_many(["hello", "world", "!"])
+    >>> threading.Thread(target=publisher.publish_threadsafe, args=("hello thread!",)).start()
+
+    >>> publisher = Publisher("quotes", eager=True)
+    >>> publisher.publish_nowait(quote)
+
+    >>> publisher.publish_nowait(cancel_request, priority=Priority.HIGH)
+
+    >>> publisher = Publisher("prices", retain=100, retain_for=60)
+    >>> subscriber = Subscriber("prices", callback, replay=10)
+
+    >>> publisher = Publisher("audit", durable=SegmentLog("/var/lib/app/audit"))
+    >>> subscriber = Subscriber("audit", store_event, from_offset=0)
     """
 
-    def __init__(self, channel_name, queue_size=0):
+    def __init__(self, channel_name, queue_size=0, ring_size=0, eager=False,
+                 retain=0, retain_for=None, durable=None, hub=None):
 
         self.__processor_task = None
+        self._hub = None
+        self._closed = False
+        self._ring = None
+        self._stats = None
+        self._threadsafe_buffer = deque()
+        self._handoff_scheduled = False
+        self._eager = eager
+        self._delivering = False
+        self._pending_delivery = None
+        self._retention = None
+        self._log = None
+        self._offset = 0
+        self._taken = 0
+        self._in_transit = False
+        self._flush_waiters = []
 
         super().__init__(channel_name, EType.PUBLISHER)
-        self._msg_queue = asyncio.Queue(maxsize=queue_size)
-        self._hub = get_hub()
+        self._msg_queue = LaneQueue(maxsize=queue_size)
+        self._hub = hub if hub is not None else get_hub()
+
+        if eager and ring_size:
+            raise ValueError("args eager and ring_size cannot be used together")
+
+        if retain or retain_for is not None:
+            self._retention = Retention(retain, retain_for)
+
+        if durable is not None:
+            if not isinstance(durable, SegmentLog):
+                raise TypeError("arg durable must be of type SegmentLog")
+            if eager:
+                raise ValueError("args eager and durable cannot be used together")
+            durable.bind(channel_name, self._hub.codecs, self._hub.timers)
+            self._log = durable
+            self._offset = durable.end_offset
+
         self._hub.register(self)
 
-        self.__processor_task = asyncio.ensure_future(self._queue_processor())
+        if self._hub.stats_enabled:
+            self.enable_stats()
+
+        if ring_size:
+            self._ring = RingBuffer(ring_size)
+            for subscriber in self._hub.get_subscribers(self):
+                subscriber.attach_ring(self._ring)
+
+        # Subscribers created with from_offset before the publisher replay its log
+        if self._log is not None:
+            for subscriber in self._hub.get_subscribers(self):
+                if isinstance(subscriber, Subscriber):
+                    subscriber.attach_log(self._log, self._offset)
+
+        self.__processor_task = asyncio.ensure_future(run_processor(ref(self)))
         self.__processor_task.add_done_callback(
                                     partial(task_done_callback,
                                             channel_name + "-publisher-task"))
+        self._loop = self.__processor_task.get_loop()
 
     @property
     def subscribers(self):
         assert self._hub.is_mapped_channel_registrable(self)
-        return self._hub.get_registered(channels=[self.channel_name],
-                                        etype=EType.SUBSCRIBER)
+        return list(self._hub.get_subscribers(self))
+
+    @property
+    def ring(self):
+        return self._ring
+
+    @property
+    def eager(self):
+        return self._eager
+
+    @property
+    def retention(self):
+        """
+        Returns the history of the delivered messages, None if retention is
+        disabled
+
+        :rtype: Optional[asyncpubsub.core.retention.Retention]
+        """
+        return self._retention
 
-    def publish_nowait(self, message):
+    @property
+    def log(self):
+        """
+        Returns the log of a durable publisher, None if the publisher is not
+        durable
+
+        :rtype: Optional[asyncpubsub.core.durable.SegmentLog]
+        """
+        return self._log
+
+    @property
+    def offset(self):
+        """
+        Offset of the next message delivered by a durable publisher, the
+        messages before it were delivered to the current subscribers. None if
+        the publisher is not durable
+        """
+        return self._offset if self._log is not None else None
+
+    def retained(self, n=None):
+        """
+        Method returns the retained messages, oldest first
+
+        :param Optional[int] n: maximum number of the most recent messages
+                                returned, all if None
+        :rtype: list
+        """
+        if self._retention is None:
+            return []
+        return self._retention.last(n)
+
+    @property
+    def stats(self):
+        """
+        Returns the counters of the publisher, None if instrumentation is disabled
+
+        :rtype: Optional[asyncpubsub.core.stats.PublisherStats]
+        """
+        return self._stats
+
+    def enable_stats(self):
+        """
+        Method for enabling the instrumentation of the publisher, existing
+        counters are kept
+        """
+        if self._stats is None:
+            self._stats = PublisherStats()
+
+    def disable_stats(self):
+        """
+        Method for disabling the instrumentation of the publisher, the
+        counters are discarded
+        """
+        self._stats = None
+
+    def get_stats(self):
+        """
+        Method returns a snapshot of the publisher counters
+
+        :rtype: Optional[dict]
+        """
+        if self._stats is None:
+            return None
+        snapshot = self._stats.snapshot()
+        snapshot["queue_depth"] = self._msg_queue.qsize()
+        snapshot["lane_depths"] = lane_depths(self._msg_queue)
+        return snapshot
+
+    def publish_nowait(self, message, priority=Priority.NORMAL, track=False):
         """
         Method for publishing messages synchronously
 
         :param Any message: message to be published over the channel
+        :param Priority priority: priority of the message default=Priority.NORMAL
+        :param bool track: if True a delivery future is returned, see `flush`
+                           default=False
+        :rtype: Optional[asyncio.Future]
+        :returns: future resolved once the callbacks of the current subscribers
+                  have completed for the message, None unless track is True
         :raises: asyncio.QueueFull
+        :raises: ClosedError
         """
-        self._msg_queue.put_nowait(message)
+        if self._closed:
+            raise ClosedError(f"{self} is closed")
+        if priority is not Priority.NORMAL:
+            priority = Priority(priority)
+        if self._eager and self._can_deliver_eagerly():
+            self._publish_eagerly([message], priority)
+        else:
+            self._msg_queue.put_nowait(message, priority)
+        if track:
+            return self._track()
 
-    async def publish(self, message):
+    async def publish(self, message, priority=Priority.NORMAL, track=False):
         """
         Coroutine for publishing message asynchronously
 
         :param Any message: message to be published over the channel
+        :param Priority priority: priority of the message default=Priority.NORMAL
+        :param bool track: if True a delivery future is returned, see `flush`
+                           default=False
+        :rtype: Optional[asyncio.Future]
+        :returns: future resolved once the callbacks of the current subscribers
+                  have completed for the message, None unless track is True
+
+        :raises: ClosedError
+
+        >>> delivery = await publisher.publish(order, track=True)
+        >>> await delivery
+        """
+        if self._closed:
+            raise ClosedError(f"{self} is closed")
+        if priority is not Priority.NORMAL:
+            priority = Priority(priority)
+        if self._eager and self._can_deliver_eagerly():
+            self._publish_eagerly([message], priority)
+        else:
+            await self._msg_queue.put(message, priority)
+        if track:
+            return self._track()
+
+    def publish_many_nowait(self, messages, priority=Priority.NORMAL, track=False):
+        """
+        Method for publishing multiple messages synchronously. Messages
+        published together are delivered to the subscribers as one batch
+
+        :param Iterable[Any] messages: messages to be published over the channel
+        :param Priority priority: priority of the messages default=Priority.NORMAL
+        :param bool track: if True a delivery future of all the messages is
+                           returned, see `flush` default=False
+        :rtype: Optional[asyncio.Future]
+        :raises: asyncio.QueueFull
+        :raises: ClosedError
+        """
+        if self._closed:
+            raise ClosedError(f"{self} is closed")
+        if priority is not Priority.NORMAL:
+            priority = Priority(priority)
+        if self._eager and self._can_deliver_eagerly():
+            messages = list(messages)
+            if messages:
+                self._publish_eagerly(messages, priority)
+        else:
+            for message in messages:
+                self._msg_queue.put_nowait(message, priority)
+        if track:
+            return self._track()
+
+    async def publish_many(self, messages, priority=Priority.NORMAL, track=False):
+        """
+        Coroutine for publishing multiple messages asynchronously. Messages
+        published together are delivered to the subscribers as one batch
+
+        :param Iterable[Any] messages: messages to be published over the channel
+        :param Priority priority: priority of the messages default=Priority.NORMAL
+        :param bool track: if True a delivery future of all the messages is
+                           returned, see `flush` default=False
+        :rtype: Optional[asyncio.Future]
+        :raises: ClosedError
+        """
+        if self._closed:
+            raise ClosedError(f"{self} is closed")
+        if priority is not Priority.NORMAL:
+            priority = Priority(priority)
+        if self._eager and self._can_deliver_eagerly():
+            messages = list(messages)
+            if messages:
+                self._publish_eagerly(messages, priority)
+        else:
+            for message in messages:
+                await self._msg_queue.put(message, priority)
+        if track:
+            return self._track()
+
+    async def flush(self):
+        """
+        Coroutine which waits until the messages published so far have been
+        delivered and the callbacks of the current subscribers have completed
+        for them. Pulled and discarded messages count as completed. Messages
+        published by other threads are included once they were handed over to
+        the event loop of the publisher.
+
+        .. note:: Messages are processed in order by every subscriber, the
+                  coroutine may therefore also wait for messages the
+                  subscribers received earlier from other publishers.
+        """
+        await self._track()
+
+    def _track(self):
+        """
+        Internal method returning a future resolved once the messages published
+        so far are completed. The target is taken before returning so that
+        messages published later on are not waited for
+        """
+        if self._threadsafe_buffer:
+            self._handoff()
+        target = self._taken + self._msg_queue.qsize() + len(self._threadsafe_buffer)
+        return asyncio.ensure_future(self._wait_completed(target))
+
+    async def _wait_completed(self, target):
+        while not self._closed and (self._taken < target or self._in_transit
+                                    or self._pending_delivery is not None):
+            waiter = self._loop.create_future()
+            self._flush_waiters.append(waiter)
+            await waiter
+
+        # The messages are queued by the subscribers at this point
+        buffers = self._ring is not None
+        barriers = []
+        for subscriber in self._hub.get_subscribers(self):
+            barrier = getattr(subscriber, 'barrier', None)
+            if barrier is not None:
+                barriers.append(barrier(buffers))
+        if barriers:
+            await asyncio.gather(*barriers)
+
+    def _notify_flush_waiters(self):
+        waiters, self._flush_waiters = self._flush_waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def publish_threadsafe(self, message):
+        """
+        Method for publishing messages from threads other than the one running
+        the event loop of the publisher. The method never blocks, the message
+        is buffered until the event loop picks it up
+
+        :param Any message: message to be published over the channel
+        :raises: ClosedError
+        """
+        if self._closed:
+            raise ClosedError(f"{self} is closed")
+        self._threadsafe_buffer.append(message)
+        if not self._handoff_scheduled:
+            self._schedule_handoff()
+
+    def publish_many_threadsafe(self, messages):
+        """
+        Method for publishing multiple messages from threads other than the one
+        running the event loop of the publisher
+
+        :param Iterable[Any] messages: messages to be published over the channel
+        :raises: ClosedError
+        """
+        if self._closed:
+            raise ClosedError(f"{self} is closed")
+        self._threadsafe_buffer.extend(messages)
+        if not self._handoff_scheduled:
+            self._schedule_handoff()
+
+    def _schedule_handoff(self):
+        # The flag is set before waking up the loop, threads appending in the
+        # meantime rely on the scheduled hand-over. Concurrent threads may both
+        # see the flag unset which only results in a redundant wakeup
+        self._handoff_scheduled = True
+        self._loop.call_soon_threadsafe(self._handoff)
+
+    def _handoff(self):
+        """
+        Internal method which moves the messages buffered by other threads into
+        the internal queue, it is always executed by the event loop
+        """
+        # The flag is cleared before draining so that any message appended
+        # after the last popleft below schedules a new hand-over
+        self._handoff_scheduled = False
+        buffer = self._threadsafe_buffer
+        if self._closed:
+            # the messages were buffered before another thread saw the close
+            buffer.clear()
+            return
+        queue = self._msg_queue
+        try:
+            while buffer:
+                queue.put_nowait(buffer[0])
+                buffer.popleft()
+        except asyncio.QueueFull:
+            self._handoff_scheduled = True
+            asyncio.ensure_future(self._blocked_handoff())
+
+    async def _blocked_handoff(self):
+        """
+        Internal method which waits for space in a bounded internal queue
+        before handing over the remaining buffered messages
         """
-        await self._msg_queue.put(message)
+        buffer = self._threadsafe_buffer
+        while buffer:
+            await self._msg_queue.put(buffer[0])
+            buffer.popleft()
+        self._handoff()
 
-    async def _queue_processor(self):
+    async def _process(self):
         """
         Internal method which handles the actual publishing task for the
-        queued messages.
+        queued messages. All the messages of a priority queued at the time of
+        a wakeup are delivered to the subscribers as a single batch, highest
+        priority first. Returns the awaitable of the next wakeup, see
+        `run_processor`
         """
-        while True:
-            message = await self._msg_queue.get()
-            subscribers = self._hub.get_subscribers(self)
-            for subscriber in subscribers:
-                subscriber.notify(message)
+        queue = self._msg_queue
+        if not queue.empty():
+            batches = queue.drain()
+            n_messages = sum(len(messages) for _, messages in batches)
+            self._taken += n_messages
 
-    def __del__(self):
-        if self.__processor_task and not self.__processor_task.done():
+            stats = self._stats
+            if stats is not None:
+                stats.published += n_messages
+                if n_messages > stats.queue_high_water:
+                    stats.queue_high_water = n_messages
+
+            if self._log is not None:
+                batches = self._append(batches)
+
+            if self._ring is not None:
+                for _, messages in batches:
+                    self._ring.extend(messages)
+                    if self._retention is not None:
+                        self._retention.extend(messages)
+                    self._offset += len(messages)
+            else:
+                self._in_transit = True
+                try:
+                    # Messages of an eager publish held back by a subscriber
+                    # using OverflowPolicy.BLOCK are put before the queued ones
+                    if self._pending_delivery is not None:
+                        await self._pending_delivery
+                    for priority, messages in batches:
+                        # Subscribers using OverflowPolicy.BLOCK hold back the
+                        # publisher until they have enough space for the
+                        # remaining messages
+                        self._deliver(messages, priority)
+                        if self._pending_delivery is not None:
+                            await self._pending_delivery
+                finally:
+                    self._in_transit = False
+
+            if self._flush_waiters:
+                self._notify_flush_waiters()
+        return queue.wait()
+
+    def _append(self, batches):
+        """
+        Internal method appending the drained messages to the log of a durable
+        publisher, returns the batches to be delivered. The messages of a
+        wakeup are written at once and flushed together according to the fsync
+        policy. Messages which cannot be encoded or written are logged,
+        counted as errors and not delivered
+        """
+        log = self._log
+        appended = []
+        failed = 0
+        for priority, messages in batches:
+            records = []
+            encoded = messages
+            for i, message in enumerate(messages):
+                try:
+                    records.append(log.encode(message))
+                except Exception:
+                    self.logger.exception(f"failed to encode message {message!r} for {log}")
+                    if encoded is messages:
+                        encoded = messages[:i]
+                    failed += 1
+                    continue
+                if encoded is not messages:
+                    encoded.append(message)
+            if not records:
+                continue
+
+            first = log.end_offset
+            try:
+                log.append_encoded(records)
+            except OSError:
+                self.logger.exception(f"failed to append messages to {log}")
+                written = log.end_offset - first
+                failed += len(encoded) - written
+                encoded = encoded[:written]
+            if encoded:
+                appended.append((priority, encoded))
+
+        try:
+            log.commit()
+        except OSError:
+            # The appended messages are delivered, they are flushed later on
+            self.logger.exception(f"failed to flush {log}")
+
+        if failed and self._stats is not None:
+            self._stats.errors += failed
+        return appended
+
+    def _can_deliver_eagerly(self):
+        # Messages are only delivered by the publish call if no earlier
+        # message is still on its way to the subscribers, including the
+        # messages drained by the processor task while it waits for space
+        return (not self._delivering and self._pending_delivery is None and not self._in_transit
+                and self._msg_queue.empty() and not self._threadsafe_buffer)
+
+    def _publish_eagerly(self, messages, priority):
+        self._taken += len(messages)
+        if self._stats is not None:
+            self._stats.published += len(messages)
+        self._deliver(messages, priority)
+
+    def _deliver(self, messages, priority=Priority.NORMAL):
+        """
+        Internal method which hands over messages to the subscribers. Every
+        subscriber only receives the messages passing its filter. Eager
+        publishers invoke the synchronous callbacks directly, messages which
+        do not fit into a queue with OverflowPolicy.BLOCK are put by a
+        separate task stored in _pending_delivery
+        """
+        if self._retention is not None:
+            self._retention.extend(messages)
+        # Subscribers registered from here on receive the messages from the log
+        self._offset += len(messages)
+
+        blocked = []
+        failed = 0
+        delivered = 0
+        eager = self._eager
+        self._delivering = True
+        try:
+            for subscriber, selected in self._hub.get_routes(self).route(messages):
+                if eager and subscriber.try_dispatch(selected):
+                    delivered += len(selected)
+                    continue
+                try:
+                    pending = subscriber.notify_many(selected, priority)
+                except QueueOverflowError as e:
+                    self.logger.error(f"{subscriber} overflowed, {e}")
+                    failed += 1
+                    continue
+                delivered += len(selected)
+                if pending:
+                    blocked.append((subscriber, pending, priority))
+        finally:
+            self._delivering = False
+
+        stats = self._stats
+        if stats is not None:
+            stats.delivered += delivered
+            stats.errors += failed
+
+        if blocked:
+            self._pending_delivery = asyncio.ensure_future(self._put_blocked(blocked))
+
+    async def _put_blocked(self, blocked):
+        try:
+            for subscriber, pending, priority in blocked:
+                await subscriber.put_many(pending, priority)
+        finally:
+            self._pending_delivery = None
+            if self._flush_waiters:
+                self._notify_flush_waiters()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def close(self):
+        """
+        Method closing the publisher: the processor task is cancelled, the
+        publisher is deregistered and the messages which were not delivered
+        yet are discarded. Closing a closed publisher has no effect
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._hub is None:
+            # the initialization failed before the registration
+            return
+
+        if self.__processor_task is not None and not self.__processor_task.done():
             self.__processor_task.cancel()
+        if self._pending_delivery is not None:
+            self._pending_delivery.cancel()
+        if self._ring is not None:
+            self._ring.close()
         self._hub.deregister(self)
+        if self._log is not None:
+            self._log.close()
+
+        self._msg_queue.drain()
+        self._threadsafe_buffer.clear()
+        self._notify_flush_waiters()
+
+    async def aclose(self):
+        """
+        Coroutine closing the publisher, see `close`, which waits until the
+        cancelled tasks of the publisher have finished. Messages which were
+        not delivered yet are discarded, use `flush` before for delivering them
+        """
+        tasks = [task for task in (self.__processor_task, self._pending_delivery)
+                 if task is not None and not task.done()]
+        self.close()
+        if tasks:
+            await asyncio.wait(tasks)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    def __del__(self):
+        self.close()
@@ -0,0 +1,465 @@
+# -*- coding : utf-8 -*-
+
+import asyncio
+from collections import deque, OrderedDict
+from enum import Enum, IntEnum
+
+
+class OverflowPolicy(Enum):
+    """
+    Policies defining how a bounded subscriber queue handles new messages
+    when it is full
+
+    BLOCK:       the publisher waits until the subscriber has processed
+                 enough messages, propagating backpressure to the publisher
+    DROP_NEWEST: the new message is discarded
+    DROP_OLDEST: the oldest queued message is discarded
+    RAISE:       the new message is discarded and QueueOverflowError is raised
+    CONFLATE:    only the latest pending message per key is kept, messages
+                 are conflated even if the queue is not full. If the queue is
+                 full with distinct keys then the oldest message is discarded
+    """
+    BLOCK = 'block'
+    DROP_NEWEST = 'drop_newest'
+    DROP_OLDEST = 'drop_oldest'
+    RAISE = 'raise'
+    CONFLATE = 'conflate'
+
+
+class QueueOverflowError(Exception):
+    pass
+
+
+class Priority(IntEnum):
+    """
+    Priority lanes of the publisher and subscriber queues, lower values are
+    served first
+    """
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+# Number of messages taken from each lane per scheduling round while several
+# lanes hold messages. Higher priorities are served first, but every lane is
+# served at least once per round so that low priorities are not starved
+LANE_WEIGHTS = (4, 2, 1)
+
+_NORMAL = int(Priority.NORMAL)
+
+
+def _next_lane(lanes, credits):
+    """
+    Weighted round robin over the non-empty lanes, returns the index of the
+    lane to take the next message from
+    """
+    for _ in range(2):
+        for i, lane in enumerate(lanes):
+            if lane and credits[i]:
+                credits[i] -= 1
+                return i
+        # every non-empty lane used up its credits, a new round starts
+        credits[:] = LANE_WEIGHTS
+    raise asyncio.QueueEmpty()
+
+
+class LaneQueue:
+
+    """
+    Awaitable FIFO queue with priority lanes used by publishers. NOT
+    thread-safe. Messages of a lane are kept in order, `get_nowait` picks the
+    lane according to LANE_WEIGHTS.
+
+    :param int maxsize: maximum number of queued messages over all the lanes,
+                        0 means no limit
+
+    >>> queue = LaneQueue()
+    >>> queue.put_nowait("bulk", Priority.LOW)
+    >>> queue.put_nowait("cancel", Priority.HIGH)
+    >>> queue.get_nowait()
+    'cancel'
+    """
+
+    def __init__(self, maxsize=0):
+        if not isinstance(maxsize, int) or maxsize < 0:
+            raise ValueError("arg maxsize must be a non-negative int")
+
+        self._maxsize = maxsize
+        self._lanes = tuple(deque() for _ in Priority)
+        self._credits = list(LANE_WEIGHTS)
+        self._size = 0
+        self._getters = deque()
+        self._putters = deque()
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    def qsize(self):
+        return self._size
+
+    def lane_sizes(self):
+        """
+        Method returns the number of queued messages per lane
+
+        :rtype: tuple of int indexed by Priority
+        """
+        return tuple(len(lane) for lane in self._lanes)
+
+    def empty(self):
+        return not self._size
+
+    def full(self):
+        return 0 < self._maxsize <= self._size
+
+    def put_nowait(self, message, priority=Priority.NORMAL):
+        """
+        Method for queueing a message
+
+        :param Any message: message to be queued
+        :param Priority priority: lane of the message
+        :raises: asyncio.QueueFull
+        """
+        if self._maxsize and self._size >= self._maxsize:
+            raise asyncio.QueueFull()
+        self._lanes[priority].append(message)
+        self._size += 1
+        if self._getters:
+            _wakeup_next(self._getters)
+
+    async def put(self, message, priority=Priority.NORMAL):
+        """
+        Coroutine for queueing a message, waits for space in the queue
+
+        :param Any message: message to be queued
+        :param Priority priority: lane of the message
+        """
+        while self.full():
+            await _wait(self._putters, self.full)
+        self.put_nowait(message, priority)
+
+    def get_nowait(self):
+        """
+        Method returns the next message according to the lane weights
+
+        :raises: asyncio.QueueEmpty
+        """
+        if not self._size:
+            raise asyncio.QueueEmpty()
+        # the scheduler is skipped while all the messages are in the default lane
+        lane = self._lanes[_NORMAL]
+        if len(lane) != self._size:
+            lane = self._lanes[_next_lane(self._lanes, self._credits)]
+        message = lane.popleft()
+        self._size -= 1
+        if self._putters:
+            _wakeup_next(self._putters)
+        return message
+
+    async def wait(self):
+        """
+        Coroutine which waits until the queue holds a message
+        """
+        while not self._size:
+            await _wait(self._getters, self.empty)
+
+    async def get(self):
+        """
+        Coroutine returning the next message, waits for a message
+        """
+        await self.wait()
+        return self.get_nowait()
+
+    def drain(self):
+        """
+        Method returns all the queued messages grouped by lane, highest
+        priority first
+
+        :rtype: list of tuples (Priority, list)
+        """
+        batches = []
+        for priority, lane in zip(Priority, self._lanes):
+            if lane:
+                batches.append((priority, list(lane)))
+                lane.clear()
+        self._size = 0
+        while self._putters:
+            _wakeup_next(self._putters)
+        return batches
+
+
+def _wakeup_next(waiters):
+    while waiters:
+        waiter = waiters.popleft()
+        if not waiter.done():
+            waiter.set_result(None)
+            break
+
+
+async def _wait(waiters, blocked):
+    waiter = asyncio.get_event_loop().create_future()
+    waiters.append(waiter)
+    try:
+        await waiter
+    except BaseException:
+        waiter.cancel()
+        # pass the wakeup on if the condition changed in the meantime
+        if not blocked():
+            _wakeup_next(waiters)
+        raise
+
+
+def lane_depths(queue):
+    """
+    Returns the number of messages queued per lane of a LaneQueue or a
+    MessageQueue keyed by the lowercase lane names
+
+    :rtype: dict
+    """
+    return {priority.name.lower(): size for priority, size in zip(Priority, queue.lane_sizes())}
+
+
+class MessageQueue:
+
+    """
+    Message queue used by subscribers for buffering messages. NOT thread-safe.
+    Only the put side is awaitable, which is used by publishers for waiting on
+    space when the BLOCK policy is used. Messages are queued in priority lanes,
+    `get_nowait` picks the lane according to LANE_WEIGHTS.
+
+    :param int maxsize: maximum number of queued messages over all the lanes,
+                        0 means no limit
+    :param OverflowPolicy policy: policy applied when the queue is full
+    :param Optional[callable] key: callable returning the conflation key of a
+                                   message, required for OverflowPolicy.CONFLATE
+
+    .. note:: With OverflowPolicy.DROP_OLDEST and OverflowPolicy.CONFLATE the
+              discarded message is the oldest message of the lowest priority
+              lane holding messages. Messages are conflated within their lane.
+
+    >>> queue = MessageQueue(policy=OverflowPolicy.CONFLATE, key=lambda tick: tick[0])
+    >>> queue.put_many_nowait([("EURUSD", 1.10), ("USDJPY", 150.1), ("EURUSD", 1.11)])
+    3
+    >>> queue.get_many_nowait()
+    [('EURUSD', 1.11), ('USDJPY', 150.1)]
+    """
+
+    def __init__(self, maxsize=0, policy=OverflowPolicy.DROP_OLDEST, key=None):
+        if not isinstance(maxsize, int) or maxsize < 0:
+            raise ValueError("arg maxsize must be a non-negative int")
+
+        if not isinstance(policy, OverflowPolicy):
+            raise TypeError("arg policy must be of type OverflowPolicy")
+
+        if policy is OverflowPolicy.CONFLATE and not callable(key):
+            raise ValueError("arg key must be a callable for OverflowPolicy.CONFLATE")
+
+        self._maxsize = maxsize
+        self._policy = policy
+        self._key = key
+        lane_type = OrderedDict if policy is OverflowPolicy.CONFLATE else deque
+        self._lanes = tuple(lane_type() for _ in Priority)
+        self._credits = list(LANE_WEIGHTS)
+        self._size = 0
+        self._putters = deque()
+        self._taken = [0] * len(self._lanes)
+        self._dropped = 0
+        self._conflated = 0
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    @property
+    def policy(self):
+        return self._policy
+
+    @property
+    def dropped(self):
+        """
+        Number of messages discarded due to the queue being full
+        """
+        return self._dropped
+
+    @property
+    def conflated(self):
+        """
+        Number of messages replaced by a newer message with the same key
+        """
+        return self._conflated
+
+    def qsize(self):
+        return self._size
+
+    def lane_sizes(self):
+        """
+        Method returns the number of queued messages per lane
+
+        :rtype: tuple of int indexed by Priority
+        """
+        return tuple(len(lane) for lane in self._lanes)
+
+    def empty(self):
+        return not self._size
+
+    def full(self):
+        return 0 < self._maxsize <= self._size
+
+    def positions(self):
+        """
+        Method returns the position of the newest queued message per lane,
+        positions count the messages queued into a lane since its creation
+
+        :rtype: tuple of int indexed by Priority
+        """
+        return tuple(taken + len(lane) for taken, lane in zip(self._taken, self._lanes))
+
+    def reached(self, positions):
+        """
+        Method returns if every message up to the given positions was taken
+        from the queue, either by `get_nowait` or by being discarded
+
+        :param tuple positions: positions returned by `positions`
+        :rtype: bool
+        """
+        return all(taken >= position for taken, position in zip(self._taken, positions))
+
+    def _drop_oldest(self):
+        for i in reversed(range(len(self._lanes))):
+            lane = self._lanes[i]
+            if lane:
+                if self._policy is OverflowPolicy.CONFLATE:
+                    lane.popitem(last=False)
+                else:
+                    lane.popleft()
+                self._size -= 1
+                self._taken[i] += 1
+                self._dropped += 1
+                return
+
+    def put_nowait(self, message, priority=Priority.NORMAL):
+        """
+        Method for queueing a message according to the overflow policy
+
+        :param Any message: message to be queued
+        :param Priority priority: lane of the message
+        :raises: asyncio.QueueFull if the queue is full with OverflowPolicy.BLOCK
+        :raises: QueueOverflowError if the queue is full with OverflowPolicy.RAISE
+        """
+        lane = self._lanes[priority]
+
+        if self._policy is OverflowPolicy.CONFLATE:
+            key = self._key(message)
+            if key in lane:
+                lane[key] = message
+                self._conflated += 1
+                return
+            if self.full():
+                self._drop_oldest()
+            lane[key] = message
+            self._size += 1
+            return
+
+        if self.full():
+            policy = self._policy
+            if policy is OverflowPolicy.DROP_OLDEST:
+                self._drop_oldest()
+            elif policy is OverflowPolicy.DROP_NEWEST:
+                self._dropped += 1
+                return
+            elif policy is OverflowPolicy.BLOCK:
+                raise asyncio.QueueFull()
+            else:
+                self._dropped += 1
+                raise QueueOverflowError(f"queue is full, maxsize={self._maxsize}")
+
+        lane.append(message)
+        self._size += 1
+
+    def put_many_nowait(self, messages, priority=Priority.NORMAL):
+        """
+        Method for queueing multiple messages according to the overflow policy.
+        With OverflowPolicy.BLOCK messages are queued until the queue is full
+
+        :param Sequence[Any] messages: messages to be queued
+        :param Priority priority: lane of the messages
+        :returns: number of messages which were processed by the queue, only
+                  less than len(messages) with OverflowPolicy.BLOCK
+        :rtype: int
+        :raises: QueueOverflowError if the queue is full with OverflowPolicy.RAISE,
+                 the remaining messages are discarded
+        """
+        if not self._maxsize and self._policy is not OverflowPolicy.CONFLATE:
+            self._lanes[priority].extend(messages)
+            self._size += len(messages)
+            return len(messages)
+
+        for i, message in enumerate(messages):
+            try:
+                self.put_nowait(message, priority)
+            except asyncio.QueueFull:
+                return i
+            except QueueOverflowError:
+                self._dropped += len(messages) - i - 1
+                raise
+        return len(messages)
+
+    async def put(self, message, priority=Priority.NORMAL):
+        """
+        Coroutine for queueing a message, waits for space in the queue with
+        OverflowPolicy.BLOCK. Other policies never wait.
+
+        :param Any message: message to be queued
+        :param Priority priority: lane of the message
+        """
+        while self._policy is OverflowPolicy.BLOCK and self.full():
+            await _wait(self._putters, self.full)
+        self.put_nowait(message, priority)
+
+    def get_nowait(self):
+        """
+        Method returns the next queued message according to the lane weights
+
+        :raises: asyncio.QueueEmpty
+        """
+        if not self._size:
+            raise asyncio.QueueEmpty()
+
+        # the scheduler is skipped while all the messages are in the default lane
+        i = _NORMAL
+        lane = self._lanes[i]
+        if len(lane) != self._size:
+            i = _next_lane(self._lanes, self._credits)
+            lane = self._lanes[i]
+        if self._policy is OverflowPolicy.CONFLATE:
+            message = lane.popitem(last=False)[1]
+        else:
+            message = lane.popleft()
+        self._size -= 1
+        self._taken[i] += 1
+
+        if self._putters:
+            _wakeup_next(self._putters)
+        return message
+
+    def clear(self):
+        """
+        Method discarding all the queued messages, waiting putters are woken up
+        """
+        for i, lane in enumerate(self._lanes):
+            self._taken[i] += len(lane)
+            lane.clear()
+        self._size = 0
+        while self._putters:
+            _wakeup_next(self._putters)
+
+    def get_many_nowait(self, max_n=0):
+        """
+        Method returns all the queued messages
+
+        :param int max_n: maximum number of messages to be returned, 0 means
+                          no limit default=0
+        :rtype: list
+        """
+        n = self._size if not max_n else min(max_n, self._size)
+        return [self.get_nowait() for _ in range(n)]
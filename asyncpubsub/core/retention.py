@@ -0,0 +1,97 @@
+# -*- coding : utf-8 -*-
+
+import time
+from collections import deque
+
+
+class Retention:
+
+    """
+    Bounded history of the messages delivered over a channel, used for
+    replaying recent messages to subscribers joining late. Messages are kept
+    together with their delivery time in a single deque.
+
+    :param int size: maximum number of retained messages, 1 keeps the last
+                     value only, 0 means no limit if max_age is set default=0
+    :param Optional[float] max_age: if set, messages older than max_age
+                                    seconds are discarded default=None
+
+    >>> retention = Retention(size=100, max_age=60)
+    >>> retention.extend(["hello", "world"])
+    >>> retention.last(1)
+    ['world']
+    """
+
+    __slots__ = ('_entries', '_max_age')
+
+    def __init__(self, size=0, max_age=None):
+        if not isinstance(size, int) or size < 0:
+            raise ValueError("arg size must be a non-negative int")
+
+        if max_age is not None and max_age <= 0:
+            raise ValueError("arg max_age must be a positive number")
+
+        if not size and max_age is None:
+            raise ValueError("at least one of args size and max_age must be set")
+
+        self._entries = deque(maxlen=size or None)
+        self._max_age = max_age
+
+    @property
+    def size(self):
+        return self._entries.maxlen or 0
+
+    @property
+    def max_age(self):
+        return self._max_age
+
+    def extend(self, messages):
+        """
+        Method for retaining delivered messages
+
+        :param Iterable[Any] messages: messages in delivery order
+        """
+        now = time.monotonic()
+        self._entries.extend((now, message) for message in messages)
+        if self._max_age is not None:
+            self._expire(now)
+
+    def _expire(self, now):
+        entries = self._entries
+        deadline = now - self._max_age
+        while entries and entries[0][0] < deadline:
+            entries.popleft()
+
+    def entries(self, n=None):
+        """
+        Method returns the retained messages together with their delivery
+        time, oldest first
+
+        :param Optional[int] n: maximum number of the most recent messages
+                                returned, all if None
+        :rtype: list of tuples (time.monotonic timestamp, message)
+        """
+        if self._max_age is not None:
+            self._expire(time.monotonic())
+        entries = self._entries
+        if n is None or n >= len(entries):
+            return list(entries)
+        if n <= 0:
+            return []
+        return [entries[i] for i in range(len(entries) - n, len(entries))]
+
+    def last(self, n=None):
+        """
+        Method returns the retained messages, oldest first
+
+        :param Optional[int] n: maximum number of the most recent messages
+                                returned, all if None
+        :rtype: list
+        """
+        return [message for _, message in self.entries(n)]
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,218 @@
+# -*- coding : utf-8 -*-
+
+import asyncio
+
+
+class RingBuffer:
+
+    """
+    Bounded ring buffer shared by all the subscribers of a channel. Messages
+    are appended once by the publisher and every subscriber consumes them
+    through its own RingReader which only holds a read cursor.
+
+    Every appended message is assigned a monotonically increasing sequence
+    number. Once more than `capacity` messages are appended the oldest ones
+    are overwritten, readers which did not consume them in time are notified
+    about the number of missed messages.
+
+    :param int capacity: maximum number of messages retained by the buffer
+
+    >>> ring = RingBuffer(1024)
+    >>> reader = ring.reader()
+    >>> ring.append("hello world!")
+    >>> reader.get_nowait()
+    'hello world!'
+    """
+
+    def __init__(self, capacity):
+        if not isinstance(capacity, int) or capacity <= 0:
+            raise ValueError("arg capacity must be a positive int")
+
+        self._capacity = capacity
+        self._buffer = [None] * capacity
+        self._head = 0
+        self._waiters = set()
+        self._closed = False
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @property
+    def head(self):
+        """
+        Sequence number which will be assigned to the next appended message
+        """
+        return self._head
+
+    @property
+    def tail(self):
+        """
+        Sequence number of the oldest message still retained by the buffer
+        """
+        return max(0, self._head - self._capacity)
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def __len__(self):
+        return self._head - self.tail
+
+    def append(self, message):
+        """
+        Method for appending a single message to the buffer
+
+        :param Any message: message to be appended
+        """
+        self._buffer[self._head % self._capacity] = message
+        self._head += 1
+        self._wakeup()
+
+    def extend(self, messages):
+        """
+        Method for appending multiple messages to the buffer, waiting readers
+        are woken up once for all the messages
+
+        :param Iterable[Any] messages: messages to be appended
+        """
+        buffer, capacity, head = self._buffer, self._capacity, self._head
+        for message in messages:
+            buffer[head % capacity] = message
+            head += 1
+        self._head = head
+        self._wakeup()
+
+    def reader(self, on_overrun=None):
+        """
+        Method returns a new reader positioned at the head of the buffer,
+        therefore only messages appended after the creation of the reader
+        will be read
+
+        :param Optional[callable] on_overrun: callable which will be invoked
+                                              with the number of messages
+                                              missed by the reader
+        :rtype: RingReader
+        """
+        return RingReader(self, self._head, on_overrun=on_overrun)
+
+    def close(self):
+        """
+        Method marks the buffer as closed, i.e. no further messages will be
+        appended. Readers can still consume the retained messages
+        """
+        self._closed = True
+        self._wakeup()
+
+    def add_waiter(self, waiter):
+        """
+        Method for registering a future which will be resolved when new
+        messages are appended
+        """
+        self._waiters.add(waiter)
+
+    def remove_waiter(self, waiter):
+        self._waiters.discard(waiter)
+
+    def _wakeup(self):
+        if not self._waiters:
+            return
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        self._waiters.clear()
+
+    def _get(self, seq):
+        return self._buffer[seq % self._capacity]
+
+
+class RingReader:
+
+    """
+    Read cursor over a RingBuffer. A reader is not meant to be instantiated
+    directly, use `RingBuffer.reader` instead.
+
+    :param RingBuffer ring: buffer to be read
+    :param int position: sequence number of the next message to be read
+    :param Optional[callable] on_overrun: callable which will be invoked with
+                                          the number of messages missed by
+                                          the reader
+    """
+
+    __slots__ = ('_ring', '_position', '_missed', '_on_overrun')
+
+    def __init__(self, ring, position, on_overrun=None):
+        self._ring = ring
+        self._position = position
+        self._missed = 0
+        self._on_overrun = on_overrun
+
+    @property
+    def ring(self):
+        return self._ring
+
+    @property
+    def position(self):
+        return self._position
+
+    @property
+    def lag(self):
+        """
+        Distance of the read cursor from the head of the buffer. A lag greater
+        than the capacity of the buffer means that messages will be missed
+        """
+        return self._ring.head - self._position
+
+    @property
+    def missed(self):
+        """
+        Total number of messages which were overwritten before being read
+        """
+        return self._missed
+
+    def empty(self):
+        return self._position == self._ring.head
+
+    def qsize(self):
+        return min(self.lag, self._ring.capacity)
+
+    def get_nowait(self):
+        """
+        Method returns the next message from the buffer
+
+        :raises: asyncio.QueueEmpty
+        """
+        ring = self._ring
+        if self._position == ring.head:
+            raise asyncio.QueueEmpty()
+
+        if self._position < ring.tail:
+            self._skip_to(ring.tail)
+
+        message = ring._get(self._position)
+        self._position += 1
+        return message
+
+    def get_many_nowait(self, max_n=0):
+        """
+        Method returns all the available messages from the buffer
+
+        :param int max_n: maximum number of messages to be returned, 0 means
+                          no limit default=0
+        :rtype: list
+        """
+        ring = self._ring
+        if self._position < ring.tail:
+            self._skip_to(ring.tail)
+
+        stop = ring.head if not max_n else min(ring.head, self._position + max_n)
+        messages = [ring._get(seq) for seq in range(self._position, stop)]
+        self._position = stop
+        return messages
+
+    def _skip_to(self, position):
+        missed = position - self._position
+        self._position = position
+        self._missed += missed
+        if self._on_overrun is not None:
+            self._on_overrun(missed)
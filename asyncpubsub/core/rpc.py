@@ -0,0 +1,301 @@
+# -*- coding : utf-8 -*-
+
+"""
+Request/reply over service channels. Responders subscribe to a service
+channel, a Requester sends every request to a single responder chosen by a
+balancer and awaits the reply in its inbox, a dict mapping correlation ids
+to futures. Requests neither register entities with the hub nor create
+tasks.
+
+>>> responder = Responder("quotes", get_quote)
+>>> requester = Requester("quotes", timeout=1.0)
+>>> quote = await requester.request("EURUSD")
+"""
+
+import asyncio
+from collections import namedtuple
+from functools import partial
+from itertools import count
+
+from asyncpubsub.core.hub import get_hub
+from asyncpubsub.core.queue import OverflowPolicy
+from asyncpubsub.core.subscriber import Subscriber
+
+
+class NoResponderError(Exception):
+    pass
+
+
+Request = namedtuple('Request', 'correlation_id payload requester')
+
+
+class RoundRobin:
+
+    """
+    Balancer passing the requests to the responders in turn
+    """
+
+    def __init__(self):
+        self._next = 0
+
+    def __call__(self, responders, payload):
+        i = self._next % len(responders)
+        self._next = i + 1
+        return responders[i]
+
+
+class LeastLoaded:
+
+    """
+    Balancer passing every request to the responder with the least queued
+    and running requests
+    """
+
+    def __call__(self, responders, payload):
+        return min(responders, key=_load)
+
+
+def _load(responder):
+    return responder.load
+
+
+class Responder(Subscriber):
+
+    """
+    Subscriber serving the requests sent to a service channel, NOT
+    thread-safe. The handler is invoked with the payload of every request and
+    its return value is sent back as the reply, errors raised by the handler
+    are raised by `Requester.request`.
+
+    :param str channel_name: name of the service channel, cannot contain
+                             wildcards
+    :param callable handler: synchronous function or coroutine function
+                             returning the reply to a payload
+    :param int queue_size: size of the internal queue buffering requests
+                           default=0
+    :param OverflowPolicy overflow: policy applied when a request is received
+                                    while the queue is full, requesters wait
+                                    for space with OverflowPolicy.BLOCK and
+                                    raise QueueOverflowError with
+                                    OverflowPolicy.RAISE. Policies dropping
+                                    requests are not supported
+                                    default=OverflowPolicy.BLOCK
+    :param int concurrency: maximum number of coroutine handlers running at
+                            once default=1
+    :param Optional[callable] ordering_key: callable returning the ordering
+                                            key of a request payload, see
+                                            `Subscriber`
+    :param Optional[Union[Match, callable]] where: filter of the request
+                                                   payloads, requesters only
+                                                   choose the responder for
+                                                   the accepted payloads, see
+                                                   `Subscriber`
+    :param Optional[Hub] hub: hub the responder is registered with, the hub
+                              returned by `get_hub` if None default=None
+
+    .. note:: The messages of a service channel are requests, a service
+              channel should not have a publisher. Synchronous handlers run
+              on the event loop, blocking work has to be offloaded by the
+              handler itself.
+
+    >>> responder = Responder("quotes", get_quote, concurrency=8)
+    """
+
+    def __init__(self, channel_name, handler, queue_size=0, overflow=OverflowPolicy.BLOCK,
+                 concurrency=1, ordering_key=None, where=None, hub=None):
+        # The handler marks the subscriber as a responder for the hub, it is
+        # set before the registration
+        self._handler = handler
+        self._load = 0
+
+        # The ordering key is computed from the payload of the requests
+        if callable(ordering_key):
+            ordering_key = partial(_payload_key, ordering_key)
+
+        super().__init__(channel_name, queue_size=queue_size, overflow=overflow,
+                         concurrency=concurrency, ordering_key=ordering_key, where=where, hub=hub)
+
+        if self.is_pattern:
+            raise ValueError("arg channel_name of a Responder cannot contain wildcards")
+
+        if not callable(handler):
+            raise TypeError("arg handler must be a callable")
+
+        # A dropped request would never be replied to
+        if overflow not in (OverflowPolicy.BLOCK, OverflowPolicy.RAISE):
+            raise ValueError("arg overflow of a Responder must be OverflowPolicy.BLOCK or OverflowPolicy.RAISE")
+
+        self.set_callback(self._serve_async if asyncio.iscoroutinefunction(handler) else self._serve)
+
+    @property
+    def handler(self):
+        return self._handler
+
+    @property
+    def load(self):
+        """
+        Number of requests queued or being handled by the responder
+        """
+        return self._msg_queue.qsize() + self._load
+
+    def accepts(self, payload):
+        """
+        Method returns True if the responder serves a payload, see the where
+        arg
+
+        :param Any payload: payload of a request
+        :rtype: bool
+        """
+        return self._where is None or self._accepts(payload)
+
+    def submit(self, request):
+        """
+        Method used by requesters for queueing a request
+
+        :param Request request: request to be served
+        :returns: True if the request was queued, False if the queue is full
+                  with OverflowPolicy.BLOCK
+        :rtype: bool
+        :raises: QueueOverflowError if the queue is full with OverflowPolicy.RAISE
+        """
+        try:
+            self.notify(request)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    def _serve(self, request):
+        try:
+            reply = self._handler(request.payload)
+        except Exception as e:
+            request.requester.resolve(request.correlation_id, e, failed=True)
+            raise
+        request.requester.resolve(request.correlation_id, reply)
+
+    async def _serve_async(self, request):
+        self._load += 1
+        try:
+            reply = await self._handler(request.payload)
+        except Exception as e:
+            request.requester.resolve(request.correlation_id, e, failed=True)
+            raise
+        finally:
+            self._load -= 1
+        request.requester.resolve(request.correlation_id, reply)
+
+
+def _payload_key(ordering_key, request):
+    return ordering_key(request.payload)
+
+
+class Requester:
+
+    """
+    Client sending requests to the responders of a service channel, NOT
+    thread-safe. Replies are collected in a single inbox per requester keyed
+    by correlation id.
+
+    :param str service_name: name of the service channel
+    :param Optional[float] timeout: default timeout of the requests in
+                                    seconds, no limit if None default=None
+    :param Optional[callable] balancer: callable choosing the responder of a
+                                        request from a tuple of responders
+                                        and the payload
+                                        default=RoundRobin()
+    :param Optional[Hub] hub: hub of the responders, the hub returned by
+                              `get_hub` if None default=None
+
+    >>> requester = Requester("quotes", timeout=1.0, balancer=LeastLoaded())
+    >>> quote = await requester.request("EURUSD")
+    """
+
+    def __init__(self, service_name, timeout=None, balancer=None, hub=None):
+        if not (service_name and isinstance(service_name, str)):
+            raise TypeError("arg service_name must be a valid non-empty str")
+
+        if timeout is not None and timeout <= 0:
+            raise ValueError("arg timeout must be a positive number")
+
+        if balancer is not None and not callable(balancer):
+            raise TypeError("arg balancer must be a callable")
+
+        self._service_name = service_name
+        self._timeout = timeout
+        self._balancer = balancer if balancer is not None else RoundRobin()
+        self._hub = hub if hub is not None else get_hub()
+        self._inbox = {}
+        self._ids = count()
+
+    @property
+    def service_name(self):
+        return self._service_name
+
+    @property
+    def pending(self):
+        """
+        Number of requests awaiting their reply
+        """
+        return len(self._inbox)
+
+    async def request(self, payload, timeout=None):
+        """
+        Coroutine sending a request to one of the responders of the service
+        and returning its reply
+
+        :param Any payload: payload of the request
+        :param Optional[float] timeout: timeout in seconds, the timeout of the
+                                        requester if None default=None
+        :raises: NoResponderError if the service has no responder accepting
+                 the payload
+        :raises: asyncio.TimeoutError if no reply was received in time
+        :raises: the error raised by the handler of the responder
+        """
+        responders = self._hub.get_responders(self._service_name)
+        if any(responder.where is not None for responder in responders):
+            responders = tuple(responder for responder in responders if responder.accepts(payload))
+        if not responders:
+            raise NoResponderError(f"no responder serves {self._service_name} for {payload!r}")
+        responder = self._balancer(responders, payload)
+
+        if timeout is None:
+            timeout = self._timeout
+
+        loop = asyncio.get_event_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        correlation_id = next(self._ids)
+        future = self._inbox[correlation_id] = loop.create_future()
+        expiry = None
+        try:
+            request = Request(correlation_id, payload, self)
+            if not responder.submit(request):
+                # the queue of the responder is full with OverflowPolicy.BLOCK
+                await asyncio.wait_for(responder.put(request), timeout)
+            if deadline is not None:
+                expiry = loop.call_at(deadline, _expire, future)
+            return await future
+        finally:
+            # Replies to timed out or cancelled requests are discarded
+            if expiry is not None:
+                expiry.cancel()
+            del self._inbox[correlation_id]
+
+    def resolve(self, correlation_id, result, failed=False):
+        """
+        Method used by responders for delivering a reply to the inbox
+
+        :param int correlation_id: id of the request
+        :param Any result: reply, or the error if failed is True
+        :param bool failed: if True the request raises result
+        """
+        future = self._inbox.get(correlation_id)
+        if future is None or future.done():
+            return
+        if failed:
+            future.set_exception(result)
+        else:
+            future.set_result(result)
+
+
+def _expire(future):
+    if not future.done():
+        future.set_exception(asyncio.TimeoutError())
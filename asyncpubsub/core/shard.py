@@ -0,0 +1,227 @@
+# -*- coding : utf-8 -*-
+
+"""
+Sharding of channels over event loops running in separate threads. Every
+shard runs its own event loop with its own Hub, deliveries within a shard
+take the usual lock-free path. Every channel is owned by a single shard,
+the messages of a channel are forwarded to the other shards with the
+batched thread-safe hand-over of the publishers.
+
+>>> shards = ShardGroup(4)
+>>> shards.start()
+>>> owner = shards.owner("orders")
+>>> publisher = owner.call(Publisher, "orders", hub=owner.hub).result()
+>>> shards.link("orders", shards[1])
+>>> subscriber = shards[1].call(Subscriber, "orders", store_order, hub=shards[1].hub).result()
+>>> shards.stop()
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+import zlib
+
+from asyncpubsub.core.hub import Hub
+from asyncpubsub.core.publisher import Publisher
+from asyncpubsub.core.subscriber import Subscriber
+
+
+class Shard:
+
+    """
+    Event loop running in a dedicated thread together with its own Hub.
+    Entities of the shard must be created and used on the thread of the
+    shard, see `call` and `submit`.
+
+    :param int index: index of the shard, used for naming the thread
+    :param bool stats: enables the instrumentation of the hub default=True
+    """
+
+    def __init__(self, index, stats=True):
+        self._index = index
+        self._loop = asyncio.new_event_loop()
+        self._hub = Hub(stats=stats)
+        self._thread = None
+
+    @property
+    def index(self):
+        return self._index
+
+    @property
+    def loop(self):
+        return self._loop
+
+    @property
+    def hub(self):
+        return self._hub
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def in_shard(self):
+        """
+        Method returns if the current thread is the thread of the shard
+        """
+        return threading.current_thread() is self._thread
+
+    def start(self):
+        """
+        Method starting the thread of the shard
+        """
+        if self._thread is not None:
+            raise RuntimeError(f"shard {self._index} was already started")
+        self._thread = threading.Thread(target=self._run, name=f"asyncpubsub-shard-{self._index}",
+                                        daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_forever()
+        finally:
+            tasks = asyncio.all_tasks(self._loop)
+            for task in tasks:
+                task.cancel()
+            self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self._loop.close()
+
+    def call(self, fn, *args, **kwargs):
+        """
+        Method invoking a callable on the thread of the shard, can be called
+        from any thread
+
+        :param callable fn: callable to be invoked with args and kwargs
+        :rtype: concurrent.futures.Future
+        :returns: future of the return value of the callable
+        """
+        future = concurrent.futures.Future()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+        self._loop.call_soon_threadsafe(run)
+        return future
+
+    def submit(self, coro):
+        """
+        Method scheduling a coroutine on the event loop of the shard, can be
+        called from any thread
+
+        :param coroutine coro: coroutine to be run by the shard
+        :rtype: concurrent.futures.Future
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def stop(self, timeout=None):
+        """
+        Method resetting the hub and stopping the event loop of the shard,
+        waits for the thread of the shard to finish unless called from it
+
+        :param Optional[float] timeout: maximum number of seconds to wait for
+                                        the thread default=None
+        """
+        if not self.running:
+            return
+        self._loop.call_soon_threadsafe(self._shutdown)
+        if not self.in_shard():
+            self._thread.join(timeout)
+
+    def _shutdown(self):
+        self._hub.reset()
+        self._loop.stop()
+
+
+class ShardGroup:
+
+    """
+    Group of shards owning the channels of a process, a channel is owned by
+    the shard selected by a stable hash of its name. NOT thread-safe, the
+    group is meant to be set up and torn down by a single thread.
+
+    :param int n_shards: number of shards, typically the number of cores
+    :param bool stats: enables the instrumentation of the hubs default=True
+
+    .. note:: Publishers of a channel are created on the owning shard,
+              other shards publish with `Publisher.publish_threadsafe`.
+              Subscribers on other shards receive the messages of a channel
+              once it is linked to their shard with `link`.
+
+    .. note:: The shards share the interpreter, with the GIL only one shard
+              executes Python code at a time. Sharding keeps the delivery of
+              every shard local to its loop and lets the loops wait on I/O
+              independently.
+
+    >>> with ShardGroup(4) as shards:
+    ...     shards.link("orders", shards[1])
+    """
+
+    def __init__(self, n_shards, stats=True):
+        if not isinstance(n_shards, int) or n_shards < 1:
+            raise ValueError("arg n_shards must be a positive int")
+        self._shards = tuple(Shard(i, stats=stats) for i in range(n_shards))
+        self._links = {}
+
+    def __len__(self):
+        return len(self._shards)
+
+    def __getitem__(self, index):
+        return self._shards[index]
+
+    def __iter__(self):
+        return iter(self._shards)
+
+    def owner(self, channel_name):
+        """
+        Method returns the shard owning a channel
+
+        :param str channel_name: name of the channel
+        :rtype: Shard
+        """
+        return self._shards[zlib.crc32(channel_name.encode()) % len(self._shards)]
+
+    def start(self):
+        for shard in self._shards:
+            shard.start()
+
+    def stop(self, timeout=None):
+        for shard in self._shards:
+            shard.stop(timeout)
+        self._links.clear()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def link(self, channel_name, shard):
+        """
+        Method forwarding the messages of a channel from its owner to
+        another shard, where they are published over the same channel name
+        by a mirror publisher. Messages are handed over in batches, the
+        event loop of the shard is woken up at most once per batch. Linking
+        a channel twice has no effect, links are kept until the group is
+        stopped. Blocks until the link is set up, therefore it cannot be
+        called from the thread of a shard
+
+        :param str channel_name: name of the channel, cannot contain wildcards
+        :param Shard shard: shard receiving the messages
+        """
+        if any(s.in_shard() for s in self._shards):
+            raise RuntimeError("link cannot be called from the thread of a shard")
+
+        owner = self.owner(channel_name)
+        if shard is owner or (channel_name, shard.index) in self._links:
+            return
+
+        mirror = shard.call(Publisher, channel_name, hub=shard.hub).result()
+        forwarder = owner.call(Subscriber, channel_name, batch_callback=mirror.publish_many_threadsafe,
+                               hub=owner.hub).result()
+        self._links[(channel_name, shard.index)] = (mirror, forwarder)
@@ -0,0 +1,507 @@
+# -*- coding : utf-8 -*-
+
+import hashlib
+import os
+import shutil
+import struct
+import tempfile
+from collections import deque
+from multiprocessing import shared_memory, resource_tracker
+
+from asyncpubsub.core.topic import is_pattern
+from asyncpubsub.core.publisher import Publisher
+from asyncpubsub.core.subscriber import Subscriber
+
+"""
+Cross-process channels on the same host. A SharedMemorySender forwards the
+messages of a channel into a shared memory segment, SharedMemoryReceivers in
+other processes read the segment and re-publish the messages to their local
+subscribers. Process-local subscribers of the channel are not affected, they
+are still served directly by the publisher.
+
+The segment is a single-producer multi-consumer byte ring. Records are
+appended once by the sender regardless of the number of receivers and every
+receiver only keeps a read cursor, like the in-process RingBuffer. Receivers
+falling behind by more than the size of the segment miss the overwritten
+records. Receivers are woken up through named pipes, with at most one
+notification per receiver for every forwarded batch.
+
+.. note:: Named pipes are only available on POSIX systems
+"""
+
+_MAGIC = 0x676e69725f737061  # b"aps_ring"
+
+# Header of the segment, native 8 byte words
+_H_MAGIC, _H_CAPACITY, _H_HEAD, _H_TAIL, _H_READERS, _H_SEQ = range(6)
+_HEADER_SIZE = 64
+
+# Record header: sequence number, payload length, record kind
+_RECORD = struct.Struct("=QII")
+_KIND_WRAP, _KIND_RECORD = 0, 1
+
+
+def segment_name(channel_name):
+    """
+    Function returns the name of the shared memory segment used for a channel
+
+    :param str channel_name: name of the channel
+    :rtype: str
+    """
+    return "aps_" + hashlib.blake2b(channel_name.encode(), digest_size=8).hexdigest()
+
+
+def _readers_dir(name):
+    return os.path.join(tempfile.gettempdir(), name + ".readers")
+
+
+class SharedRing:
+
+    """
+    Byte ring stored in a shared memory segment. Only one process may write
+    into the ring, any number of processes can read it through SharedRingReaders.
+
+    The write and read positions are monotonically increasing byte offsets.
+    The writer publishes the head offset after writing a batch of records and
+    moves the tail offset past the records it is about to overwrite, readers
+    validate every record against the tail after reading it.
+
+    :param str name: name of the shared memory segment
+    :param int capacity: size of the ring in bytes, only used when creating it
+    :param bool create: create a new segment instead of attaching to an existing one
+
+    >>> ring = SharedRing("aps_example", 1 << 20, create=True)
+    >>> reader = SharedRing("aps_example").reader()
+    >>> ring.write_many([[b"hello"], [b"wor", b"ld"]])
+    >>> reader.read_many()
+    [b'hello', b'world']
+    """
+
+    def __init__(self, name, capacity=0, create=False):
+        if create:
+            if not isinstance(capacity, int) or capacity <= _RECORD.size:
+                raise ValueError(f"arg capacity must be an int greater than {_RECORD.size}")
+            capacity = (capacity + 7) & ~7
+            self._shm = shared_memory.SharedMemory(name, create=True, size=_HEADER_SIZE + capacity)
+        else:
+            self._shm = _attach(name)
+
+        self._header = self._shm.buf[:_HEADER_SIZE].cast('Q')
+        if create:
+            self._header[_H_MAGIC] = _MAGIC
+            self._header[_H_CAPACITY] = capacity
+            self._header[_H_HEAD] = 0
+            self._header[_H_TAIL] = 0
+            self._header[_H_READERS] = 0
+            self._header[_H_SEQ] = 0
+        elif self._header[_H_MAGIC] != _MAGIC:
+            self._header.release()
+            self._shm.close()
+            raise ValueError(f"shared memory segment {name} is not a SharedRing")
+
+        self._capacity = self._header[_H_CAPACITY]
+        self._data = self._shm.buf[_HEADER_SIZE:_HEADER_SIZE + self._capacity]
+        self._owner = create
+        self._records = deque()
+        self._seq = 0
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @property
+    def head(self):
+        return self._header[_H_HEAD]
+
+    @property
+    def tail(self):
+        return self._header[_H_TAIL]
+
+    @property
+    def seq(self):
+        """
+        Sequence number which will be assigned to the next written record
+        """
+        return self._header[_H_SEQ]
+
+    @property
+    def readers_token(self):
+        """
+        Token changed by every new reader, used by the writer for detecting
+        new readers without scanning the readers directory on every write
+        """
+        return self._header[_H_READERS]
+
+    def touch_readers(self):
+        self._header[_H_READERS] = int.from_bytes(os.urandom(8), "little")
+
+    def write_many(self, records):
+        """
+        Method for appending multiple records to the ring. Every record is a
+        list of bytes-like buffers which are copied one after another into the
+        ring without being concatenated first. The head offset is published
+        once after all the records have been written
+
+        :param Iterable[list] records: buffers of the records to be appended
+        :raises: ValueError if a record does not fit into the ring
+        """
+        data, capacity, header = self._data, self._capacity, self._header
+        head = header[_H_HEAD]
+        for buffers in records:
+            length = sum(len(buffer) for buffer in buffers)
+            size = (_RECORD.size + length + 7) & ~7
+            if size > capacity:
+                raise ValueError(f"record of {length} bytes does not fit into ring of {capacity} bytes")
+
+            pos = head % capacity
+            wrap_pos = None
+            if capacity - pos < size:
+                wrap_pos = pos
+                head += capacity - pos
+                pos = 0
+
+            self._release(head + size - capacity, head)
+            if wrap_pos is not None and capacity - wrap_pos >= _RECORD.size:
+                _RECORD.pack_into(data, wrap_pos, 0, 0, _KIND_WRAP)
+
+            _RECORD.pack_into(data, pos, self._seq, length, _KIND_RECORD)
+            pos += _RECORD.size
+            for buffer in buffers:
+                data[pos:pos + len(buffer)] = buffer
+                pos += len(buffer)
+            self._records.append(head)
+            self._seq += 1
+            head += size
+        # the sequence number is published before the head, readers read
+        # them in the opposite order
+        header[_H_SEQ] = self._seq
+        header[_H_HEAD] = head
+
+    def _release(self, limit, head):
+        # moves the tail past every record starting before limit, these
+        # records are about to be overwritten
+        records = self._records
+        while records and records[0] < limit:
+            records.popleft()
+        tail = records[0] if records else head
+        if tail != self._header[_H_TAIL]:
+            self._header[_H_TAIL] = tail
+
+    def reader(self, on_overrun=None):
+        """
+        Method returns a new reader positioned at the head of the ring
+
+        :param Optional[callable] on_overrun: callable which will be invoked
+                                              with the number of messages
+                                              missed by the reader
+        :rtype: SharedRingReader
+        """
+        return SharedRingReader(self, on_overrun=on_overrun)
+
+    def close(self):
+        """
+        Method for detaching from the segment, the segment is removed if it
+        was created by this instance
+        """
+        if self._shm is None:
+            return
+        self._data.release()
+        self._header.release()
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+        self._shm = None
+
+
+class SharedRingReader:
+
+    """
+    Read cursor over a SharedRing. A reader is not meant to be instantiated
+    directly, use `SharedRing.reader` instead.
+
+    :param SharedRing ring: ring to be read
+    :param Optional[callable] on_overrun: callable which will be invoked with
+                                          the number of messages missed by
+                                          the reader
+    """
+
+    def __init__(self, ring, on_overrun=None):
+        self._ring = ring
+        self._position = ring.head
+        self._next_seq = ring.seq
+        self._missed = 0
+        self._on_overrun = on_overrun
+
+    @property
+    def missed(self):
+        """
+        Total number of messages which were overwritten before being read
+        """
+        return self._missed
+
+    def empty(self):
+        return self._position == self._ring.head
+
+    def read_many(self, decode=None, on_error=None):
+        """
+        Method returns all the records available in the ring. Records are
+        passed to decode as memoryviews of the segment, a record is only
+        validated against the tail once decode returned. Without decode every
+        record is copied once out of the segment
+
+        :param Optional[callable] decode: callable invoked with the memoryview
+                                          of every record, its results are
+                                          returned instead of the records.
+                                          The memoryview is only valid until
+                                          decode returns
+        :param Optional[callable] on_error: callable invoked with the exception
+                                            raised by decode for a record which
+                                            was not overwritten, the record is
+                                            skipped. The exception is raised if
+                                            None
+        :rtype: list
+        """
+        ring = self._ring
+        data, capacity = ring._data, ring.capacity
+        head = ring.head
+        position = self._position
+        records = []
+
+        while position < head:
+            tail = ring.tail
+            if position < tail:
+                position = tail
+
+            pos = position % capacity
+            if capacity - pos < _RECORD.size:
+                position += capacity - pos
+                continue
+
+            seq, length, kind = _RECORD.unpack_from(data, pos)
+            if kind == _KIND_WRAP:
+                if ring.tail <= position:
+                    position += capacity - pos
+                continue
+
+            view = data[pos + _RECORD.size:pos + _RECORD.size + length]
+            error = None
+            try:
+                record = decode(view) if decode is not None else bytes(view)
+            except Exception as e:
+                error = e
+            finally:
+                view.release()
+            if ring.tail > position:
+                # overwritten while being read, resync with the tail
+                continue
+
+            self._account(seq)
+            position += (_RECORD.size + length + 7) & ~7
+            if error is None:
+                records.append(record)
+            elif on_error is not None:
+                on_error(error)
+            else:
+                self._position = position
+                raise error
+
+        self._position = position
+        return records
+
+    def _account(self, seq):
+        if seq > self._next_seq:
+            missed = seq - self._next_seq
+            self._missed += missed
+            if self._on_overrun is not None:
+                self._on_overrun(missed)
+        self._next_seq = seq + 1
+
+
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        # python < 3.13 registers attached segments with the resource tracker,
+        # which would remove the segment once the attaching process exits
+        shm = shared_memory.SharedMemory(name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+class SharedMemorySender(Subscriber):
+
+    """
+    Subscriber forwarding the messages of a channel to SharedMemoryReceivers
+    in other processes. Messages are forwarded in batches and encoded with the
+    codec registered for the channel in `Hub.codecs`, the encoded buffers are
+    copied once into the shared memory segment.
+
+    :param str channel_name: name of the channel to forward, wildcards are
+                             not supported
+    :param int size: size of the shared memory segment in bytes default=1MiB
+    :param int queue_size: size of the internal queue default=0
+
+    >>> publisher = Publisher("ticks")
+    >>> sender = SharedMemorySender("ticks")
+    >>> await publisher.publish(b"tick")  # delivered to local subscribers and receivers
+    """
+
+    def __init__(self, channel_name, size=1 << 20, queue_size=0):
+        self._segment = None
+        self._readers_token = None
+        self._fifos = {}
+
+        super().__init__(channel_name, batch_callback=self._forward, queue_size=queue_size)
+        if is_pattern(channel_name):
+            raise ValueError("arg channel_name cannot contain wildcards")
+
+        self._segment = SharedRing(segment_name(channel_name), size, create=True)
+        self._dir = _readers_dir(self._segment.name)
+        os.makedirs(self._dir, exist_ok=True)
+
+    @property
+    def segment(self):
+        return self._segment
+
+    def _forward(self, messages):
+        encode, channel_name = self._hub.codecs.encode, self.channel_name
+        self._segment.write_many([encode(channel_name, message) for message in messages])
+        self._notify()
+
+    def _notify(self):
+        if self._segment.readers_token != self._readers_token:
+            self._readers_token = self._segment.readers_token
+            self._scan_readers()
+
+        for path, fd in list(self._fifos.items()):
+            try:
+                os.write(fd, b"\0")
+            except BlockingIOError:
+                # the pipe is full, the receiver has pending wakeups anyway
+                pass
+            except OSError:
+                self._drop_reader(path)
+
+    def _scan_readers(self):
+        for entry in os.listdir(self._dir):
+            path = os.path.join(self._dir, entry)
+            if path in self._fifos:
+                continue
+            try:
+                self._fifos[path] = os.open(path, os.O_WRONLY | os.O_NONBLOCK)
+            except OSError:
+                # ENXIO, the receiver is gone without cleaning up
+                self.logger.debug(f"removing stale reader {path}")
+                _unlink(path)
+
+    def _drop_reader(self, path):
+        os.close(self._fifos.pop(path))
+        _unlink(path)
+
+    def close(self):
+        """
+        Method for closing the sender and removing the shared memory segment,
+        receivers will not receive any further messages
+        """
+        for fd in self._fifos.values():
+            os.close(fd)
+        self._fifos.clear()
+        if self._segment is not None:
+            self._segment.close()
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._segment = None
+        super().close()
+
+
+class SharedMemoryReceiver(Publisher):
+
+    """
+    Publisher re-publishing the messages forwarded by a SharedMemorySender of
+    another process to the subscribers of this process. The receiver has to
+    be created after the sender and takes the role of the publisher of the
+    channel in this process. Messages are decoded directly from the shared
+    memory segment, see `Codec.decode_transient`.
+
+    :param str channel_name: name of the forwarded channel
+    :param int queue_size: size of internal queue default=0
+    :param int ring_size: size of the ring buffer, see Publisher default=0
+    :param Optional[callable] on_overrun: callable which will be invoked with
+                                          the number of missed messages when
+                                          the receiver falls behind the sender
+
+    >>> receiver = SharedMemoryReceiver("ticks")
+    >>> subscriber = Subscriber("ticks", lambda tick: print(tick))
+    """
+
+    def __init__(self, channel_name, queue_size=0, ring_size=0, on_overrun=None):
+        self._segment = None
+        self._fifo = None
+        self._fd = None
+
+        super().__init__(channel_name, queue_size=queue_size, ring_size=ring_size)
+        self._segment = SharedRing(segment_name(channel_name))
+        self._reader = self._segment.reader(on_overrun=on_overrun)
+
+        self._fifo = os.path.join(_readers_dir(self._segment.name), f"{os.getpid()}-{id(self)}")
+        os.mkfifo(self._fifo)
+        # opened for reading and writing so that the pipe never reports EOF
+        self._fd = os.open(self._fifo, os.O_RDWR | os.O_NONBLOCK)
+        self._segment.touch_readers()
+        self._loop.add_reader(self._fd, self._on_wakeup)
+
+    @property
+    def segment(self):
+        return self._segment
+
+    @property
+    def missed(self):
+        """
+        Total number of messages missed due to the receiver falling behind
+        """
+        return self._reader.missed
+
+    def _on_wakeup(self):
+        try:
+            while os.read(self._fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+        decode, channel_name = self._hub.codecs.decode, self.channel_name
+        messages = self._reader.read_many(lambda view: decode(channel_name, view, transient=True)[0],
+                                          self._on_decode_error)
+        if messages:
+            self.publish_many_nowait(messages)
+
+    def _on_decode_error(self, error):
+        self.logger.error(f"dropped a forwarded message which cannot be decoded, {error!r}")
+        if self._stats is not None:
+            self._stats.errors += 1
+
+    def close(self):
+        """
+        Method for closing the receiver and detaching it from the shared
+        memory segment
+        """
+        if self._fd is not None:
+            if not self._loop.is_closed():
+                self._loop.remove_reader(self._fd)
+            os.close(self._fd)
+            self._fd = None
+        if self._fifo is not None:
+            _unlink(self._fifo)
+            self._fifo = None
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+        super().close()
+
+
+def _unlink(path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
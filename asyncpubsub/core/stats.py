@@ -0,0 +1,101 @@
+# -*- coding : utf-8 -*-
+
+from bisect import bisect_left
+
+"""
+Lightweight instrumentation for publishers and subscribers. Entities only hold
+a stats object while instrumentation is enabled, therefore disabled
+instrumentation costs a single `is None` check on the hot paths.
+"""
+
+# Upper bounds (in seconds) of the callback latency histogram buckets
+LATENCY_BUCKETS = (1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 1e-1, 5e-1, 1.0, 5.0, float('inf'))
+
+
+class Histogram:
+
+    """
+    Histogram with fixed bucket boundaries
+
+    :param Sequence[float] buckets: sorted upper bounds of the buckets, the last
+                                    bound should be `inf` to catch all values
+    """
+
+    __slots__ = ('_buckets', '_counts', '_sum', '_count')
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self._buckets = tuple(buckets)
+        self._counts = [0] * len(self._buckets)
+        self._sum = 0.0
+        self._count = 0
+
+    @property
+    def count(self):
+        return self._count
+
+    @property
+    def sum(self):
+        return self._sum
+
+    def record(self, value):
+        self._counts[bisect_left(self._buckets, value)] += 1
+        self._sum += value
+        self._count += 1
+
+    def snapshot(self):
+        return {"buckets": self._buckets,
+                "counts": tuple(self._counts),
+                "count": self._count,
+                "sum": self._sum}
+
+
+class PublisherStats:
+
+    """
+    Counters of a publisher
+
+    published:        number of messages processed by the publisher
+    delivered:        number of messages handed over to subscribers
+    errors:           number of failed hand-overs to subscribers
+    queue_high_water: maximum number of messages found in the publisher queue
+    """
+
+    __slots__ = ('published', 'delivered', 'errors', 'queue_high_water')
+
+    def __init__(self):
+        self.published = 0
+        self.delivered = 0
+        self.errors = 0
+        self.queue_high_water = 0
+
+    def snapshot(self):
+        return {"published": self.published,
+                "delivered": self.delivered,
+                "errors": self.errors,
+                "queue_high_water": self.queue_high_water}
+
+
+class SubscriberStats:
+
+    """
+    Counters of a subscriber
+
+    delivered:        number of messages successfully processed by the callback
+    errors:           number of callback invocations which raised an exception
+    queue_high_water: maximum number of messages found in the subscriber queue
+    callback_latency: histogram of the callback durations in seconds
+    """
+
+    __slots__ = ('delivered', 'errors', 'queue_high_water', 'callback_latency')
+
+    def __init__(self):
+        self.delivered = 0
+        self.errors = 0
+        self.queue_high_water = 0
+        self.callback_latency = Histogram()
+
+    def snapshot(self):
+        return {"delivered": self.delivered,
+                "errors": self.errors,
+                "queue_high_water": self.queue_high_water,
+                "callback_latency": self.callback_latency.snapshot()}
@@ -1,10 +1,23 @@
 # -*- coding : utf-8 -*-
 
 import asyncio
+import heapq
+import time
+from collections import deque
+from concurrent.futures import Executor
 from functools import partial
+from operator import itemgetter
+from weakref import ref
 
-from asyncpubsub.core import EType, ChannelRegistrable, task_done_callback
+from asyncpubsub.core import EType, ChannelRegistrable, ClosedError, task_done_callback, run_processor
+from asyncpubsub.core.executor import ExecutorKind
 from asyncpubsub.core.hub import get_hub
+from asyncpubsub.core.operators import Operator
+from asyncpubsub.core.queue import MessageQueue, OverflowPolicy, Priority, QueueOverflowError, lane_depths
+from asyncpubsub.core.stats import SubscriberStats
+
+# Number of messages read at once from the log of a durable publisher
+_LOG_CHUNK = 1024
 
 
 class Subscriber(ChannelRegistrable):
@@ -14,7 +27,10 @@ class Subscriber(ChannelRegistrable):
     This class can be used to subscribe to a specific message channel which
     is being published in the process namespace.
 
-    :param str channel_name: name of the channel to subscribe
+    :param str channel_name: name of the channel to subscribe. The name can
+                             contain the wildcards `*` matching a single
+                             segment and `#` matching all the remaining
+                             segments of `.` separated channel names
     :param Optional[callable] callback: callable object which will be called
                                         when messages on the subscribed channel
                                         are received. If callback is None then
@@ -24,6 +40,66 @@ class Subscriber(ChannelRegistrable):
 
     :param int queue_size: size of the internal queue which will be used to
                            buffer messages default=0
+    :param OverflowPolicy overflow: policy applied when a message is received
+                                    while the queue is full
+                                    default=OverflowPolicy.DROP_OLDEST
+    :param Optional[callable] key: callable returning the conflation key of a
+                                   message, required for
+                                   OverflowPolicy.CONFLATE
+    :param Optional[callable] batch_callback: callable object which will be
+                                              called with a list of all the
+                                              messages buffered since the
+                                              previous call. Cannot be used
+                                              together with callback
+    :param int max_batch: maximum number of messages passed to a single
+                          batch_callback call, 0 means no limit default=0
+    :param Optional[callable] on_overrun: callable which will be invoked with
+                                          the number of missed messages when
+                                          the subscriber falls behind a
+                                          publisher using a ring buffer
+    :param int concurrency: maximum number of coroutine callbacks running at
+                            once default=1
+    :param Optional[callable] ordering_key: callable returning the ordering key
+                                            of a message. With concurrency,
+                                            messages with the same key are
+                                            processed sequentially in the order
+                                            they were received while messages
+                                            with different keys are processed
+                                            concurrently. If None the messages
+                                            are processed in any order
+    :param Union[ExecutorKind, concurrent.futures.Executor] executor: executor
+                            running synchronous callbacks. ExecutorKind.THREAD
+                            and ExecutorKind.PROCESS use the executors shared
+                            by the hub, see `Hub.set_executor`
+                            default=ExecutorKind.INLINE
+    :param Optional[callable] on_result: callable which will be invoked on the
+                                         event loop with the return value of
+                                         every successful callback, in the
+                                         order the messages were received
+    :param int replay: number of messages retained by the publishers of the
+                       channel which are delivered before the live messages,
+                       see the retain arg of `Publisher` default=0
+    :param Optional[int] from_offset: offset of the first message replayed
+                                      from the log of a durable publisher
+                                      before the live messages, see the
+                                      durable arg of `Publisher`. Without a
+                                      durable publisher of the channel the
+                                      log is replayed once one is created.
+                                      Cannot be used with wildcards or
+                                      replay default=None
+    :param Optional[Sequence[Operator]] operators: flow operators applied in
+                            the given order to the received messages before
+                            they are queued, see `asyncpubsub.core.operators`
+    :param Optional[Union[Match, callable]] where: filter evaluated by the
+                            publisher, only messages matching a Match or for
+                            which the predicate returns True are delivered,
+                            see `asyncpubsub.core.filters`
+    :param bool pull: if True the subscriber creates no processor task, the
+                      messages are pulled by the user with `get`, `get_many`
+                      or `async for`. Cannot be used together with callbacks
+                      default=False
+    :param Optional[Hub] hub: hub the subscriber is registered with, the hub
+                              returned by `get_hub` if None default=None
 
     .. note:: A callable cannot be a coroutine, it can be a synchronous
               function or a coroutine function.
@@ -34,28 +110,214 @@ class Subscriber(ChannelRegistrable):
                  rate of published messages vs. the rate at which the callback
                  is processing the messages.
                  In the case when queue is full and then a new message is
-                 received from the channel then the oldest message in the queue
+                 received from the channel then the overflow policy decides
+                 what happens, by default the oldest message in the queue
                  will be removed without invoking the callback function.
+                 The number of discarded messages can be read from the
+                 `dropped` property. With OverflowPolicy.BLOCK the publisher
+                 waits for the subscriber, which slows down every subscriber
+                 of the channel.
+
+    .. note:: With a concurrency greater than 1 up to `concurrency` messages
+              are taken from the queue before their callbacks complete,
+              including the messages waiting for a running callback with the
+              same ordering key. Synchronous callbacks are invoked one after
+              another unless they are run by an executor, the ordering key is
+              not used for batch callbacks. Use `wait_in_flight` for waiting
+              on the running callbacks.
+
+    .. note:: Replayed messages are delivered before any live message and are
+              not subject to queue_size and the overflow policy. With a
+              pattern the retained messages of all the matching publishers
+              are replayed in the order of their delivery.
+
+    .. note:: The filter cannot be changed once the subscriber is created.
+              Messages not passing the filter are never queued, the
+              retained messages are filtered before being replayed. Filters
+              are applied before the operators.
+
+    .. note:: Messages suppressed by an operator take no queue slot. Messages
+              emitted by an operator after a delay, e.g. by Debounce, are
+              queued in the Priority.NORMAL lane. Replayed messages are not
+              passed through the operators.
+
+    .. note:: Messages replayed from the log of a durable publisher are read
+              in chunks while the subscriber consumes them, the live messages
+              are queued in the meantime. Every message is received exactly
+              once; either from the log or live. The filter applies to the
+              replayed messages, the operators do not.
+
+    .. note:: Pulled messages are read directly from the buffers of the
+              subscriber, there is no intermediate queue. Only one coroutine
+              can wait for messages at a time. Cancelling a pending pull
+              does not consume a message.
+
+    .. note:: When subscribed to a publisher with a ring buffer the messages are
+              read directly from the buffer of the publisher and queue_size has
+              no effect. A subscriber falling behind by more than the size of
+              the ring buffer will miss messages, which is reported through
+              on_overrun and the `missed` property.
+
+    .. note:: The hub references the subscriber weakly, a subscriber which is
+              no longer referenced is closed once it is garbage collected.
+              See `close` and `aclose` for closing it deterministically.
 
     >>> subscriber = Subscriber("hello-world-channel", lambda msg: print(msg))
     hello world!
     hello world!
     hello world!
+
+    >>> subscriber = Subscriber("hello-world-channel", batch_callback=lambda msgs: print(msgs))
+    ['hello world!', 'hello world!', 'hello world!']
+
+    >>> subscriber = Subscriber("orders.*.fills", lambda msg: print(msg))
+
+    >>> subscriber = Subscriber("prices", on_price, queue_size=1000,
+    ...                         overflow=OverflowPolicy.CONFLATE,
+    ...                         key=lambda price: price.instrument)
+
+    >>> subscriber = Subscriber("orders", store_order, concurrency=16,
+    ...                         ordering_key=lambda order: order.account)
+    >>> await subscriber.wait_in_flight()
+
+    >>> subscriber = Subscriber("prices", refresh_ui, operators=[Throttle(0.1, trailing=True)])
+
+    >>> subscriber = Subscriber("fills", on_fill, where=Match("account", "ACC-1"))
+
+    >>> subscriber = Subscriber("audit", store_event, from_offset=last_stored + 1)
+
+    >>> subscriber = Subscriber("orders", pull=True)
+    >>> async for order in subscriber:
+    ...     await store_order(order)
+    >>> orders = await subscriber.get_many(100, timeout=1.0)
+
+    >>> subscriber = Subscriber("images", make_thumbnail, concurrency=4,
+    ...                         executor=ExecutorKind.PROCESS, on_result=store_thumbnail)
     """
 
-    def __init__(self, channel_name, callback=None, queue_size=0):
+    def __init__(self, channel_name, callback=None, queue_size=0,
+                 batch_callback=None, max_batch=0, on_overrun=None,
+                 overflow=OverflowPolicy.DROP_OLDEST, key=None,
+                 concurrency=1, ordering_key=None, executor=ExecutorKind.INLINE,
+                 on_result=None, replay=0, from_offset=None, operators=None, where=None,
+                 pull=False, hub=None):
 
         self.__processor_task = None
+        self._hub = None
+        self._closed = False
+        self._callback = None
+        self._batch_callback = None
+        self._max_batch = 0
+        self._on_overrun = on_overrun
+        self._readers = []
+        self._missed = 0
+        self._waiter = None
+        self._waiter_readers = ()
+        self._stats = None
+        self._concurrency = concurrency
+        self._ordering_key = ordering_key
+        self._in_flight = set()
+        self._key_queues = {}
+        self._outstanding = 0
+        self._slot_waiter = None
+        self._executor = None
+        self._on_result = on_result
+        self._results = {}
+        self._next_seq = 0
+        self._result_seq = 0
+        self._is_async = False
+        self._dispatcher = None
+        self._replay = deque()
+        self._log_reader = None
+        self._from_offset = None
+        self._operators = None
+        self._where = None
+        self._pull = pull
+        self._busy = False
+        self._barriers = []
 
         super().__init__(channel_name, EType.SUBSCRIBER)
-        self._msg_queue = asyncio.Queue(maxsize=queue_size)
-        self._hub = get_hub()
+        self._msg_queue = MessageQueue(maxsize=queue_size, policy=overflow, key=key)
+        self._hub = hub if hub is not None else get_hub()
+
+        if callback is not None and batch_callback is not None:
+            raise ValueError("args callback and batch_callback cannot be used together")
+
+        if pull and (callback is not None or batch_callback is not None):
+            raise ValueError("arg pull cannot be used together with callbacks")
+
+        if not isinstance(concurrency, int) or concurrency < 1:
+            raise ValueError("arg concurrency must be a positive int")
+
+        if ordering_key is not None and not callable(ordering_key):
+            raise TypeError("arg ordering_key must be a callable")
+
+        if not isinstance(replay, int) or replay < 0:
+            raise ValueError("arg replay must be a non-negative int")
+
+        if from_offset is not None:
+            if not isinstance(from_offset, int) or from_offset < 0:
+                raise ValueError("arg from_offset must be a non-negative int")
+            if replay:
+                raise ValueError("args replay and from_offset cannot be used together")
+            if self.is_pattern:
+                raise ValueError("arg from_offset cannot be used with wildcards")
+
+        if on_result is not None and not callable(on_result):
+            raise TypeError("arg on_result must be a callable")
+
+        if where is not None and not callable(where):
+            raise TypeError("arg where must be a Match or a callable")
+        self._where = where
+
+        if isinstance(executor, ExecutorKind):
+            self._executor = self._hub.get_executor(executor)
+        elif isinstance(executor, Executor):
+            self._executor = executor
+        else:
+            raise TypeError("arg executor must be of type ExecutorKind or concurrent.futures.Executor")
+
+        if operators is not None:
+            operators = list(operators)
+            if not all(isinstance(operator, Operator) for operator in operators):
+                raise TypeError("arg operators must only contain Operator instances")
+            for i, operator in enumerate(operators):
+                operator.bind(partial(self._emit_late, i + 1), self._hub.timers)
+            self._operators = operators or None
+
         self._hub.register(self)
 
+        if self._hub.stats_enabled:
+            self.enable_stats()
+
+        for publisher in self._hub.get_publishers(self):
+            ring = getattr(publisher, 'ring', None)
+            if ring is not None:
+                self.attach_ring(ring)
+
+        # The retained messages were all delivered before the registration
+        # above, the following messages are delivered live
+        if replay:
+            self._replay.extend(self._retained(replay))
+
+        # Likewise the messages before the offset of the durable publisher
+        # were delivered before the registration
+        if from_offset is not None:
+            self._from_offset = from_offset
+            publisher = self._hub.get_publisher(channel_name)
+            if getattr(publisher, 'log', None) is not None:
+                self.attach_log(publisher.log, publisher.offset)
+
         if callback is not None:
             self.set_callback(callback)
 
-        self.__processor_task = asyncio.ensure_future(self._queue_processor())
+        if batch_callback is not None:
+            self.set_batch_callback(batch_callback, max_batch=max_batch)
+
+        if pull:
+            return
+
+        self.__processor_task = asyncio.ensure_future(run_processor(ref(self)))
         self.__processor_task.add_done_callback(
                                     partial(task_done_callback,
                                             channel_name + '-subscriber-task'))
@@ -64,19 +326,219 @@ class Subscriber(ChannelRegistrable):
     def publisher(self):
         if not self._hub.is_mapped_channel_registrable(self):
             return None
-        publishers = self._hub.get_registered(channels=[self.channel_name],
-                                              etype=EType.PUBLISHER)
-        assert len(publishers) == 1, ("This should never happen, how did "
-                                      "this happen o_O ?")
-        return publishers[0]
+        return self._hub.get_publisher(self.channel_name)
+
+    @property
+    def publishers(self):
+        return self._hub.get_publishers(self)
+
+    @property
+    def overflow(self):
+        return self._msg_queue.policy
+
+    @property
+    def dropped(self):
+        """
+        Number of messages discarded due to the queue being full
+        """
+        return self._msg_queue.dropped
+
+    @property
+    def conflated(self):
+        """
+        Number of messages replaced by a newer message with the same key
+        """
+        return self._msg_queue.conflated
+
+    @property
+    def lag(self):
+        """
+        Number of messages published on ring buffers which are not yet read
+        by the subscriber
+        """
+        return sum(reader.lag for reader in self._readers)
+
+    @property
+    def missed(self):
+        """
+        Total number of messages missed by the subscriber due to ring buffer
+        overruns
+        """
+        return self._missed + sum(reader.missed for reader in self._readers)
+
+    @property
+    def concurrency(self):
+        return self._concurrency
+
+    @property
+    def executor(self):
+        return self._executor
+
+    @property
+    def in_flight(self):
+        """
+        Number of messages taken from the queue whose callbacks have not
+        completed yet, only used with a concurrency greater than 1
+        """
+        return self._outstanding
+
+    async def wait_in_flight(self):
+        """
+        Coroutine which waits until all the running callbacks have completed,
+        including the callbacks of messages waiting for their ordering key
+        """
+        while self._in_flight:
+            await asyncio.wait(set(self._in_flight))
+
+    def barrier(self, buffers=False):
+        """
+        Method returns a future resolved once every message queued so far has
+        been processed, i.e. its callback has completed, it was pulled or it
+        was discarded. Used by publishers for tracking the completion of the
+        delivered messages
+
+        :param bool buffers: if True the replayed messages and the messages of
+                             ring buffers have to be processed as well
+                             default=False
+        :rtype: asyncio.Future
+        """
+        barrier = _Barrier(self._msg_queue.positions(), buffers, asyncio.get_event_loop().create_future())
+        self._barriers.append(barrier)
+        self._check_barriers()
+        return barrier.future
+
+    async def drain(self):
+        """
+        Coroutine which waits until every message received so far has been
+        processed, including the replayed messages, the unread messages of
+        ring buffers and the running callbacks. Messages received while
+        waiting are only waited for if they are read from a ring buffer.
+        Messages held back by an operator, e.g. by Debounce, are not waited for
+        """
+        await self.barrier(buffers=True)
+
+    def _check_barriers(self):
+        """
+        Internal method resolving the barriers whose messages were processed,
+        invoked whenever the subscriber completed a message
+        """
+        queue = self._msg_queue
+        pending = []
+        for barrier in self._barriers:
+            if barrier.future.done():
+                continue
+            if barrier.tasks is None:
+                if (self._busy or not queue.reached(barrier.positions)
+                        or (barrier.buffers and not self._buffers_empty())):
+                    pending.append(barrier)
+                    continue
+                # The messages taken so far are completed once the callbacks
+                # running at this point are
+                barrier.tasks = set(self._in_flight)
+            else:
+                barrier.tasks &= self._in_flight
+            if barrier.tasks:
+                pending.append(barrier)
+            else:
+                barrier.future.set_result(None)
+        self._barriers = pending
+
+    def _buffers_empty(self):
+        return (not self._replay and self._log_reader is None
+                and all(reader.empty() for reader in self._readers))
+
+    @property
+    def stats(self):
+        """
+        Returns the counters of the subscriber, None if instrumentation is disabled
+
+        :rtype: Optional[asyncpubsub.core.stats.SubscriberStats]
+        """
+        return self._stats
+
+    def enable_stats(self):
+        """
+        Method for enabling the instrumentation of the subscriber, existing
+        counters are kept
+        """
+        if self._stats is None:
+            self._stats = SubscriberStats()
+
+    def disable_stats(self):
+        """
+        Method for disabling the instrumentation of the subscriber, the
+        counters are discarded
+        """
+        self._stats = None
+
+    def get_stats(self):
+        """
+        Method returns a snapshot of the subscriber counters
+
+        :rtype: Optional[dict]
+        """
+        if self._stats is None:
+            return None
+        snapshot = self._stats.snapshot()
+        snapshot.update(dropped=self.dropped, conflated=self.conflated, missed=self.missed,
+                        queue_depth=self._msg_queue.qsize(), lane_depths=lane_depths(self._msg_queue),
+                        lag=self.lag)
+        return snapshot
 
     def set_callback(self, callback):
         """
-        Method for setting callback for the message received over the channel
+        Method for setting callback for the message received over the channel.
+        Setting a callback replaces any previously set batch callback
 
         :param callable callback: callable which will be invoked when a new
                                   message is received over the channel
         """
+        self._validate_callback(callback)
+        if self._pull:
+            raise ValueError("callbacks cannot be set for a pull subscriber")
+        self._callback = callback
+        self._batch_callback = None
+        self._resolve_dispatcher(callback)
+
+    def set_batch_callback(self, callback, max_batch=0):
+        """
+        Method for setting a batch callback for the messages received over the
+        channel. The callback is invoked once per wakeup of the subscriber with
+        a list of the buffered messages. Setting a batch callback replaces any
+        previously set callback
+
+        :param callable callback: callable which will be invoked with a list
+                                  of new messages received over the channel
+        :param int max_batch: maximum number of messages passed to a single
+                              call, 0 means no limit default=0
+        """
+        self._validate_callback(callback)
+        if self._pull:
+            raise ValueError("callbacks cannot be set for a pull subscriber")
+
+        if not isinstance(max_batch, int) or max_batch < 0:
+            raise ValueError("arg max_batch must be a non-negative int")
+
+        self._batch_callback = callback
+        self._max_batch = max_batch
+        self._callback = None
+        self._resolve_dispatcher(callback)
+
+    def _resolve_dispatcher(self, callback):
+        # Resolved once per callback instead of once per message. Only
+        # synchronous callbacks running on the event loop can be invoked by
+        # eager publishers. The functions are stored unbound, a bound method
+        # would keep the subscriber alive through a reference cycle
+        self._is_async = asyncio.iscoroutinefunction(callback)
+        if self._is_async or self._executor is not None:
+            self._dispatcher = None
+        elif self._batch_callback is not None:
+            self._dispatcher = type(self)._dispatch_batch_inline
+        else:
+            self._dispatcher = type(self)._dispatch_inline
+
+    @staticmethod
+    def _validate_callback(callback):
         if not callable(callback):
             raise TypeError("arg callback must be a callable")
 
@@ -84,35 +546,658 @@ class Subscriber(ChannelRegistrable):
             raise TypeError(("callback cannot be a coroutine, provide a"
                             " coroutinefunction instead"))
 
-        self._callback = callback
+    @property
+    def where(self):
+        return self._where
+
+    def _accepts(self, message):
+        try:
+            return self._where(message)
+        except Exception:
+            self.logger.exception("filter raised an exception")
+            return False
+
+    @property
+    def operators(self):
+        return list(self._operators or ())
+
+    def _apply_operators(self, messages, start=0):
+        """
+        Internal method returning the messages passed by the operators
+        following the start index
+        """
+        operators = self._operators[start:]
+        passed = []
+        for message in messages:
+            for operator in operators:
+                if not operator.push(message):
+                    break
+            else:
+                passed.append(message)
+        return passed
+
+    def _emit_late(self, start, message):
+        """
+        Internal method queueing a message emitted by an operator after a delay
+        """
+        if not self._apply_operators((message,), start):
+            return
+        try:
+            self._msg_queue.put_nowait(message)
+        except asyncio.QueueFull:
+            asyncio.ensure_future(self._msg_queue.put(message))
+        except QueueOverflowError as e:
+            self.logger.error(f"dropped message emitted by an operator, {e}")
+        self._wakeup()
+
+    def try_dispatch(self, messages):
+        """
+        Method used by eager publishers for invoking the callback of the
+        subscriber directly instead of queueing the messages. Only possible
+        for synchronous callbacks while the subscriber has no queued messages
+
+        :param list messages: messages published together
+        :returns: True if the callback was invoked, False if the messages have
+                  to be queued
+        :rtype: bool
+        """
+        dispatcher = self._dispatcher
+        if (dispatcher is None or self._replay or self._log_reader is not None or self._readers
+                or not self._msg_queue.empty()):
+            return False
+        if self._operators is not None:
+            messages = self._apply_operators(messages)
+            if not messages:
+                return True
+        dispatcher(self, messages)
+        return True
 
-    def notify(self, message):
+    def _dispatch_inline(self, messages):
+        callback = self._callback
+        for message in messages:
+            self._call(callback, message, 1, self._take_seq())
+
+    def _dispatch_batch_inline(self, messages):
+        step = self._max_batch or len(messages)
+        for i in range(0, len(messages), step):
+            batch = messages[i:i + step]
+            self._call(self._batch_callback, batch, len(batch), self._take_seq())
+
+    def notify(self, message, priority=Priority.NORMAL):
         """
         Method used for updating the subscribers internal message queue.
         For most use cases the user does not need to call this method as the
         internal queue will be updated directly by the publisher.
+
+        :param Any message: message received over the channel
+        :param Priority priority: lane of the message default=Priority.NORMAL
+
+        :raises: asyncio.QueueFull if the queue is full with OverflowPolicy.BLOCK
+        :raises: QueueOverflowError if the queue is full with OverflowPolicy.RAISE
         """
+        if self._operators is not None and not self._apply_operators((message,)):
+            return
+
         # If the queue is full then it indicates that the callback is not
-        # processing messages fast enough. In such cases the oldest messages
-        # will be popped from the queue.
-        if self._msg_queue.full():
-            self._msg_queue.get_nowait()
+        # processing messages fast enough. In such cases the overflow policy
+        # of the queue is applied.
+        try:
+            self._msg_queue.put_nowait(message, priority)
+        finally:
+            self._wakeup()
+            if self._stats is not None:
+                self._observe_queue_depth()
+
+    def notify_many(self, messages, priority=Priority.NORMAL):
+        """
+        Method used for updating the subscribers internal message queue with
+        multiple messages at once, the subscriber is woken up at most once for
+        the whole batch. Overflowing messages are handled the same way as in
+        `notify`
+
+        :param Sequence[Any] messages: messages received over the channel
+        :param Priority priority: lane of the messages default=Priority.NORMAL
+        :returns: messages which could not be queued without waiting, only
+                  possible with OverflowPolicy.BLOCK. These have to be
+                  queued with `put_many`
+        :rtype: list
+        :raises: QueueOverflowError if the queue is full with OverflowPolicy.RAISE
+        """
+        if not isinstance(messages, (list, tuple)):
+            messages = list(messages)
+        if self._operators is not None:
+            messages = self._apply_operators(messages)
+            if not messages:
+                return messages
+        try:
+            done = self._msg_queue.put_many_nowait(messages, priority)
+        finally:
+            self._wakeup()
+            if self._stats is not None:
+                self._observe_queue_depth()
+        return messages[done:]
+
+    async def put(self, message, priority=Priority.NORMAL):
+        """
+        Coroutine used for updating the subscribers internal message queue,
+        waits for space in the queue with OverflowPolicy.BLOCK.
+
+        :param Any message: message received over the channel
+        :param Priority priority: lane of the message default=Priority.NORMAL
+
+        :raises: QueueOverflowError if the queue is full with OverflowPolicy.RAISE
+        """
+        await self._msg_queue.put(message, priority)
+        self._wakeup()
+        if self._stats is not None:
+            self._observe_queue_depth()
+
+    async def put_many(self, messages, priority=Priority.NORMAL):
+        """
+        Coroutine used for updating the subscribers internal message queue with
+        multiple messages, waits for space in the queue with OverflowPolicy.BLOCK.
 
-        self._msg_queue.put_nowait(message)
+        :param Sequence[Any] messages: messages received over the channel
+        :param Priority priority: lane of the messages default=Priority.NORMAL
 
-    async def _queue_processor(self):
+        :raises: QueueOverflowError if the queue is full with OverflowPolicy.RAISE
+        """
+        for message in messages:
+            await self.put(message, priority)
+
+    def attach_ring(self, ring):
+        """
+        Method used for reading the messages of a channel directly from the
+        ring buffer of its publisher. For most use cases the user does not
+        need to call this method as the ring buffer will be attached when the
+        subscriber is mapped to a publisher
+
+        :param asyncpubsub.core.ring.RingBuffer ring: ring buffer to be read
+        """
+        if any(reader.ring is ring for reader in self._readers):
+            return
+
+        # Readers of closed buffers are kept until all the retained messages are read
+        readers = []
+        for reader in self._readers:
+            if reader.ring.closed and reader.empty():
+                self._missed += reader.missed
+            else:
+                readers.append(reader)
+        self._readers = readers
+        self._readers.append(ring.reader(on_overrun=self._handle_overrun))
+        self._wakeup()
+
+    def attach_log(self, log, end_offset):
+        """
+        Method used for replaying the log of a durable publisher from the
+        offset given by the from_offset arg, the log is only replayed once.
+        For most use cases the user does not need to call this method as the
+        log will be attached when the subscriber is mapped to a durable
+        publisher
+
+        :param asyncpubsub.core.durable.SegmentLog log: log to be replayed
+        :param int end_offset: offset of the first message delivered live
+        """
+        if self._from_offset is None:
+            return
+        self._log_reader = log.reader(self._from_offset, end_offset)
+        self._from_offset = None
+        self._wakeup()
+
+    def _retained(self, n):
+        """
+        Internal method returns the n most recent messages retained by the
+        publishers of the channel, merged by their delivery time
+        """
+        histories = []
+        for publisher in self._hub.get_publishers(self):
+            retention = getattr(publisher, 'retention', None)
+            if retention is None:
+                continue
+            if self._where is None:
+                histories.append(retention.entries(n))
+            else:
+                histories.append([entry for entry in retention.entries() if self._accepts(entry[1])][-n:])
+
+        if len(histories) == 1:
+            entries = histories[0]
+        else:
+            entries = list(heapq.merge(*histories, key=itemgetter(0)))[-n:]
+        return [message for _, message in entries]
+
+    def _read_log(self):
+        """
+        Internal method reading the next chunk of the log into the replayed
+        messages, returns False once the log is replayed
+        """
+        while not self._replay:
+            messages = self._log_reader.read(_LOG_CHUNK)
+            if not messages:
+                self._log_reader = None
+                return False
+            if self._where is not None:
+                messages = [message for message in messages if self._accepts(message)]
+            self._replay.extend(messages)
+        return True
+
+    def _handle_overrun(self, missed):
+        self.logger.warning(f"missed {missed} messages, subscriber is not keeping up with the publisher")
+        if self._on_overrun is not None:
+            self._on_overrun(missed)
+
+    def _observe_queue_depth(self):
+        depth = self._msg_queue.qsize()
+        if depth > self._stats.queue_high_water:
+            self._stats.queue_high_water = depth
+
+    def _wakeup(self):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def _get_nowait(self):
+        if self._replay or (self._log_reader is not None and self._read_log()):
+            return self._replay.popleft()
+        for reader in self._readers:
+            # messages of ring buffers are not queued, the filter and the
+            # operators are applied when they are read
+            while not reader.empty():
+                message = reader.get_nowait()
+                if self._where is not None and not self._accepts(message):
+                    continue
+                if self._operators is None or self._apply_operators((message,)):
+                    return message
+        return self._msg_queue.get_nowait()
+
+    def _set_waiter(self):
+        """
+        Internal method returning a future resolved once further messages are
+        available
+        """
+        if self._waiter is not None:
+            raise RuntimeError("another coroutine is already waiting for messages")
+        waiter = self._waiter = asyncio.get_event_loop().create_future()
+        readers = self._waiter_readers = tuple(self._readers)
+        for reader in readers:
+            reader.ring.add_waiter(waiter)
+        return waiter
+
+    def _clear_waiter(self):
+        for reader in self._waiter_readers:
+            reader.ring.remove_waiter(self._waiter)
+        self._waiter_readers = ()
+        self._waiter = None
+
+    async def _get(self, timeout=None):
+        deadline = None
         while True:
-            message = await self._msg_queue.get()
+            try:
+                return self._get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+
+            if self._closed:
+                raise ClosedError(f"{self} is closed")
+
+            waiter = self._set_waiter()
+            expiry = None
+            if timeout is not None:
+                loop = asyncio.get_event_loop()
+                if deadline is None:
+                    deadline = loop.time() + timeout
+                expiry = loop.call_at(deadline, _expire, waiter)
+            try:
+                await waiter
+            finally:
+                if expiry is not None:
+                    expiry.cancel()
+                if self._waiter is waiter:
+                    self._clear_waiter()
+
+    @property
+    def pull(self):
+        return self._pull
+
+    def _check_pull(self):
+        if not self._pull:
+            raise RuntimeError("messages can only be pulled from subscribers created with pull=True")
+
+    def get_nowait(self):
+        """
+        Method returns the next message of a pull subscriber
+
+        :raises: asyncio.QueueEmpty if no message is available
+        """
+        self._check_pull()
+        message = self._get_nowait()
+        if self._stats is not None:
+            self._stats.delivered += 1
+        if self._barriers:
+            self._check_barriers()
+        return message
+
+    async def get(self, timeout=None):
+        """
+        Coroutine returning the next message of a pull subscriber, waits for
+        a message
+
+        :param Optional[float] timeout: maximum number of seconds to wait,
+                                        no limit if None default=None
+        :raises: asyncio.TimeoutError
+        :raises: ClosedError if the subscriber is closed and no message is left
+        """
+        self._check_pull()
+        message = await self._get(timeout)
+        if self._stats is not None:
+            self._stats.delivered += 1
+        if self._barriers:
+            self._check_barriers()
+        return message
+
+    async def get_many(self, max_n=0, timeout=None):
+        """
+        Coroutine returning all the available messages of a pull subscriber,
+        waits until at least one message is available
 
-            if self._callback is None:
+        :param int max_n: maximum number of messages to be returned, 0 means
+                          no limit default=0
+        :param Optional[float] timeout: maximum number of seconds to wait,
+                                        no limit if None default=None
+        :rtype: list
+        :raises: asyncio.TimeoutError
+        :raises: ClosedError if the subscriber is closed and no message is left
+        """
+        self._check_pull()
+        if not isinstance(max_n, int) or max_n < 0:
+            raise ValueError("arg max_n must be a non-negative int")
+        batch = self._take_batch(await self._get(timeout), max_n)
+        if self._stats is not None:
+            self._stats.delivered += len(batch)
+        if self._barriers:
+            self._check_barriers()
+        return batch
+
+    def __aiter__(self):
+        self._check_pull()
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self.get()
+        except ClosedError:
+            raise StopAsyncIteration
+
+    async def _process(self):
+        """
+        Internal method processing the available messages, returns a future
+        resolved once further messages are available, see `run_processor`
+        """
+        if self._waiter is not None:
+            self._clear_waiter()
+        while True:
+            # every message taken so far was processed or is in flight
+            self._busy = False
+            if self._barriers:
+                self._check_barriers()
+            if self._log_reader is not None and not self._replay:
+                # the log is replayed one chunk per iteration of the event loop
+                await asyncio.sleep(0)
+            try:
+                message = self._get_nowait()
+            except asyncio.QueueEmpty:
+                return self._set_waiter()
+            self._busy = True
+
+            if self._batch_callback is not None:
+                callback, arg = self._batch_callback, self._take_batch(message, self._max_batch)
+                n_messages = len(arg)
+            else:
+                callback, arg = self._callback, message
+                n_messages = 1
+
+            if callback is None:
                 continue
 
-            if asyncio.iscoroutinefunction(self._callback):
-                await self._callback(message)
+            seq = self._take_seq()
+            if not self._is_async and self._executor is None:
+                self._call(callback, arg, n_messages, seq)
+            elif self._concurrency > 1:
+                await self._dispatch(callback, arg, n_messages, seq)
             else:
-                self._callback(message)
+                await self._invoke(callback, arg, n_messages, seq)
 
-    def __del__(self):
-        if self.__processor_task and not self.__processor_task.done():
+    def _take_seq(self):
+        # Sequence numbers are only needed for ordering the results
+        if self._on_result is None:
+            return None
+        seq = self._next_seq
+        self._next_seq += 1
+        return seq
+
+    def _call(self, callback, arg, n_messages, seq):
+        """
+        Internal method invoking a synchronous callback on the event loop
+        """
+        stats = self._stats
+        if stats is not None:
+            start = time.perf_counter()
+
+        ok, result = False, None
+        try:
+            result = callback(arg)
+        except Exception:
+            self.logger.exception("callback raised an exception")
+            if stats is not None:
+                stats.errors += 1
+        else:
+            ok = True
+            if stats is not None:
+                stats.delivered += n_messages
+
+        if stats is not None:
+            stats.callback_latency.record(time.perf_counter() - start)
+
+        if seq is not None:
+            self._complete(seq, ok, result)
+
+    async def _invoke(self, callback, arg, n_messages, seq=None):
+        """
+        Internal method awaiting a coroutine callback or a callback run by
+        the executor of the subscriber
+        """
+        stats = self._stats
+        if stats is not None:
+            start = time.perf_counter()
+
+        # Errors raised by the callback are logged, the subscriber
+        # continues processing the following messages
+        ok, result = False, None
+        try:
+            if self._is_async:
+                result = await callback(arg)
+            else:
+                result = await asyncio.get_event_loop().run_in_executor(self._executor, callback, arg)
+        except Exception:
+            self.logger.exception("callback raised an exception")
+            if stats is not None:
+                stats.errors += 1
+        else:
+            ok = True
+            if stats is not None:
+                stats.delivered += n_messages
+
+        if stats is not None:
+            stats.callback_latency.record(time.perf_counter() - start)
+
+        if seq is not None:
+            self._complete(seq, ok, result)
+
+    def _complete(self, seq, ok, result):
+        """
+        Internal method passing the results of the callbacks to on_result in
+        the order of their sequence numbers
+        """
+        self._results[seq] = (ok, result)
+        while self._result_seq in self._results:
+            ok, result = self._results.pop(self._result_seq)
+            self._result_seq += 1
+            if not ok:
+                continue
+            try:
+                self._on_result(result)
+            except Exception:
+                self.logger.exception("on_result raised an exception")
+
+    async def _dispatch(self, callback, arg, n_messages, seq):
+        """
+        Internal method which runs a callback as a separate task once fewer
+        than `concurrency` messages are outstanding. Messages with the
+        ordering key of a running callback are queued behind it.
+        """
+        while self._outstanding >= self._concurrency:
+            self._slot_waiter = asyncio.get_event_loop().create_future()
+            await self._slot_waiter
+        self._outstanding += 1
+
+        if self._ordering_key is None or callback is not self._callback:
+            task = asyncio.ensure_future(self._run(callback, arg, n_messages, seq))
+        else:
+            try:
+                key = self._ordering_key(arg)
+            except Exception:
+                self.logger.exception("ordering_key raised an exception")
+                self._release()
+                if self._stats is not None:
+                    self._stats.errors += 1
+                if seq is not None:
+                    self._complete(seq, False, None)
+                return
+
+            pending = self._key_queues.get(key)
+            if pending is not None:
+                pending.append((arg, seq))
+                return
+            self._key_queues[key] = deque()
+            task = asyncio.ensure_future(self._run_ordered(callback, key, arg, seq))
+
+        self._in_flight.add(task)
+        task.add_done_callback(self._task_done)
+
+    def _task_done(self, task):
+        self._in_flight.discard(task)
+        if self._barriers:
+            self._check_barriers()
+
+    async def _run(self, callback, arg, n_messages, seq):
+        try:
+            await self._invoke(callback, arg, n_messages, seq)
+        finally:
+            self._release()
+
+    async def _run_ordered(self, callback, key, message, seq):
+        pending = self._key_queues[key]
+        try:
+            while True:
+                try:
+                    await self._invoke(callback, message, 1, seq)
+                finally:
+                    self._release()
+                if not pending:
+                    break
+                message, seq = pending.popleft()
+        finally:
+            del self._key_queues[key]
+
+    def _release(self):
+        self._outstanding -= 1
+        if self._slot_waiter is not None and not self._slot_waiter.done():
+            self._slot_waiter.set_result(None)
+
+    def _take_batch(self, message, max_n):
+        batch = [message]
+        while len(batch) != max_n:
+            try:
+                batch.append(self._get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def close(self):
+        """
+        Method closing the subscriber: the processor task and the running
+        callbacks are cancelled, the subscriber is deregistered and the
+        buffered messages are discarded. Pending pulls raise ClosedError.
+        Closing a closed subscriber has no effect
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._hub is None:
+            # the initialization failed before the registration
+            return
+
+        if self.__processor_task is not None and not self.__processor_task.done():
             self.__processor_task.cancel()
+        for task in self._in_flight:
+            task.cancel()
+        for operator in self._operators or ():
+            operator.close()
         self._hub.deregister(self)
+
+        self._msg_queue.clear()
+        self._replay.clear()
+        self._log_reader = None
+        for reader in self._readers:
+            self._missed += reader.missed
+        # a pending pull wakes up and raises ClosedError
+        self._wakeup()
+        if self._waiter is not None:
+            self._clear_waiter()
+        self._readers = []
+        for barrier in self._barriers:
+            if not barrier.future.done():
+                barrier.future.set_result(None)
+        self._barriers = []
+
+    async def aclose(self):
+        """
+        Coroutine closing the subscriber, see `close`, which waits until the
+        cancelled tasks of the subscriber have finished. No callback of the
+        subscriber is running once it returns. Buffered messages are discarded,
+        use `drain` before for processing them
+        """
+        tasks = [task for task in (self.__processor_task, *self._in_flight)
+                 if task is not None and not task.done()]
+        self.close()
+        if tasks:
+            await asyncio.wait(tasks)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    def __del__(self):
+        self.close()
+
+
+class _Barrier:
+
+    __slots__ = ('positions', 'buffers', 'future', 'tasks')
+
+    def __init__(self, positions, buffers, future):
+        self.positions = positions
+        self.buffers = buffers
+        self.future = future
+        # callbacks still running once all the messages were taken
+        self.tasks = None
+
+
+def _expire(waiter):
+    if not waiter.done():
+        waiter.set_exception(asyncio.TimeoutError())
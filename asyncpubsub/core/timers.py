@@ -0,0 +1,123 @@
+# -*- coding : utf-8 -*-
+
+import asyncio
+import heapq
+import logging
+from itertools import count
+
+_LOGGER = logging.getLogger('asyncpubsub.timers')
+
+
+class TimerQueue:
+
+    """
+    Timers shared by the entities of a hub. All the pending timers are kept
+    in a single heap and only the earliest deadline is scheduled on the event
+    loop, instead of one sleeping task or loop handle per timer. NOT
+    thread-safe.
+
+    :param Optional[asyncio.AbstractEventLoop] loop: event loop running the
+                                                     timers, the current loop
+                                                     if None
+
+    >>> timers = get_hub().timers
+    >>> timer = timers.call_later(0.1, refresh)
+    >>> timers.cancel(timer)
+    """
+
+    def __init__(self, loop=None):
+        self._loop = loop if loop is not None else asyncio.get_event_loop()
+        self._heap = []
+        self._counter = count()
+        self._handle = None
+        self._armed_at = None
+
+    @property
+    def loop(self):
+        return self._loop
+
+    def time(self):
+        """
+        Returns the current time of the event loop, used as the clock of the timers
+        """
+        return self._loop.time()
+
+    def __len__(self):
+        return sum(1 for entry in self._heap if entry[2] is not None)
+
+    def call_at(self, when, callback):
+        """
+        Method for invoking a callback at a given loop time
+
+        :param float when: deadline in loop time, see `time`
+        :param callable callback: callable invoked without arguments
+        :returns: timer which can be passed to `cancel`
+        """
+        entry = [when, next(self._counter), callback]
+        heapq.heappush(self._heap, entry)
+        if self._armed_at is None or when < self._armed_at:
+            self._arm()
+        return entry
+
+    def call_later(self, delay, callback):
+        """
+        Method for invoking a callback after a given delay in seconds
+
+        :param float delay: delay in seconds
+        :param callable callback: callable invoked without arguments
+        :returns: timer which can be passed to `cancel`
+        """
+        return self.call_at(self._loop.time() + delay, callback)
+
+    @staticmethod
+    def cancel(timer):
+        # Cancelled timers stay in the heap until their deadline is reached
+        timer[2] = None
+
+    def clear(self):
+        """
+        Method cancels all the pending timers
+        """
+        for entry in self._heap:
+            entry[2] = None
+        self._heap.clear()
+        if self._handle is not None:
+            self._handle.cancel()
+        self._handle = None
+        self._armed_at = None
+
+    def _arm(self):
+        heap = self._heap
+        while heap and heap[0][2] is None:
+            heapq.heappop(heap)
+
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+            self._armed_at = None
+
+        if heap:
+            self._armed_at = heap[0][0]
+            self._handle = self._loop.call_at(self._armed_at, self._run)
+
+    def _run(self):
+        # The loop may run the handle up to its clock resolution early, every
+        # timer due at the armed deadline is therefore considered expired
+        limit = max(self._loop.time(), self._armed_at)
+        self._handle = None
+        self._armed_at = None
+
+        heap = self._heap
+        while heap and heap[0][0] <= limit:
+            entry = heapq.heappop(heap)
+            callback = entry[2]
+            if callback is None:
+                continue
+            entry[2] = None
+            try:
+                callback()
+            except Exception:
+                _LOGGER.exception("timer callback raised an exception")
+
+        # callbacks may have armed the handle for a timer expired above
+        self._arm()
@@ -0,0 +1,185 @@
+# -*- coding : utf-8 -*-
+
+"""
+Utilities for hierarchical channel names. Channel names can be composed of
+segments separated by `.`, subscribers can use the wildcards `*` which
+matches exactly one segment and `#` which matches zero or more trailing
+segments. e.g. `orders.*.fills` matches `orders.eu.fills` and `orders.#`
+matches `orders`, `orders.eu` and `orders.eu.fills`
+"""
+
+SEPARATOR = '.'
+SINGLE_WILDCARD = '*'
+MULTI_WILDCARD = '#'
+WILDCARDS = frozenset((SINGLE_WILDCARD, MULTI_WILDCARD))
+
+
+def is_pattern(channel_name):
+    """
+    Method returns if a given channel name contains wildcards
+
+    :param str channel_name: channel name to check
+    :rtype: bool
+    """
+    return SINGLE_WILDCARD in channel_name or MULTI_WILDCARD in channel_name
+
+
+def validate_pattern(pattern):
+    """
+    Method for validating the placement of wildcards in a pattern
+
+    :param str pattern: pattern to be validated
+    :raises: ValueError
+    """
+    segments = pattern.split(SEPARATOR)
+    for i, segment in enumerate(segments):
+        if not segment:
+            raise ValueError(f"pattern {pattern} contains an empty segment")
+        if segment in WILDCARDS:
+            if segment == MULTI_WILDCARD and i != len(segments) - 1:
+                raise ValueError(f"wildcard {MULTI_WILDCARD} can only be used as the last segment")
+        elif WILDCARDS.intersection(segment):
+            raise ValueError(f"wildcards in pattern {pattern} must occupy a complete segment")
+
+
+def matches(pattern, channel_name):
+    """
+    Method returns if a given pattern matches a given channel name
+
+    :param str pattern: pattern which may contain wildcards
+    :param str channel_name: concrete channel name
+    :rtype: bool
+    """
+    segments = channel_name.split(SEPARATOR)
+    for i, pattern_segment in enumerate(pattern.split(SEPARATOR)):
+        if pattern_segment == MULTI_WILDCARD:
+            return True
+        if i >= len(segments):
+            return False
+        if pattern_segment != SINGLE_WILDCARD and pattern_segment != segments[i]:
+            return False
+    return i == len(segments) - 1
+
+
+class _Node:
+
+    __slots__ = ('children', 'values', 'multi')
+
+    def __init__(self):
+        self.children = {}
+        self.values = set()
+        self.multi = set()
+
+    def is_empty(self):
+        return not (self.children or self.values or self.multi)
+
+
+class TopicTrie:
+
+    """
+    Trie over the segments of channel patterns, used to resolve all the values
+    stored for patterns matching a concrete channel name. The cost of a lookup
+    depends on the number of segments of the channel name and the number of
+    matching branches, not on the number of stored patterns.
+
+    >>> trie = TopicTrie()
+    >>> trie.add("orders.*.fills", "monitor")
+    >>> trie.match("orders.eu.fills")
+    {'monitor'}
+    """
+
+    def __init__(self):
+        self._root = _Node()
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, pattern, value):
+        """
+        Method for storing a value for a given pattern
+
+        :param str pattern: pattern to be stored
+        :param Hashable value: value to be stored
+        """
+        node = self._root
+        segments = pattern.split(SEPARATOR)
+        multi = segments[-1] == MULTI_WILDCARD
+        if multi:
+            segments.pop()
+
+        for segment in segments:
+            child = node.children.get(segment)
+            if child is None:
+                child = node.children[segment] = _Node()
+            node = child
+
+        values = node.multi if multi else node.values
+        if value not in values:
+            values.add(value)
+            self._size += 1
+
+    def remove(self, pattern, value):
+        """
+        Method for removing a value stored for a given pattern, missing values
+        are ignored
+
+        :param str pattern: pattern of the stored value
+        :param Hashable value: value to be removed
+        """
+        segments = pattern.split(SEPARATOR)
+        multi = segments[-1] == MULTI_WILDCARD
+        if multi:
+            segments.pop()
+
+        path = [self._root]
+        for segment in segments:
+            child = path[-1].children.get(segment)
+            if child is None:
+                return
+            path.append(child)
+
+        values = path[-1].multi if multi else path[-1].values
+        if value not in values:
+            return
+        values.remove(value)
+        self._size -= 1
+
+        # prune the branches which are no longer holding any values
+        for i in range(len(segments), 0, -1):
+            if not path[i].is_empty():
+                break
+            del path[i - 1].children[segments[i - 1]]
+
+    def match(self, channel_name):
+        """
+        Method returns all the values stored for patterns matching a given
+        channel name
+
+        :param str channel_name: concrete channel name
+        :rtype: set
+        """
+        result = set()
+        nodes = [self._root]
+        for segment in channel_name.split(SEPARATOR):
+            next_nodes = []
+            for node in nodes:
+                result |= node.multi
+                child = node.children.get(segment)
+                if child is not None:
+                    next_nodes.append(child)
+                child = node.children.get(SINGLE_WILDCARD)
+                if child is not None:
+                    next_nodes.append(child)
+            nodes = next_nodes
+            if not nodes:
+                return result
+
+        for node in nodes:
+            result |= node.values
+            result |= node.multi
+        return result
+
+    def clear(self):
+        self._root = _Node()
+        self._size = 0
@@ -0,0 +1,87 @@
+# -*- coding : utf-8 -*-
+
+import logging
+import time
+from collections import namedtuple
+
+"""
+Level-gated tracing of internal events, e.g. the registrations handled by the
+hub. Events are passed as structured records to an optional sink and are
+written to the DEBUG level of a logger. Call sites check `Tracer.enabled`
+before building an event, so that tracing costs a single check when neither
+the sink nor the logger is enabled.
+"""
+
+TraceEvent = namedtuple("TraceEvent", "name source timestamp fields")
+TraceEvent.__doc__ = """
+Structured trace event
+
+:param str name: name of the event, e.g. "subscriber_added"
+:param str source: name of the emitting component, e.g. "asyncpubsub.hub"
+:param float timestamp: time of the event as returned by time.time
+:param dict fields: objects involved in the event, never formatted
+"""
+
+
+class Tracer:
+
+    """
+    Emits the trace events of a component
+
+    :param str name: name of the component, also used as the logger name
+    :param Optional[callable] sink: callable which will be invoked with every
+                                    TraceEvent default=None
+
+    >>> tracer = Tracer("asyncpubsub.hub")
+    >>> if tracer.enabled:
+    ...     tracer.emit("registered", obj=publisher)
+    """
+
+    __slots__ = ('_name', '_logger', '_sink')
+
+    def __init__(self, name, sink=None):
+        self._name = name
+        self._logger = logging.getLogger(name)
+        self._sink = None
+        self.set_sink(sink)
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def sink(self):
+        return self._sink
+
+    def set_sink(self, sink):
+        """
+        Method for setting the sink receiving the trace events
+
+        :param Optional[callable] sink: callable which will be invoked with
+                                        every TraceEvent, None disables the sink
+        """
+        if sink is not None and not callable(sink):
+            raise TypeError("arg sink must be a callable")
+        self._sink = sink
+
+    @property
+    def enabled(self):
+        # isEnabledFor caches its result per level, the check stays cheap
+        return self._sink is not None or self._logger.isEnabledFor(logging.DEBUG)
+
+    def emit(self, name, **fields):
+        """
+        Method for emitting a trace event, callers are expected to check
+        `enabled` first
+
+        :param str name: name of the event
+        :param fields: objects involved in the event
+        """
+        if self._sink is not None:
+            try:
+                self._sink(TraceEvent(name, self._name, time.time(), fields))
+            except Exception:
+                self._logger.exception("trace sink raised an exception")
+
+        if self._logger.isEnabledFor(logging.DEBUG):
+            self._logger.debug("%s %s", name, " ".join(f"{key}={value}" for key, value in fields.items()))
@@ -2,7 +2,7 @@
 
 import asyncio
 
-from asyncpubsub import Publisher, Subscriber
+from asyncpubsub import Publisher, Subscriber, Priority
 
 
 """
@@ -28,6 +28,16 @@ class TrackedPublisher(Publisher):
         super().publish_nowait(msg)
         self._published_messages.append(msg)
 
+    async def publish_many(self, msgs):
+        msgs = list(msgs)
+        await super().publish_many(msgs)
+        self._published_messages.extend(msgs)
+
+    def publish_many_nowait(self, msgs):
+        msgs = list(msgs)
+        super().publish_many_nowait(msgs)
+        self._published_messages.extend(msgs)
+
 
 class TrackedSubscriber(Subscriber):
 
@@ -39,18 +49,23 @@ class TrackedSubscriber(Subscriber):
     def notified_messages(self):
         return self._notified_messages
 
-    def notify(self, msg):
-        super().notify(msg)
+    def notify(self, msg, priority=Priority.NORMAL):
+        super().notify(msg, priority)
         self._notified_messages.append(msg)
 
+    def notify_many(self, msgs, priority=Priority.NORMAL):
+        pending = super().notify_many(msgs, priority)
+        self._notified_messages.extend(msgs)
+        return pending
+
     async def wait_for_queue_empty(self):
-        while not self._msg_queue.empty():
-            await asyncio.sleep(0.1)
+        await self.drain()
 
 
 class TrackedSubscriberWithCallbacks(TrackedSubscriber):
     def __init__(self, channel_name, queue_size=0, use_sync_cb=False, use_async_cb=False):
         self._received_messages = []
+        self._count_waiters = {}
         if use_sync_cb:
             cb = self.sync_callback
         elif use_async_cb:
@@ -65,12 +80,22 @@ class TrackedSubscriberWithCallbacks(TrackedSubscriber):
         return self._received_messages
 
     def sync_callback(self, msg):
-        self._received_messages.append(msg)
+        self._received(msg)
 
     async def async_callback(self, msg):
         await asyncio.sleep(0.1)
+        self._received(msg)
+
+    def _received(self, msg):
         self._received_messages.append(msg)
+        waiter = self._count_waiters.pop(len(self._received_messages), None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
 
     async def wait_for_n_messages(self, n):
-        while not len(self._received_messages) == n:
-            await asyncio.sleep(0.1)
+        if len(self._received_messages) >= n:
+            return
+        waiter = self._count_waiters.get(n)
+        if waiter is None:
+            waiter = self._count_waiters[n] = asyncio.get_event_loop().create_future()
+        await asyncio.shield(waiter)
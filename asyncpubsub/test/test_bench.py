@@ -0,0 +1,32 @@
+# -*- coding : utf-8 -*-
+
+import unittest
+
+from asyncpubsub.bench.harness import Metric, HIGHER, LOWER, compare, to_document
+
+
+class TestCompare(unittest.TestCase):
+
+    def test_changes_are_classified_by_direction(self):
+        baseline = to_document({"rate": Metric(100.0, "messages/s", HIGHER),
+                                "latency": Metric(10.0, "us", LOWER),
+                                "lost": Metric(5, "messages", None),
+                                "removed": Metric(1.0, "us", LOWER)})
+        current = to_document({"rate": Metric(85.0, "messages/s", HIGHER),
+                               "latency": Metric(8.0, "us", LOWER),
+                               "lost": Metric(50, "messages", None),
+                               "added": Metric(1.0, "us", LOWER)})
+
+        statuses = {c.name: c.status for c in compare(baseline, current, threshold=0.1)}
+        self.assertEqual(statuses, {"rate": "regression", "latency": "improvement", "lost": "info",
+                                    "removed": "missing", "added": "new"})
+        statuses = {c.name: c.status for c in compare(baseline, current, threshold=0.25)}
+        self.assertEqual(statuses["rate"], "ok")
+
+    def test_growth_from_zero_is_a_regression(self):
+        baseline = to_document({"retained": Metric(0, "objects", LOWER)})
+        current = to_document({"retained": Metric(3, "objects", LOWER)})
+        statuses = {c.name: c.status for c in compare(baseline, current)}
+        self.assertEqual(statuses, {"retained": "regression"})
+        statuses = {c.name: c.status for c in compare(baseline, baseline)}
+        self.assertEqual(statuses, {"retained": "ok"})
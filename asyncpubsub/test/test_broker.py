@@ -0,0 +1,124 @@
+# -*- coding : utf-8 -*-
+
+import asyncio
+import struct
+import unittest
+
+from asyncpubsub import Publisher, Subscriber, get_hub
+from asyncpubsub.broker import Broker, BrokerBridge
+from asyncpubsub.broker.protocol import (encode_frame, encode_publish, decode_publish,
+                                         SUBSCRIBE, UNSUBSCRIBE, ANNOUNCE, INTEREST, DISINTEREST, PUBLISH)
+
+
+class RawClient:
+
+    """
+    Broker client speaking the wire protocol directly, used in place of the
+    bridge of a remote hub
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, port):
+        return cls(*await asyncio.open_connection("127.0.0.1", port))
+
+    def send(self, parts):
+        self.writer.writelines(parts)
+
+    async def receive(self):
+        header = await asyncio.wait_for(self.reader.readexactly(5), 5)
+        length, frame_type = struct.unpack("!IB", header)
+        body = await asyncio.wait_for(self.reader.readexactly(length - 1), 5)
+        return frame_type, body
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+class TestProtocol(unittest.TestCase):
+
+    def test_publish_roundtrip(self):
+        messages = [b"bytes", bytearray(b"bytearray"), memoryview(b"view"), "str", {"key": [1, 2]}]
+        parts = encode_publish(get_hub().codecs, "int-channel", messages)
+        frame = b"".join(parts)
+        length, frame_type = struct.unpack_from("!IB", frame)
+        self.assertEqual(length, len(frame) - 4)
+        self.assertEqual(frame_type, PUBLISH)
+        self.assertEqual(decode_publish(get_hub().codecs, frame[5:]),
+                         ("int-channel", [b"bytes", b"bytearray", b"view", "str", {"key": [1, 2]}]))
+
+
+class TestBroker(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.hub = get_hub()
+        self.broker = await Broker().start(host="127.0.0.1")
+        self.port = self.broker.sockets[0].getsockname()[1]
+        self.bridge = BrokerBridge("127.0.0.1", self.port)
+
+    async def test_messages_are_routed_to_subscribed_clients(self):
+        publisher, subscriber, idle = [await RawClient.connect(self.port) for _ in range(3)]
+        publisher.send(encode_frame(ANNOUNCE, b"int.channel"))
+        subscriber.send(encode_frame(SUBSCRIBE, b"int.*"))
+        self.assertEqual(await publisher.receive(), (INTEREST, b"int.channel"))
+
+        publisher.send(encode_publish(self.hub.codecs, "int.channel", [1, 2, 3]))
+        frame_type, body = await subscriber.receive()
+        self.assertEqual(frame_type, PUBLISH)
+        self.assertEqual(decode_publish(self.hub.codecs, body), ("int.channel", [1, 2, 3]))
+
+        subscriber.send(encode_frame(UNSUBSCRIBE, b"int.*"))
+        self.assertEqual(await publisher.receive(), (DISINTEREST, b"int.channel"))
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(idle.reader.readexactly(5), 0.05)
+
+        for client in (publisher, subscriber, idle):
+            await client.close()
+
+    async def test_bridge_forwards_local_publisher_only_with_remote_interest(self):
+        publisher = Publisher("int-channel")
+        await self.bridge.connect()
+        remote = await RawClient.connect(self.port)
+
+        await publisher.publish(0)
+        remote.send(encode_frame(SUBSCRIBE, b"int-channel"))
+        while not self.bridge._forwarders:
+            await asyncio.sleep(0.01)
+        await publisher.publish_many([1, 2])
+
+        frame_type, body = await remote.receive()
+        self.assertEqual(frame_type, PUBLISH)
+        self.assertEqual(decode_publish(self.hub.codecs, body), ("int-channel", [1, 2]))
+        await remote.close()
+        await self.bridge.close()
+        del publisher
+
+    async def test_bridge_creates_proxy_publisher_for_remote_channel(self):
+        received = []
+        subscribers = [Subscriber("remote.channel", received.append), Subscriber("remote.#", received.append)]
+        await self.bridge.connect()
+        remote = await RawClient.connect(self.port)
+        remote.send(encode_frame(ANNOUNCE, b"remote.channel"))
+        self.assertEqual(await remote.receive(), (INTEREST, b"remote.channel"))
+
+        remote.send(encode_publish(self.hub.codecs, "remote.channel", [b"hello", "world"]))
+        while len(received) < 4:
+            await asyncio.sleep(0.01)
+        self.assertEqual(sorted(received, key=str), sorted([b"hello", b"hello", "world", "world"], key=str))
+        self.assertIn("remote.channel", self.bridge.proxies)
+
+        await remote.close()
+        await self.bridge.close()
+        self.assertFalse(self.bridge.proxies)
+        self.assertIsNone(self.hub.get_publisher("remote.channel"))
+
+    async def asyncTearDown(self):
+        await self.bridge.close()
+        await self.broker.close()
+
+    def tearDown(self):
+        self.hub.reset()
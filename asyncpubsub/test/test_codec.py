@@ -0,0 +1,94 @@
+# -*- coding : utf-8 -*-
+
+import json
+import pickle
+import unittest
+from collections import namedtuple
+
+from asyncpubsub.core.codec import Codec, CodecRegistry, PickleCodec, BytesCodec, StructCodec
+
+Tick = namedtuple("Tick", "bid ask")
+
+
+class JsonCodec(Codec):
+
+    id = 128
+
+    def encode(self, message):
+        return [json.dumps(message).encode()]
+
+    def decode(self, buffers):
+        return json.loads(bytes(buffers[0]))
+
+
+class TestCodecRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.codecs = CodecRegistry()
+
+    def roundtrip(self, channel_name, message):
+        parts = self.codecs.encode(channel_name, message)
+        data = b"".join(parts)
+        decoded, offset = self.codecs.decode(channel_name, memoryview(data))
+        self.assertEqual(offset, len(data))
+        return decoded
+
+    def test_default_codecs(self):
+        for message in (b"bytes", "str", 42, {"key": [1, 2]}):
+            self.assertEqual(self.roundtrip("int-channel", message), message)
+        self.assertEqual(self.roundtrip("int-channel", bytearray(b"bytearray")), b"bytearray")
+
+    def test_bytes_are_not_copied_on_encode(self):
+        payload = b"x" * 4096
+        parts = self.codecs.encode("int-channel", payload)
+        self.assertIs(parts[-1], payload)
+
+    def test_pickle_out_of_band_buffers(self):
+        self.codecs.register("int-channel", PickleCodec())
+        payload = bytearray(b"x" * 4096)
+        parts = self.codecs.encode("int-channel", {"payload": pickle.PickleBuffer(payload)})
+        self.assertEqual(len(parts), 3)
+        self.assertEqual(bytes(parts[-1]), payload)
+        self.assertEqual(bytes(self.roundtrip("int-channel", {"payload": pickle.PickleBuffer(payload)})["payload"]),
+                         payload)
+
+    def test_transient_decoding_does_not_reference_the_buffer(self):
+        self.codecs.register("bytes", BytesCodec(copy=False))
+        self.codecs.register("json", JsonCodec())
+        messages = {"int-channel": pickle.PickleBuffer(b"x" * 64), "bytes": b"bytes", "json": [1, 2]}
+        for channel_name, message in messages.items():
+            data = bytearray(b"".join(self.codecs.encode(channel_name, message)))
+            view = memoryview(data)
+            decoded = self.codecs.decode(channel_name, view, transient=True)[0]
+            view.release()
+            # a bytearray cannot be resized while a message references it
+            data.clear()
+            self.assertEqual(decoded, message.raw() if channel_name == "int-channel" else message)
+
+    def test_bytes_codec_without_copy(self):
+        self.codecs.register("int-channel", BytesCodec(copy=False))
+        decoded = self.roundtrip("int-channel", b"bytes")
+        self.assertIsInstance(decoded, memoryview)
+        self.assertEqual(decoded, b"bytes")
+        with self.assertRaises(TypeError):
+            self.codecs.encode("int-channel", "str")
+
+    def test_struct_codec(self):
+        self.codecs.register("ticks", StructCodec("!dd", Tick._make))
+        self.assertEqual(self.roundtrip("ticks", Tick(1.1, 1.2)), Tick(1.1, 1.2))
+        self.assertEqual(len(b"".join(self.codecs.encode("ticks", (1.1, 1.2)))), 22)
+
+    def test_user_defined_codec(self):
+        self.codecs.register("json-channel", JsonCodec())
+        self.assertEqual(self.roundtrip("json-channel", {"key": [1, 2]}), {"key": [1, 2]})
+
+        data = memoryview(b"".join(self.codecs.encode("json-channel", {})))
+        self.codecs.unregister("json-channel")
+        with self.assertRaises(ValueError):
+            self.codecs.decode("json-channel", data)
+
+    def test_register_validates_codec(self):
+        with self.assertRaises(TypeError):
+            self.codecs.register("int-channel", object())
+        with self.assertRaises(ValueError):
+            self.codecs.register("int-channel", Codec())
@@ -0,0 +1,237 @@
+# -*- coding : utf-8 -*-
+
+import asyncio
+import errno
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from asyncpubsub import Publisher, Subscriber, SegmentLog, FsyncPolicy, BytesCodec, StructCodec, CodecRegistry, get_hub
+
+
+class TestSegmentLog(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def open_log(self, codecs=None, **kwargs):
+        log = SegmentLog(self.directory, **kwargs)
+        log.bind("audit", codecs if codecs is not None else CodecRegistry(), None)
+        self.addCleanup(log.close)
+        return log
+
+    def test_invalid_args_raise_error(self):
+        for kwargs in ({"segment_size": 0}, {"index_interval": -1}, {"fsync_interval": 0}):
+            with self.assertRaises(ValueError):
+                SegmentLog(self.directory, **kwargs)
+        with self.assertRaises(TypeError):
+            SegmentLog(self.directory, fsync="batch")
+
+        log = self.open_log()
+        with self.assertRaises(ValueError):
+            log.bind("audit", CodecRegistry(), None)
+
+    def test_append_and_read_across_segments(self):
+        log = self.open_log(segment_size=256, index_interval=64, fsync=FsyncPolicy.NEVER)
+        for i in range(0, 100, 7):
+            self.assertEqual(log.append(range(i, min(i + 7, 100))), i)
+        self.assertEqual(log.end_offset, 100)
+        self.assertGreater(log.segments, 5)
+        self.assertEqual(len(os.listdir(self.directory)), 2 * log.segments)
+
+        for offset in range(100):
+            self.assertEqual(log.read(offset, 3), list(range(offset, min(offset + 3, 100))))
+        self.assertEqual(log.read(0, 1000), list(range(100)))
+
+        reader = log.reader(10, 50)
+        self.assertEqual(reader.read(30), list(range(10, 40)))
+        self.assertEqual(reader.read(30), list(range(40, 50)))
+        self.assertTrue(reader.done())
+        self.assertEqual(reader.read(), [])
+
+    def test_recovery_discards_partial_record(self):
+        log = self.open_log(segment_size=256)
+        log.append(range(50))
+        log.close()
+        self.assertEqual(log.read(45), list(range(45, 50)))
+
+        last = max(name for name in os.listdir(self.directory) if name.endswith(".log"))
+        with open(os.path.join(self.directory, last), "ab") as f:
+            f.write(b"\x00\x00\x00\x10\x00")
+
+        with self.assertLogs("asyncpubsub.durable", "WARNING"):
+            recovered = self.open_log(segment_size=256)
+        self.assertEqual(recovered.end_offset, 50)
+        self.assertEqual(recovered.append(["after restart"]), 50)
+        self.assertEqual(recovered.read(0, 1000), [*range(50), "after restart"])
+
+    def test_messages_are_encoded_with_the_codec_of_the_channel(self):
+        codecs = CodecRegistry()
+        codecs.register("audit", StructCodec("!dd"))
+        log = self.open_log(codecs)
+        log.append([(1.0, 2.0), (3.0, 4.0)])
+        self.assertEqual(log.read(0), [(1.0, 2.0), (3.0, 4.0)])
+
+    def test_fsync_policies(self):
+        with mock.patch("asyncpubsub.core.durable._fdatasync") as fdatasync:
+            log = self.open_log(fsync=FsyncPolicy.BATCH)
+            for i in range(3):
+                log.append(range(10))
+                log.commit()
+            self.assertEqual(fdatasync.call_count, 3)
+            self.assertEqual(log.synced_offset, 30)
+            log.commit()
+            self.assertEqual(fdatasync.call_count, 3)
+
+        with mock.patch("asyncpubsub.core.durable._fdatasync") as fdatasync:
+            self.directory = os.path.join(self.directory, "never")
+            log = self.open_log(fsync=FsyncPolicy.NEVER)
+            log.append(range(10))
+            log.commit()
+            log.close()
+            fdatasync.assert_not_called()
+            self.assertEqual(log.synced_offset, 0)
+
+
+class TestDurableChannel(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def tearDown(self):
+        get_hub().reset()
+
+    async def test_subscriber_replays_the_log_before_live_messages(self):
+        publisher = Publisher("audit", durable=SegmentLog(self.directory, segment_size=128))
+        publisher.publish_many_nowait(range(10))
+        await publisher.flush()
+        self.assertEqual(publisher.offset, 10)
+
+        received = []
+        subscriber = Subscriber("audit", received.append, from_offset=4)
+        publisher.publish_many_nowait(range(10, 15))
+        await publisher.flush()
+        self.assertEqual(received, list(range(4, 15)))
+
+        # messages queued but not yet delivered are received live
+        publisher.publish_many_nowait(range(15, 20))
+        late = []
+        late_subscriber = Subscriber("audit", late.append, from_offset=0)
+        await publisher.flush()
+        self.assertEqual(late, list(range(20)))
+        self.assertEqual(received, list(range(4, 20)))
+        await late_subscriber.drain()
+
+    async def test_log_is_replayed_after_restart(self):
+        publisher = Publisher("audit", durable=SegmentLog(self.directory))
+        publisher.publish_many_nowait(["a", "b", "c"])
+        await publisher.flush()
+        await publisher.aclose()
+        self.assertTrue(publisher.log.closed)
+
+        publisher = Publisher("audit", durable=SegmentLog(self.directory))
+        self.assertEqual(publisher.offset, 3)
+        subscriber = Subscriber("audit", pull=True, from_offset=1, where=lambda message: message != "c")
+        publisher.publish_nowait("d")
+        self.assertEqual([await subscriber.get(timeout=1) for _ in range(2)], ["b", "d"])
+        self.assertIsNone(Publisher("other").offset)
+
+    async def test_log_is_replayed_to_subscribers_created_before_the_publisher(self):
+        publisher = Publisher("audit", durable=SegmentLog(self.directory))
+        publisher.publish_many_nowait(["a", "b", "c"])
+        await publisher.flush()
+        await publisher.aclose()
+
+        received = []
+        subscriber = Subscriber("audit", received.append, from_offset=1)
+        pulled = Subscriber("audit", pull=True, from_offset=0)
+        pull = asyncio.ensure_future(pulled.get(timeout=1))
+        await asyncio.sleep(0.01)
+        self.assertEqual(received, [])
+
+        publisher = Publisher("audit", durable=SegmentLog(self.directory))
+        publisher.publish_nowait("d")
+        # the pull subscriber is pulled first, flush waits until it is
+        self.assertEqual([await pull] + [await pulled.get(timeout=1) for _ in range(3)], ["a", "b", "c", "d"])
+        await asyncio.wait_for(publisher.flush(), timeout=1)
+        self.assertEqual(received, ["b", "c", "d"])
+
+    async def test_interval_policy_flushes_later(self):
+        log = SegmentLog(self.directory, fsync=FsyncPolicy.INTERVAL, fsync_interval=0.02)
+        publisher = Publisher("audit", durable=log)
+        publisher.publish_many_nowait(range(5))
+        await publisher.flush()
+        self.assertEqual(log.synced_offset, 0)
+        await asyncio.sleep(0.05)
+        self.assertEqual(log.synced_offset, 5)
+
+    async def test_messages_which_cannot_be_encoded_are_skipped(self):
+        get_hub().codecs.register("audit", BytesCodec())
+        publisher = Publisher("audit", durable=SegmentLog(self.directory))
+        publisher.enable_stats()
+        received = []
+        subscriber = Subscriber("audit", received.append)
+        with self.assertLogs("asyncpubsub", "ERROR"):
+            publisher.publish_many_nowait([b"a", "not bytes", b"b"])
+            await publisher.flush()
+        publisher.publish_nowait(b"c")
+        await publisher.flush()
+        self.assertEqual(received, [b"a", b"b", b"c"])
+        self.assertEqual(publisher.offset, 3)
+        self.assertEqual(publisher.get_stats()["errors"], 1)
+        self.assertEqual([bytes(message) for message in publisher.log.read(0)], [b"a", b"b", b"c"])
+
+    async def test_io_errors_do_not_stop_the_publisher(self):
+        log = SegmentLog(self.directory)
+        publisher = Publisher("audit", durable=log)
+        publisher.enable_stats()
+        received = []
+        subscriber = Subscriber("audit", received.append)
+        publisher.publish_many_nowait(["a", "b"])
+        await publisher.flush()
+
+        def write_partially(fd, data):
+            os.write(fd, bytes(data)[:len(data) // 2])
+            raise OSError(errno.ENOSPC, "No space left on device")
+
+        with mock.patch("asyncpubsub.core.durable._write_all", write_partially), \
+                self.assertLogs("asyncpubsub", "ERROR"):
+            publisher.publish_many_nowait(["lost", "lost"])
+            await publisher.flush()
+        with mock.patch("asyncpubsub.core.durable._fdatasync", side_effect=OSError(errno.EIO, "I/O error")), \
+                self.assertLogs("asyncpubsub", "ERROR"):
+            publisher.publish_nowait("c")
+            await publisher.flush()
+        self.assertEqual(log.synced_offset, 2)
+
+        publisher.publish_nowait("d")
+        await publisher.flush()
+        self.assertEqual(received, ["a", "b", "c", "d"])
+        self.assertEqual(publisher.get_stats()["errors"], 2)
+        self.assertEqual(log.synced_offset, 4)
+        self.assertEqual(log.read(0), ["a", "b", "c", "d"])
+        await publisher.aclose()
+        # the partially written records were discarded from the files
+        publisher = Publisher("audit", durable=SegmentLog(self.directory))
+        self.assertEqual(publisher.log.read(0), ["a", "b", "c", "d"])
+
+    async def test_invalid_args_raise_error(self):
+        with self.assertRaises(ValueError):
+            Publisher("audit", eager=True, durable=SegmentLog(self.directory))
+        with self.assertRaises(TypeError):
+            Publisher("audit", durable=self.directory)
+        with self.assertRaises(ValueError):
+            Subscriber("audit.*", from_offset=0)
+        with self.assertRaises(ValueError):
+            Subscriber("audit", replay=1, from_offset=0)
+        with self.assertRaises(ValueError):
+            Subscriber("audit", from_offset=-1)
+
+
+if __name__ == "__main__":
+    unittest.main()
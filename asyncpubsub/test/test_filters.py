@@ -0,0 +1,90 @@
+# -*- coding : utf-8 -*-
+
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+from asyncpubsub import Publisher, Subscriber, Match, get_hub
+from asyncpubsub.core.filters import RoutingTable
+
+
+class _Filtered:
+
+    def __init__(self, where):
+        self.where = where
+
+
+class TestMatch(unittest.TestCase):
+
+    def test_invalid_args_raise_error(self):
+        with self.assertRaises(TypeError):
+            Match(1, "value")
+        with self.assertRaises(ValueError):
+            Match("account")
+
+    def test_match_keys_attributes_and_callables(self):
+        match = Match("account", "A", "B")
+        self.assertTrue(match({"account": "A"}))
+        self.assertTrue(match(SimpleNamespace(account="B")))
+        self.assertFalse(match({"account": "C"}))
+        self.assertFalse(match({"qty": 1}))
+        self.assertFalse(match({"account": ["A"]}))
+        self.assertTrue(Match(len, 2)("ab"))
+
+    def test_routing_table_indexes_matches(self):
+        subscribers = [_Filtered(Match("account", account)) for account in "AAB"]
+        subscribers.append(_Filtered(None))
+        subscribers.append(_Filtered(lambda message: message["qty"] > 10))
+        messages = [{"account": "A", "qty": 1}, {"account": "B", "qty": 20}, {"account": "C", "qty": 5}]
+
+        routed = dict(RoutingTable(subscribers).route(messages))
+        self.assertEqual([routed.get(subscriber) for subscriber in subscribers],
+                         [messages[:1], messages[:1], messages[1:2], messages, messages[1:2]])
+
+
+class TestPublisherFilters(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.hub = get_hub()
+
+    async def test_only_matching_messages_are_queued(self):
+        publisher = Publisher("fills")
+        received = {account: [] for account in "AB"}
+        subscribers = [Subscriber("fills", received[account].append, where=Match("account", account))
+                       for account in "AB"]
+        odd = []
+        odd_subscriber = Subscriber("fills", odd.append, where=lambda fill: fill["qty"] % 2)
+
+        fills = [{"account": "AB"[i % 2], "qty": i} for i in range(6)]
+        publisher.publish_many_nowait(fills)
+        await asyncio.sleep(0.01)
+        self.assertEqual(received["A"], fills[0::2])
+        self.assertEqual(received["B"], fills[1::2])
+        self.assertEqual(odd, fills[1::2])
+        self.assertEqual(publisher.get_stats()["delivered"], 9)
+        self.assertEqual(subscribers[0].get_stats()["queue_high_water"], 3)
+
+    async def test_filters_follow_topology_changes(self):
+        publisher = Publisher("fills", eager=True)
+        received = []
+        subscriber = Subscriber("fills", received.append, where=Match("account", "A"))
+        publisher.publish_nowait({"account": "A"})
+        pattern_subscriber = Subscriber("fills.#", received.append, where=Match("account", "B"))
+        publisher.publish_many_nowait([{"account": "B"}, {"account": "C"}])
+        self.hub.deregister(subscriber)
+        publisher.publish_nowait({"account": "A"})
+        await asyncio.sleep(0.01)
+        self.assertEqual(received, [{"account": "A"}, {"account": "B"}])
+
+    async def test_filters_with_ring_and_replay(self):
+        publisher = Publisher("ints", ring_size=16, retain=10)
+        publisher.publish_many_nowait(range(10))
+        await asyncio.sleep(0.01)
+        received = []
+        subscriber = Subscriber("ints", received.append, replay=2, where=lambda i: i % 3 == 0)
+        publisher.publish_many_nowait(range(10, 16))
+        await asyncio.sleep(0.01)
+        self.assertEqual(received, [6, 9, 12, 15])
+
+    def tearDown(self):
+        self.hub.reset()
@@ -0,0 +1,130 @@
+# -*- coding : utf-8 -*-
+
+import asyncio
+import threading
+import unittest
+
+from asyncpubsub import Publisher, Subscriber, OverflowPolicy, Priority, get_hub
+
+
+class TestFlushDrain(unittest.IsolatedAsyncioTestCase):
+
+    def tearDown(self):
+        get_hub().reset()
+
+    async def test_flush_waits_for_the_callbacks(self):
+        async def slow(message):
+            await asyncio.sleep(0.01)
+            slow_received.append(message)
+
+        received = []
+        slow_received = []
+        publisher = Publisher("flush")
+        subscribers = [Subscriber("flush", received.append),
+                       Subscriber("flush", slow),
+                       Subscriber("flush", slow, concurrency=4)]
+        publisher.publish_many_nowait(range(5))
+        await asyncio.wait_for(publisher.flush(), timeout=3)
+        self.assertEqual(received, list(range(5)))
+        self.assertEqual(sorted(slow_received), sorted(list(range(5)) * 2))
+        self.assertEqual(len(subscribers), 3)
+
+        # nothing is pending
+        await asyncio.wait_for(publisher.flush(), timeout=1)
+
+    async def test_delivery_future_of_a_message(self):
+        gate = asyncio.Event()
+        received = []
+
+        async def gated(message):
+            await gate.wait()
+            received.append(message)
+
+        publisher = Publisher("tracked")
+        subscriber = Subscriber("tracked", gated)
+        first = publisher.publish_nowait("first", track=True)
+        urgent = await publisher.publish("urgent", priority=Priority.HIGH, track=True)
+        await asyncio.sleep(0.05)
+        self.assertFalse(first.done())
+        self.assertFalse(urgent.done())
+
+        gate.set()
+        await asyncio.wait_for(first, timeout=1)
+        self.assertIn("first", received)
+        await asyncio.wait_for(urgent, timeout=1)
+        self.assertCountEqual(received, ["first", "urgent"])
+        self.assertIsNone(publisher.publish_nowait("untracked"))
+        await subscriber.drain()
+
+    async def test_flush_with_blocking_subscriber(self):
+        received = []
+
+        async def slow(message):
+            await asyncio.sleep(0)
+            received.append(message)
+
+        publisher = Publisher("blocking")
+        subscriber = Subscriber("blocking", slow, queue_size=2, overflow=OverflowPolicy.BLOCK)
+        delivery = await publisher.publish_many(range(20), track=True)
+        await asyncio.wait_for(delivery, timeout=3)
+        self.assertEqual(received, list(range(20)))
+
+    async def test_flush_eager_and_threadsafe(self):
+        received = []
+        publisher = Publisher("eager", eager=True)
+        subscriber = Subscriber("eager", received.append)
+        delivery = publisher.publish_nowait(1, track=True)
+        await asyncio.wait_for(delivery, timeout=1)
+        self.assertEqual(received, [1])
+
+        thread = threading.Thread(target=publisher.publish_many_threadsafe, args=([2, 3],))
+        thread.start()
+        thread.join()
+        await asyncio.wait_for(publisher.flush(), timeout=1)
+        self.assertEqual(received, [1, 2, 3])
+
+    async def test_flush_with_ring_buffer(self):
+        received = []
+        publisher = Publisher("ring", ring_size=16)
+        subscriber = Subscriber("ring", received.append)
+        publisher.publish_many_nowait(range(10))
+        await asyncio.wait_for(publisher.flush(), timeout=1)
+        self.assertEqual(received, list(range(10)))
+
+    async def test_drain_pull_subscriber(self):
+        publisher = Publisher("pull")
+        subscriber = Subscriber("pull", pull=True)
+        publisher.publish_many_nowait([1, 2, 3])
+        delivery = publisher.publish_nowait(4, track=True)
+        await asyncio.sleep(0)
+        drained = asyncio.ensure_future(subscriber.drain())
+        await asyncio.sleep(0.01)
+        self.assertFalse(drained.done())
+        self.assertFalse(delivery.done())
+
+        self.assertEqual(await subscriber.get_many(), [1, 2, 3, 4])
+        await asyncio.wait_for(drained, timeout=1)
+        await asyncio.wait_for(delivery, timeout=1)
+
+    async def test_drain_replayed_messages(self):
+        publisher = Publisher("replay", retain=5)
+        publisher.publish_many_nowait(range(5))
+        await publisher.flush()
+
+        received = []
+        subscriber = Subscriber("replay", received.append, replay=5)
+        await asyncio.wait_for(subscriber.drain(), timeout=1)
+        self.assertEqual(received, list(range(5)))
+
+    async def test_hub_drain(self):
+        received = []
+        publishers = [Publisher(f"hub.{i}") for i in range(3)]
+        subscriber = Subscriber("hub.*", received.append)
+        for publisher in publishers:
+            publisher.publish_many_nowait(range(3))
+        await asyncio.wait_for(get_hub().drain(), timeout=1)
+        self.assertEqual(len(received), 9)
+
+
+if __name__ == "__main__":
+    unittest.main()
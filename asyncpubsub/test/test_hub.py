@@ -1,5 +1,7 @@
+import asyncio
+import logging
 import unittest
-from asyncpubsub import get_hub, ChannelRegistrable, EType
+from asyncpubsub import get_hub, ChannelRegistrable, EType, RegistrationError
 
 
 class DummyPublisher(ChannelRegistrable):
@@ -134,5 +136,163 @@ class TestHub(unittest.TestCase):
         self.assertFalse(self.hub.is_registered(subscriber))
         self.assertFalse(subscriber in self.hub._dangling_subscribers)
 
+    def test_get_registered_filters_by_channel(self):
+        publisher = DummyPublisher("int-channel")
+        subscriber = DummySubscriber("int-channel")
+        other_subscriber = DummySubscriber("float-channel")
+        for obj in (publisher, subscriber, other_subscriber):
+            self.hub.register(obj)
+        self.assertEqual(self.hub.get_registered(channels="int-channel", etype=EType.PUBLISHER), [publisher])
+        self.assertEqual(self.hub.get_registered(channels=["int-channel"], etype=EType.SUBSCRIBER), [subscriber])
+        self.assertEqual(self.hub.get_registered(channels=["float-channel", "float-channel"]), [other_subscriber])
+        self.assertEqual(self.hub.get_registered(channels=["str-channel"]), [])
+
+    def test_get_publisher(self):
+        publisher = DummyPublisher("int-channel")
+        self.assertIsNone(self.hub.get_publisher("int-channel"))
+        self.hub.register(publisher)
+        self.assertIs(self.hub.get_publisher("int-channel"), publisher)
+        self.hub.deregister(publisher)
+        self.assertIsNone(self.hub.get_publisher("int-channel"))
+
+    def test_duplicate_publisher_raises_error(self):
+        publisher = DummyPublisher("int-channel")
+        self.hub.register(publisher)
+        with self.assertRaises(RegistrationError):
+            self.hub.register(DummyPublisher("int-channel"))
+
+    def test_register_many(self):
+        publishers = [DummyPublisher(f"channel-{i}") for i in range(10)]
+        subscribers = [DummySubscriber(f"channel-{i}") for i in range(10)]
+        dangling = [DummySubscriber(f"dangling-{i}") for i in range(10)]
+        self.hub.register_many(subscribers + dangling + publishers)
+        self.assertTrue(all(self.hub.is_registered(p) for p in publishers))
+        self.assertTrue(all(self.hub.is_mapped_channel_registrable(s) for s in subscribers))
+        self.assertTrue(all(s in self.hub._dangling_subscribers for s in dangling))
+
+    def test_register_many_is_all_or_nothing(self):
+        publisher = DummyPublisher("channel-1")
+        self.hub.register(publisher)
+        objs = [DummySubscriber("channel-0"), DummyPublisher("channel-0"), DummyPublisher("channel-1")]
+        with self.assertRaises(RegistrationError):
+            self.hub.register_many(objs)
+        self.assertFalse(any(self.hub.is_registered(obj) for obj in objs))
+
+        with self.assertRaises(RegistrationError):
+            self.hub.register_many([DummyPublisher("channel-2"), DummyPublisher("channel-2")])
+        self.assertIsNone(self.hub.get_publisher("channel-2"))
+
+    def test_deregister_many(self):
+        objs = [DummyPublisher("int-channel"), DummySubscriber("int-channel"), self.reg_obj]
+        self.hub.register_many(objs)
+        self.hub.deregister_many(objs)
+        self.assertFalse(any(self.hub.is_registered(obj) for obj in objs))
+        self.assertEqual(self.hub.get_registered(), [])
+        self.assertFalse(self.hub._channels)
+
+    def test_pattern_subscriber_is_dangling_without_matching_publisher(self):
+        subscriber = DummySubscriber("orders.*.fills")
+        self.hub.register(subscriber)
+        self.assertTrue(self.hub.is_registered(subscriber))
+        self.assertFalse(self.hub.is_mapped_channel_registrable(subscriber))
+        self.assertTrue(subscriber in self.hub.get_registered(channels="orders.*.fills"))
+
+    def test_pattern_subscriber_is_matched_with_late_publisher(self):
+        subscriber = DummySubscriber("orders.#")
+        self.hub.register(subscriber)
+        publisher = DummyPublisher("orders.eu.fills")
+        self.hub.register(publisher)
+        self.assertTrue(self.hub.is_mapped_channel_registrable(subscriber))
+        self.assertEqual(self.hub.get_publishers(subscriber), [publisher])
+        self.assertEqual(self.hub.get_subscribers(publisher), {subscriber})
+        self.hub.deregister(publisher)
+        self.assertFalse(self.hub.is_mapped_channel_registrable(subscriber))
+
+    def test_pattern_subscriber_is_matched_with_existing_publishers(self):
+        publishers = [DummyPublisher(name) for name in ("orders.eu.fills", "orders.us.fills", "orders.eu.quotes")]
+        self.hub.register_many(publishers)
+        subscriber = DummySubscriber("orders.*.fills")
+        exact_subscriber = DummySubscriber("orders.eu.fills")
+        self.hub.register_many([subscriber, exact_subscriber])
+        self.assertEqual(set(self.hub.get_publishers(subscriber)), set(publishers[:2]))
+        self.assertEqual(self.hub.get_subscribers(publishers[0]), {subscriber, exact_subscriber})
+        self.assertEqual(self.hub.get_subscribers(publishers[1]), {subscriber})
+        self.assertEqual(self.hub.get_subscribers(publishers[2]), set())
+
+    def test_resolved_subscribers_are_invalidated_on_topology_change(self):
+        publisher = DummyPublisher("orders.eu.fills")
+        subscriber = DummySubscriber("orders.*.fills")
+        self.hub.register_many([publisher, subscriber])
+        self.assertEqual(self.hub.get_subscribers(publisher), {subscriber})
+
+        exact_subscriber = DummySubscriber("orders.eu.fills")
+        self.hub.register(exact_subscriber)
+        self.assertEqual(self.hub.get_subscribers(publisher), {subscriber, exact_subscriber})
+
+        self.hub.deregister(subscriber)
+        self.assertFalse(self.hub.is_registered(subscriber))
+        self.assertEqual(self.hub.get_subscribers(publisher), {exact_subscriber})
+
+        self.hub.deregister(exact_subscriber)
+        self.assertEqual(self.hub.get_subscribers(publisher), set())
+
+    def test_timers_follow_the_event_loop(self):
+        async def fire():
+            fired = asyncio.get_running_loop().create_future()
+            self.hub.timers.call_later(0.001, lambda: fired.set_result(True))
+            return await asyncio.wait_for(fired, timeout=1)
+
+        # every asyncio.run call creates and closes its own event loop
+        self.assertTrue(asyncio.run(fire()))
+        self.assertTrue(asyncio.run(fire()))
+
+    def test_publisher_with_wildcards_raises_error(self):
+        with self.assertRaises(ValueError):
+            DummyPublisher("orders.*")
+
+    def test_observers_are_notified(self):
+        events = []
+        self.hub.add_observer(lambda obj, registered: events.append((obj, registered)))
+        publisher, subscriber = DummyPublisher("int-channel"), DummySubscriber("int-channel")
+        self.hub.register(publisher)
+        self.hub.register_many([subscriber])
+        self.hub.deregister(subscriber)
+        self.assertEqual(events, [(publisher, True), (subscriber, True), (subscriber, False)])
+
+    def test_trace_sink_receives_registration_events(self):
+        events = []
+        self.hub.set_trace_sink(events.append)
+        publisher, subscriber = DummyPublisher("int-channel"), DummySubscriber("int-channel")
+        self.hub.register(publisher)
+        self.hub.register(subscriber)
+        self.hub.deregister(subscriber)
+        self.hub.set_trace_sink(None)
+
+        self.assertEqual([event.name for event in events],
+                         ["registered", "subscriber_added", "registered", "subscriber_removed", "deregistered"])
+        self.assertEqual(events[1].fields, {"subscriber": subscriber, "publisher": publisher})
+        self.assertEqual(events[1].source, "asyncpubsub.hub")
+
+    def test_disabled_tracing_does_not_format_events(self):
+        formatted = []
+
+        class FormattingPublisher(DummyPublisher):
+            def __str__(self):
+                formatted.append(self)
+                return super().__str__()
+
+        logger = logging.getLogger("asyncpubsub.hub")
+        level = logger.level
+        logger.setLevel(logging.INFO)
+        try:
+            self.assertFalse(self.hub.tracer.enabled)
+            publisher = FormattingPublisher("int-channel")
+            self.hub.register(publisher)
+            self.hub.register(DummySubscriber("int-channel"))
+            self.hub.deregister(publisher)
+        finally:
+            logger.setLevel(level)
+        self.assertEqual(formatted, [])
+
     def tearDown(self):
         self.hub.reset()
@@ -0,0 +1,164 @@
+# -*- coding : utf-8 -*-
+
+import asyncio
+import gc
+import unittest
+import weakref
+
+from asyncpubsub import Publisher, Subscriber, ClosedError, get_hub
+
+
+class TestLifecycle(unittest.IsolatedAsyncioTestCase):
+
+    def tearDown(self):
+        get_hub().reset()
+
+    async def test_dropped_subscribers_are_released(self):
+        # the allocations per subscriber are measured by the memory.dropped.* bench metrics
+        n_subscribers = 1000
+        publisher = Publisher("int-channel")
+        references = []
+
+        def callback(msg):
+            pass
+
+        for i in range(n_subscribers):
+            subscriber = Subscriber("int-channel", callback)
+            references.append(weakref.ref(subscriber))
+            if i % 50 == 0:
+                publisher.publish_nowait(i)
+                await asyncio.sleep(0)
+        del subscriber
+        # the cancelled processor tasks finish on the next iterations of the loop
+        await asyncio.sleep(0.01)
+        gc.collect()
+
+        self.assertEqual([reference for reference in references if reference() is not None], [])
+        self.assertEqual(get_hub().get_registered(), [publisher])
+        self.assertEqual(get_hub().get_subscribers(publisher), set())
+        self.assertEqual(publisher.subscribers, [])
+
+    async def test_dropped_publisher_is_released(self):
+        received = []
+        publisher = Publisher("int-channel")
+        subscriber = Subscriber("int-channel", received.append)
+        publisher.publish_nowait(1)
+        await publisher.flush()
+        del publisher
+        gc.collect()
+        self.assertEqual(get_hub().get_registered(), [subscriber])
+        self.assertFalse(get_hub().is_mapped_channel_registrable(subscriber))
+
+        publisher = Publisher("int-channel")
+        publisher.publish_nowait(2)
+        await publisher.flush()
+        self.assertEqual(received, [1, 2])
+
+    async def test_dropped_pattern_subscribers_are_pruned(self):
+        hub = get_hub()
+        publisher = Publisher("orders.eu.fills")
+        subscribers = [Subscriber("orders.*.fills", pull=True), Subscriber("orders.#", pull=True)]
+        for subscriber in subscribers:
+            # in a reference cycle, the weak references are cleared before __del__ deregisters the subscriber
+            subscriber.cycle = subscriber
+        self.assertEqual(len(hub.get_subscribers(publisher)), 2)
+        del subscribers, subscriber
+        await asyncio.sleep(0.01)
+        gc.collect()
+
+        self.assertEqual(hub.get_subscribers(publisher), set())
+        self.assertEqual(len(hub._patterns), 0)
+        self.assertTrue(hub._patterns._root.is_empty())
+
+    async def test_close(self):
+        received = []
+        publisher = Publisher("int-channel")
+        subscriber = Subscriber("int-channel", received.append, queue_size=10)
+        publisher.publish_nowait(1)
+        await publisher.flush()
+        subscriber.notify(2)
+
+        subscriber.close()
+        subscriber.close()
+        self.assertTrue(subscriber.closed)
+        self.assertFalse(get_hub().is_registered(subscriber))
+        self.assertEqual(subscriber._msg_queue.qsize(), 0)
+        await asyncio.sleep(0.01)
+        self.assertEqual(received, [1])
+
+        await publisher.aclose()
+        self.assertTrue(publisher.closed)
+        self.assertEqual(get_hub().get_registered(), [])
+        with self.assertRaises(ClosedError):
+            publisher.publish_nowait(3)
+        with self.assertRaises(ClosedError):
+            await publisher.publish(3)
+        with self.assertRaises(ClosedError):
+            publisher.publish_threadsafe(3)
+        with self.assertRaises(ClosedError):
+            publisher.publish_many_threadsafe([3])
+
+    async def test_threadsafe_messages_buffered_before_close_are_discarded(self):
+        received = []
+        publisher = Publisher("int-channel")
+        subscriber = Subscriber("int-channel", received.append)
+        publisher.publish_threadsafe(1)
+        publisher.close()
+        await asyncio.sleep(0.01)
+        self.assertEqual(received, [])
+        self.assertEqual(subscriber.get_stats()["queue_depth"], 0)
+
+    async def test_aclose_waits_for_the_callbacks(self):
+        started = asyncio.Event()
+        cancelled = []
+
+        async def slow(message):
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(message)
+                raise
+
+        publisher = Publisher("int-channel")
+        subscriber = Subscriber("int-channel", slow, concurrency=2)
+        publisher.publish_nowait(1)
+        await started.wait()
+        await asyncio.wait_for(subscriber.aclose(), timeout=1)
+        self.assertEqual(cancelled, [1])
+        self.assertEqual(subscriber.in_flight, 0)
+
+    async def test_async_context_manager(self):
+        received = []
+        async with Publisher("int-channel") as publisher, \
+                Subscriber("int-channel", received.append) as subscriber:
+            publisher.publish_nowait(1)
+            await publisher.flush()
+        self.assertEqual(received, [1])
+        self.assertTrue(publisher.closed)
+        self.assertTrue(subscriber.closed)
+        self.assertEqual(get_hub().get_registered(), [])
+
+    async def test_close_ends_pulls(self):
+        publisher = Publisher("int-channel")
+        subscriber = Subscriber("int-channel", pull=True)
+        publisher.publish_nowait(1)
+
+        async def consume():
+            return [message async for message in subscriber]
+
+        other = Subscriber("other-channel", pull=True)
+        consumer = asyncio.ensure_future(consume())
+        pending = asyncio.ensure_future(other.get())
+        await asyncio.sleep(0.01)
+        subscriber.close()
+        other.close()
+        self.assertEqual(await asyncio.wait_for(consumer, timeout=1), [1])
+        with self.assertRaises(ClosedError):
+            await asyncio.wait_for(pending, timeout=1)
+        with self.assertRaises(ClosedError):
+            await subscriber.get()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+# -*- coding : utf-8 -*-
+
+import asyncio
+import unittest
+
+from asyncpubsub import (Publisher, Subscriber, Throttle, Debounce, Sample, DistinctUntilChanged,
+                         get_hub)
+from asyncpubsub.core.timers import TimerQueue
+
+
+class TestTimerQueue(unittest.IsolatedAsyncioTestCase):
+
+    async def test_timers_run_in_deadline_order(self):
+        timers = TimerQueue()
+        fired = []
+        for delay in (0.03, 0.01, 0.02):
+            timers.call_later(delay, lambda delay=delay: fired.append(delay))
+        cancelled = timers.call_later(0.015, lambda: fired.append("cancelled"))
+        timers.cancel(cancelled)
+        self.assertEqual(len(timers), 3)
+
+        await asyncio.sleep(0.05)
+        self.assertEqual(fired, [0.01, 0.02, 0.03])
+        self.assertEqual(len(timers), 0)
+
+
+class TestOperators(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.hub = get_hub()
+        self.publisher = Publisher("int-channel", eager=True)
+        self.received = []
+        # the hub references the subscribers weakly
+        self.subscribers = []
+
+    def subscribe(self, *operators):
+        subscriber = Subscriber("int-channel", self.received.append, operators=operators)
+        self.subscribers.append(subscriber)
+        return subscriber
+
+    def test_invalid_operators_raise_error(self):
+        with self.assertRaises(TypeError):
+            self.subscribe(lambda msg: True)
+        with self.assertRaises(ValueError):
+            Throttle(0)
+        operator = DistinctUntilChanged()
+        self.subscribe(operator)
+        with self.assertRaises(ValueError):
+            self.subscribe(operator)
+
+    async def test_suppressed_messages_are_not_queued(self):
+        subscriber = Subscriber("other-channel", self.received.append, queue_size=1,
+                                operators=[DistinctUntilChanged(key=abs)])
+        self.assertEqual(subscriber.notify_many([1, -1, 1, -1]), [])
+        self.assertEqual(subscriber.get_stats()["queue_depth"], 1)
+        self.assertEqual(subscriber.dropped, 0)
+
+    async def test_throttle(self):
+        self.subscribe(Throttle(0.05))
+        self.publisher.publish_many_nowait(range(5))
+        self.assertEqual(self.received, [0])
+        await asyncio.sleep(0.06)
+        self.publisher.publish_nowait(5)
+        self.assertEqual(self.received, [0, 5])
+
+    async def test_throttle_trailing(self):
+        self.subscribe(Throttle(0.03, trailing=True))
+        self.publisher.publish_many_nowait(range(5))
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.received, [0, 4])
+
+    async def test_debounce(self):
+        self.subscribe(Debounce(0.03))
+        for i in range(3):
+            self.publisher.publish_nowait(i)
+            await asyncio.sleep(0.01)
+        self.assertEqual(self.received, [])
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.received, [2])
+
+    async def test_sample(self):
+        self.subscribe(Sample(0.03))
+        self.publisher.publish_many_nowait(range(3))
+        await asyncio.sleep(0.05)
+        self.publisher.publish_many_nowait(range(3, 6))
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.received, [2, 5])
+
+    async def test_operators_are_chained(self):
+        self.subscribe(DistinctUntilChanged(), Debounce(0.02))
+        self.publisher.publish_many_nowait([1, 1, 2, 2])
+        await asyncio.sleep(0.04)
+        self.publisher.publish_nowait(2)
+        await asyncio.sleep(0.04)
+        self.assertEqual(self.received, [2])
+
+    def tearDown(self):
+        self.hub.reset()
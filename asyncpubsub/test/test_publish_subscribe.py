@@ -4,7 +4,7 @@ import asyncio
 import random
 import unittest
 
-from asyncpubsub import Publisher, get_hub
+from asyncpubsub import OverflowPolicy, Publisher, Subscriber, get_hub
 from asyncpubsub.test.support import TrackedSubscriberWithCallbacks
 
 
@@ -132,5 +132,103 @@ class TestPublishSubscribe(unittest.IsolatedAsyncioTestCase):
                 self.assertTrue(len(messages) == len(sub.received_messages))
                 self.assertTrue(all(i == j for i, j in zip(messages, sub.received_messages)))
 
+    async def test_pattern_subscriber_receives_from_matching_publishers(self):
+        received = []
+        sub = Subscriber("orders.*.fills", received.append)
+        pubs = [Publisher(name) for name in ("orders.eu.fills", "orders.us.fills", "orders.eu.quotes")]
+
+        for i, pub in enumerate(pubs):
+            await pub.publish(i)
+
+        await asyncio.wait_for(asyncio.gather(*(pub.flush() for pub in pubs)), timeout=3)
+        self.assertEqual(sorted(received), [0, 1])
+
+    async def test_ring_publisher_multiple_subscribers(self):
+        messages = random.sample(range(100), random.randint(5, 10))
+
+        dangling_sub = TrackedSubscriberWithCallbacks("int-channel", use_sync_cb=True)
+        pub = Publisher("int-channel", ring_size=16)
+        subs = [dangling_sub] + [TrackedSubscriberWithCallbacks("int-channel", use_async_cb=True)
+                                 for _ in range(random.randint(2, 5))]
+
+        for msg in messages:
+            await pub.publish(msg)
+
+        await _wait_for_tasks({asyncio.create_task(sub.wait_for_n_messages(len(messages))) for sub in subs},
+                              timeout=5)
+
+        for sub in subs:
+            self.assertEqual(sub.received_messages, messages)
+            self.assertEqual(sub.notified_messages, [])
+            self.assertEqual(sub.lag, 0)
+
+    async def test_ring_publisher_reports_overrun(self):
+        missed = []
+        received = []
+        pub = Publisher("int-channel", ring_size=4)
+        sub = Subscriber("int-channel", received.append, on_overrun=missed.append)
+
+        pub.publish_many_nowait(range(10))
+        await asyncio.wait_for(pub.flush(), timeout=3)
+
+        self.assertEqual(received, [6, 7, 8, 9])
+        self.assertEqual(missed, [6])
+        self.assertEqual(sub.missed, 6)
+
+    async def test_blocking_subscriber_applies_backpressure(self):
+        received = []
+        release = asyncio.Event()
+
+        async def slow_callback(msg):
+            await release.wait()
+            received.append(msg)
+
+        pub = Publisher("int-channel", queue_size=2)
+        sub = Subscriber("int-channel", slow_callback, queue_size=2, overflow=OverflowPolicy.BLOCK)
+
+        messages = list(range(10))
+        publish_task = asyncio.create_task(pub.publish_many(messages))
+        await asyncio.sleep(0.1)
+        self.assertFalse(publish_task.done())
+        self.assertEqual(sub.dropped, 0)
+
+        release.set()
+        await asyncio.wait_for(publish_task, timeout=3)
+        await asyncio.wait_for(pub.flush(), timeout=3)
+        self.assertEqual(received, messages)
+
+    async def test_conflating_subscriber(self):
+        received = []
+        release = asyncio.Event()
+
+        async def slow_callback(msg):
+            await release.wait()
+            received.append(msg)
+
+        pub = Publisher("int-channel")
+        sub = Subscriber("int-channel", slow_callback, overflow=OverflowPolicy.CONFLATE, key=lambda msg: msg % 3)
+
+        await pub.publish_many(range(30))
+        release.set()
+        await asyncio.wait_for(pub.flush(), timeout=3)
+
+        # the whole burst is delivered as one batch, keeping the latest message per key
+        self.assertEqual(received, [27, 28, 29])
+        self.assertEqual(sub.conflated, 27)
+
+    async def test_raising_subscriber_does_not_stop_publisher(self):
+        received = []
+        pub = Publisher("int-channel")
+        sub = Subscriber("int-channel", received.append, queue_size=2, overflow=OverflowPolicy.RAISE)
+        other_sub = TrackedSubscriberWithCallbacks("int-channel", use_sync_cb=True)
+
+        pub.publish_many_nowait(range(5))
+        await asyncio.wait_for(other_sub.wait_for_n_messages(5), timeout=3)
+        await pub.publish(5)
+        await asyncio.wait_for(other_sub.wait_for_n_messages(6), timeout=3)
+
+        self.assertEqual(received, [0, 1, 5])
+        self.assertEqual(sub.dropped, 3)
+
     def tearDown(self):
         self.hub.reset()
@@ -1,9 +1,11 @@
 # -*- coding : utf-8 -*-
 
+import asyncio
 import random
+import threading
 import unittest
 
-from asyncpubsub import Publisher, Subscriber, RegistrationError, get_hub
+from asyncpubsub import Publisher, Subscriber, RegistrationError, Priority, OverflowPolicy, get_hub
 from asyncpubsub.test.support import TrackedPublisher
 
 
@@ -50,5 +52,138 @@ class TestPublisher(unittest.IsolatedAsyncioTestCase):
 
         self.assertTrue(all(i == j for i, j in zip(messages, self.publisher.published_messages)))
 
+    def test_published_many_no_wait(self):
+        messages = [random.randint(0, 100) for i in range(random.randint(5, 10))]
+        self.publisher.publish_many_nowait(messages)
+        self.assertEqual(messages, self.publisher.published_messages)
+
+    async def test_published_many_default(self):
+        messages = [random.randint(0, 100) for i in range(random.randint(5, 10))]
+        await self.publisher.publish_many(iter(messages))
+        self.assertEqual(messages, self.publisher.published_messages)
+
+    async def test_queued_messages_are_delivered_as_one_batch(self):
+        batches = []
+        subscriber = Subscriber("int-channel", batch_callback=batches.append)
+        messages = list(range(10))
+        self.publisher.publish_many_nowait(messages)
+        while not batches:
+            await asyncio.sleep(0.01)
+        self.assertEqual(batches, [messages])
+
+    async def test_publish_threadsafe(self):
+        batches = []
+        subscriber = Subscriber("int-channel", batch_callback=batches.extend)
+        n_threads, n_messages = 8, 1000
+
+        def produce(thread_id):
+            for i in range(n_messages):
+                self.publisher.publish_threadsafe((thread_id, i))
+
+        threads = [threading.Thread(target=produce, args=(i,)) for i in range(n_threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            await asyncio.get_running_loop().run_in_executor(None, thread.join)
+        while len(batches) < n_threads * n_messages:
+            await asyncio.sleep(0.01)
+
+        self.assertEqual(len(batches), n_threads * n_messages)
+        for thread_id in range(n_threads):
+            self.assertEqual([i for t, i in batches if t == thread_id], list(range(n_messages)))
+
+    async def test_publish_many_threadsafe_with_bounded_queue(self):
+        received = []
+        publisher = Publisher("bounded-channel", queue_size=2)
+        subscriber = Subscriber("bounded-channel", batch_callback=received.extend)
+        messages = list(range(50))
+        thread = threading.Thread(target=publisher.publish_many_threadsafe, args=(messages,))
+        thread.start()
+        await asyncio.get_running_loop().run_in_executor(None, thread.join)
+        while len(received) < len(messages):
+            await asyncio.sleep(0.01)
+        self.assertEqual(received, messages)
+
+    def test_eager_publisher_with_ring_buffer_raises_error(self):
+        with self.assertRaises(ValueError):
+            Publisher("eager-channel", ring_size=16, eager=True)
+
+    async def test_eager_publish_invokes_sync_callbacks_inline(self):
+        publisher = Publisher("eager-channel", eager=True)
+        received, batches, queued = [], [], []
+
+        async def async_callback(msg):
+            queued.append(msg)
+
+        subscribers = [Subscriber("eager-channel", received.append),
+                       Subscriber("eager-channel", batch_callback=batches.append, max_batch=2),
+                       Subscriber("eager-channel", async_callback)]
+
+        publisher.publish_nowait(1)
+        await publisher.publish(2)
+        publisher.publish_many_nowait([3, 4, 5])
+        self.assertEqual(received, [1, 2, 3, 4, 5])
+        self.assertEqual(batches, [[1], [2], [3, 4], [5]])
+        self.assertEqual(queued, [])
+
+        await asyncio.sleep(0.01)
+        self.assertEqual(queued, [1, 2, 3, 4, 5])
+        del publisher
+
+    async def test_eager_publish_preserves_order_of_queued_messages(self):
+        publisher = Publisher("eager-channel", eager=True)
+        received = []
+
+        def callback(msg):
+            received.append(msg)
+            # messages published by a callback are queued
+            if msg == 0:
+                publisher.publish_nowait(1)
+
+        subscriber = Subscriber("eager-channel", callback)
+        publisher.publish_nowait(0)
+        publisher.publish_nowait(2)
+        self.assertEqual(received, [0])
+        await asyncio.sleep(0.01)
+        publisher.publish_nowait(3)
+        self.assertEqual(received, [0, 1, 2, 3])
+        del publisher
+
+    async def test_eager_publish_to_blocking_subscriber_preserves_order(self):
+        publisher = Publisher("eager-channel", eager=True)
+        received = []
+
+        async def callback(msg):
+            await asyncio.sleep(0)
+            received.append(msg)
+
+        subscriber = Subscriber("eager-channel", callback, queue_size=4, overflow=OverflowPolicy.BLOCK)
+        for i in range(10):
+            await publisher.publish(i)
+        await publisher.publish_many(range(10, 20))
+        for i in range(20, 30):
+            await publisher.publish(i)
+            await asyncio.sleep(0)
+        await asyncio.wait_for(publisher.flush(), timeout=3)
+        self.assertEqual(received, list(range(30)))
+        self.assertEqual(subscriber.dropped, 0)
+        del publisher
+
+    async def test_high_priority_overtakes_queued_messages(self):
+        publisher = Publisher("lane-channel")
+        received = []
+        subscriber = Subscriber("lane-channel", received.append)
+        publisher.publish_many_nowait(range(10), priority=Priority.LOW)
+        publisher.publish_nowait("cancel", priority=Priority.HIGH)
+        self.assertEqual(publisher.get_stats()["lane_depths"], {"high": 1, "normal": 0, "low": 10})
+        with self.assertRaises(ValueError):
+            publisher.publish_nowait("invalid", priority=5)
+
+        while len(received) < 11:
+            await asyncio.sleep(0.01)
+        self.assertEqual(received, ["cancel", *range(10)])
+        self.assertEqual(subscriber.get_stats()["lane_depths"], {"high": 0, "normal": 0, "low": 0})
+        del publisher
+
     def tearDown(self):
         self.hub.reset()
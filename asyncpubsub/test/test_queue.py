@@ -0,0 +1,119 @@
+# -*- coding : utf-8 -*-
+
+import asyncio
+import unittest
+
+from asyncpubsub import OverflowPolicy, QueueOverflowError
+from asyncpubsub.core.queue import MessageQueue, LaneQueue, Priority
+
+
+class TestMessageQueue(unittest.IsolatedAsyncioTestCase):
+
+    def test_invalid_args_raise_error(self):
+        with self.assertRaises(ValueError):
+            MessageQueue(maxsize=-1)
+        with self.assertRaises(TypeError):
+            MessageQueue(policy="drop_oldest")
+        with self.assertRaises(ValueError):
+            MessageQueue(policy=OverflowPolicy.CONFLATE)
+
+    def test_unbounded_queue_never_drops(self):
+        for policy in OverflowPolicy:
+            if policy is OverflowPolicy.CONFLATE:
+                continue
+            queue = MessageQueue(policy=policy)
+            self.assertEqual(queue.put_many_nowait(range(100)), 100)
+            self.assertEqual(queue.get_many_nowait(), list(range(100)))
+            self.assertEqual(queue.dropped, 0)
+
+    def test_drop_oldest(self):
+        queue = MessageQueue(maxsize=3, policy=OverflowPolicy.DROP_OLDEST)
+        queue.put_many_nowait(range(5))
+        self.assertEqual(queue.get_many_nowait(), [2, 3, 4])
+        self.assertEqual(queue.dropped, 2)
+
+    def test_drop_newest(self):
+        queue = MessageQueue(maxsize=3, policy=OverflowPolicy.DROP_NEWEST)
+        queue.put_many_nowait(range(5))
+        self.assertEqual(queue.get_many_nowait(), [0, 1, 2])
+        self.assertEqual(queue.dropped, 2)
+
+    def test_raise(self):
+        queue = MessageQueue(maxsize=3, policy=OverflowPolicy.RAISE)
+        with self.assertRaises(QueueOverflowError):
+            queue.put_many_nowait(range(5))
+        self.assertEqual(queue.get_many_nowait(), [0, 1, 2])
+        self.assertEqual(queue.dropped, 2)
+
+    def test_block_stops_at_full(self):
+        queue = MessageQueue(maxsize=3, policy=OverflowPolicy.BLOCK)
+        self.assertEqual(queue.put_many_nowait(range(5)), 3)
+        with self.assertRaises(asyncio.QueueFull):
+            queue.put_nowait(3)
+        self.assertEqual(queue.dropped, 0)
+
+    async def test_block_put_waits_for_space(self):
+        queue = MessageQueue(maxsize=1, policy=OverflowPolicy.BLOCK)
+        queue.put_nowait(0)
+        put_task = asyncio.create_task(queue.put(1))
+        await asyncio.sleep(0)
+        self.assertFalse(put_task.done())
+        self.assertEqual(queue.get_nowait(), 0)
+        await asyncio.wait_for(put_task, timeout=1)
+        self.assertEqual(queue.get_nowait(), 1)
+
+    def test_conflate_keeps_latest_per_key(self):
+        queue = MessageQueue(policy=OverflowPolicy.CONFLATE, key=lambda tick: tick[0])
+        ticks = [(instrument, price) for price in range(100) for instrument in ("a", "b", "c")]
+        queue.put_many_nowait(ticks)
+        self.assertEqual(queue.get_many_nowait(), [("a", 99), ("b", 99), ("c", 99)])
+        self.assertEqual(queue.conflated, len(ticks) - 3)
+        self.assertEqual(queue.dropped, 0)
+
+    def test_conflate_drops_oldest_key_when_full(self):
+        queue = MessageQueue(maxsize=2, policy=OverflowPolicy.CONFLATE, key=lambda tick: tick[0])
+        queue.put_many_nowait([("a", 0), ("b", 0), ("c", 0), ("c", 1)])
+        self.assertEqual(queue.get_many_nowait(), [("b", 0), ("c", 1)])
+        self.assertEqual(queue.dropped, 1)
+        self.assertEqual(queue.conflated, 1)
+
+    def test_lanes_are_weighted(self):
+        queue = MessageQueue()
+        queue.put_many_nowait([("low", i) for i in range(4)], Priority.LOW)
+        queue.put_many_nowait([("normal", i) for i in range(4)], Priority.NORMAL)
+        queue.put_many_nowait([("high", i) for i in range(6)], Priority.HIGH)
+        self.assertEqual(queue.lane_sizes(), (6, 4, 4))
+        lanes = [lane for lane, _ in queue.get_many_nowait()]
+        self.assertEqual(lanes[:7], ["high"] * 4 + ["normal"] * 2 + ["low"])
+        self.assertEqual(lanes.count("low"), 4)
+
+    def test_drop_oldest_discards_lowest_priority_first(self):
+        queue = MessageQueue(maxsize=2, policy=OverflowPolicy.DROP_OLDEST)
+        queue.put_nowait("low", Priority.LOW)
+        queue.put_nowait("normal")
+        queue.put_nowait("high", Priority.HIGH)
+        self.assertEqual(queue.get_many_nowait(), ["high", "normal"])
+        self.assertEqual(queue.dropped, 1)
+
+
+class TestLaneQueue(unittest.IsolatedAsyncioTestCase):
+
+    async def test_get_waits_for_message(self):
+        queue = LaneQueue()
+        get_task = asyncio.create_task(queue.get())
+        await asyncio.sleep(0)
+        self.assertFalse(get_task.done())
+        queue.put_nowait("cancel", Priority.HIGH)
+        self.assertEqual(await asyncio.wait_for(get_task, timeout=1), "cancel")
+
+    async def test_drain_groups_messages_by_lane(self):
+        queue = LaneQueue(maxsize=3)
+        queue.put_nowait(0, Priority.LOW)
+        queue.put_nowait(1)
+        queue.put_nowait(2, Priority.HIGH)
+        with self.assertRaises(asyncio.QueueFull):
+            queue.put_nowait(3)
+        put_task = asyncio.create_task(queue.put(3))
+        self.assertEqual(queue.drain(), [(Priority.HIGH, [2]), (Priority.NORMAL, [1]), (Priority.LOW, [0])])
+        await asyncio.wait_for(put_task, timeout=1)
+        self.assertEqual(queue.lane_sizes(), (0, 1, 0))
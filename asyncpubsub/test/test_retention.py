@@ -0,0 +1,76 @@
+# -*- coding : utf-8 -*-
+
+import asyncio
+import unittest
+from unittest import mock
+
+from asyncpubsub import Publisher, Subscriber, get_hub
+from asyncpubsub.core.retention import Retention
+
+
+class TestRetention(unittest.TestCase):
+
+    def test_invalid_args_raise_error(self):
+        for kwargs in ({}, {"size": -1}, {"max_age": 0}):
+            with self.assertRaises(ValueError):
+                Retention(**kwargs)
+
+    def test_size_bounds_retained_messages(self):
+        retention = Retention(size=3)
+        retention.extend(range(5))
+        self.assertEqual(retention.last(), [2, 3, 4])
+        self.assertEqual(retention.last(2), [3, 4])
+        self.assertEqual(retention.last(0), [])
+
+    def test_max_age_expires_messages(self):
+        retention = Retention(max_age=10)
+        with mock.patch("asyncpubsub.core.retention.time.monotonic", return_value=100):
+            retention.extend([1, 2])
+        with mock.patch("asyncpubsub.core.retention.time.monotonic", return_value=105):
+            retention.extend([3])
+        with mock.patch("asyncpubsub.core.retention.time.monotonic", return_value=112):
+            self.assertEqual(retention.last(), [3])
+
+
+class TestReplay(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.hub = get_hub()
+
+    async def test_replay_is_delivered_before_live_messages(self):
+        publisher = Publisher("int-channel", retain=5)
+        publisher.publish_many_nowait(range(10))
+        await asyncio.sleep(0.01)
+        self.assertEqual(publisher.retained(), [5, 6, 7, 8, 9])
+
+        # messages still queued by the publisher are delivered live
+        publisher.publish_many_nowait(range(10, 13))
+        received = []
+        subscriber = Subscriber("int-channel", received.append, replay=3)
+        await publisher.publish(13)
+        while len(received) < 7:
+            await asyncio.sleep(0.01)
+        self.assertEqual(received, [7, 8, 9, 10, 11, 12, 13])
+        del subscriber
+
+    async def test_replay_before_eager_delivery(self):
+        publisher = Publisher("int-channel", eager=True, retain=1)
+        publisher.publish_nowait("last")
+        received = []
+        subscriber = Subscriber("int-channel", received.append, replay=1)
+        publisher.publish_nowait("live")
+        await asyncio.sleep(0.01)
+        self.assertEqual(received, ["last", "live"])
+
+    async def test_pattern_replay_merges_publishers(self):
+        publishers = [Publisher(f"prices.{name}", retain=10) for name in "ab"]
+        for i in range(4):
+            publishers[i % 2].publish_nowait(i)
+            await asyncio.sleep(0)
+        received = []
+        subscriber = Subscriber("prices.*", batch_callback=received.extend, replay=3)
+        await asyncio.sleep(0.01)
+        self.assertEqual(received, [1, 2, 3])
+
+    def tearDown(self):
+        self.hub.reset()
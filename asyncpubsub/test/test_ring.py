@@ -0,0 +1,65 @@
+# -*- coding : utf-8 -*-
+
+import asyncio
+import unittest
+
+from asyncpubsub.core.ring import RingBuffer
+
+
+class TestRingBuffer(unittest.TestCase):
+
+    def test_invalid_capacity_raises_error(self):
+        for capacity in (0, -1, 1.5):
+            with self.assertRaises(ValueError):
+                RingBuffer(capacity)
+
+    def test_reader_starts_at_head(self):
+        ring = RingBuffer(4)
+        ring.append(0)
+        reader = ring.reader()
+        self.assertTrue(reader.empty())
+        ring.extend([1, 2])
+        self.assertEqual(reader.lag, 2)
+        self.assertEqual([reader.get_nowait(), reader.get_nowait()], [1, 2])
+        with self.assertRaises(asyncio.QueueEmpty):
+            reader.get_nowait()
+
+    def test_readers_keep_independent_cursors(self):
+        ring = RingBuffer(8)
+        readers = [ring.reader() for _ in range(3)]
+        ring.extend(range(5))
+        self.assertEqual(readers[0].get_many_nowait(), list(range(5)))
+        self.assertEqual(readers[1].get_many_nowait(max_n=2), [0, 1])
+        self.assertEqual(readers[1].lag, 3)
+        self.assertEqual(readers[2].lag, 5)
+
+    def test_overrun_reports_missed_messages(self):
+        missed = []
+        ring = RingBuffer(4)
+        reader = ring.reader(on_overrun=missed.append)
+        ring.extend(range(10))
+        self.assertEqual(len(ring), 4)
+        self.assertEqual(reader.qsize(), 4)
+        self.assertEqual(reader.get_nowait(), 6)
+        self.assertEqual(missed, [6])
+        self.assertEqual(reader.missed, 6)
+        ring.extend(range(10, 20))
+        self.assertEqual(reader.get_many_nowait(), list(range(16, 20)))
+        self.assertEqual(missed, [6, 9])
+        self.assertEqual(reader.missed, 15)
+
+    def test_append_resolves_waiters(self):
+        loop = asyncio.new_event_loop()
+        try:
+            ring = RingBuffer(4)
+            waiter = loop.create_future()
+            ring.add_waiter(waiter)
+            ring.append(0)
+            self.assertTrue(waiter.done())
+            waiter = loop.create_future()
+            ring.add_waiter(waiter)
+            ring.remove_waiter(waiter)
+            ring.append(1)
+            self.assertFalse(waiter.done())
+        finally:
+            loop.close()
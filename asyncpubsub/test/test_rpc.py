@@ -0,0 +1,130 @@
+# -*- coding : utf-8 -*-
+
+import asyncio
+import unittest
+
+from asyncpubsub import Requester, Responder, NoResponderError, LeastLoaded, Match, OverflowPolicy, QueueOverflowError, get_hub
+
+
+class TestRequestReply(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.hub = get_hub()
+
+    def test_invalid_args_raise_error(self):
+        with self.assertRaises(ValueError):
+            Responder("quotes.*", lambda payload: payload)
+        with self.assertRaises(TypeError):
+            Responder("quotes", None)
+        with self.assertRaises(ValueError):
+            Requester("quotes", timeout=0)
+        with self.assertRaises(ValueError):
+            Responder("quotes", lambda payload: payload, queue_size=1, overflow=OverflowPolicy.DROP_OLDEST)
+
+    async def test_request_reply(self):
+        async def double(payload):
+            await asyncio.sleep(0)
+            return payload * 2
+
+        responders = [Responder("double", double, concurrency=4), Responder("square", lambda payload: payload ** 2)]
+        requester = Requester("double")
+        self.assertEqual(await asyncio.gather(*(requester.request(i) for i in range(5))), [0, 2, 4, 6, 8])
+        self.assertEqual(await Requester("square").request(3), 9)
+        self.assertEqual(requester.pending, 0)
+
+    async def test_errors_are_raised_by_the_requester(self):
+        responder = Responder("div", lambda payload: 1 / payload)
+        with self.assertRaises(ZeroDivisionError):
+            await Requester("div").request(0)
+        with self.assertRaises(NoResponderError):
+            await Requester("unknown").request(0)
+
+    async def test_timeout_and_cancellation(self):
+        release = asyncio.Event()
+
+        async def wait(payload):
+            await release.wait()
+            return payload
+
+        responder = Responder("wait", wait, concurrency=2)
+        requester = Requester("wait", timeout=0.01)
+        with self.assertRaises(asyncio.TimeoutError):
+            await requester.request(1)
+        task = asyncio.ensure_future(requester.request(2, timeout=1))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.sleep(0)
+        self.assertEqual(requester.pending, 0)
+
+        # late replies are discarded
+        release.set()
+        await asyncio.sleep(0.01)
+        self.assertEqual(await requester.request(3), 3)
+
+    async def test_ordering_key_is_computed_from_the_payload(self):
+        served = []
+
+        async def fill(order):
+            await asyncio.sleep(0.01 if order["id"] == 0 else 0)
+            served.append(order["id"])
+            return order["id"]
+
+        responder = Responder("fills", fill, concurrency=4, ordering_key=lambda order: order["account"])
+        requester = Requester("fills", timeout=1)
+        orders = [{"id": i, "account": "ACC-1" if i < 2 else "ACC-2"} for i in range(4)]
+        self.assertEqual(await asyncio.gather(*(requester.request(order) for order in orders)), [0, 1, 2, 3])
+        # the requests of an account are served in order
+        self.assertLess(served.index(0), served.index(1))
+        self.assertLess(served.index(2), served.index(0))
+
+    async def test_requests_are_sent_to_the_responders_accepting_the_payload(self):
+        responders = [Responder("quotes", lambda payload: "fx", where=lambda payload: str(payload).startswith("EUR")),
+                      Responder("quotes", lambda payload: "equity", where=Match("exchange", "NYSE"))]
+        requester = Requester("quotes")
+        self.assertEqual([await requester.request("EURUSD") for _ in range(2)], ["fx", "fx"])
+        self.assertEqual(await requester.request({"exchange": "NYSE"}), "equity")
+        with self.assertRaises(NoResponderError):
+            await requester.request("GBPUSD")
+
+    async def test_full_responder_queue(self):
+        release = asyncio.Event()
+
+        async def wait(payload):
+            await release.wait()
+            return payload
+
+        responder = Responder("wait", wait, queue_size=1)
+        requester = Requester("wait")
+        tasks = [asyncio.ensure_future(requester.request(i)) for i in range(4)]
+        await asyncio.sleep(0.01)
+        self.assertEqual(responder.dropped, 0)
+        release.set()
+        self.assertEqual(await asyncio.wait_for(asyncio.gather(*tasks), timeout=1), [0, 1, 2, 3])
+
+        responder = Responder("raise", wait, queue_size=1, overflow=OverflowPolicy.RAISE)
+        requester = Requester("raise", timeout=1)
+        release.clear()
+        # the requests are submitted before the first one is taken from the queue
+        tasks = [asyncio.ensure_future(requester.request(i)) for i in range(2)]
+        await asyncio.sleep(0.01)
+        release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        self.assertEqual(results[0], 0)
+        self.assertIsInstance(results[1], QueueOverflowError)
+        self.assertEqual(requester.pending, 0)
+
+    async def test_balancers(self):
+        served = {name: [] for name in "ab"}
+        workers = [Responder("work", lambda payload, name=name: served[name].append(payload)) for name in "ab"]
+
+        requester = Requester("work")
+        await asyncio.gather(*(requester.request(i) for i in range(6)))
+        self.assertEqual(sorted(map(len, served.values())), [3, 3])
+
+        balancer = LeastLoaded()
+        responders = self.hub.get_responders("work")
+        responders[0].notify_many([None] * 3)
+        self.assertIs(balancer(responders, None), responders[1])
+
+    def tearDown(self):
+        self.hub.reset()
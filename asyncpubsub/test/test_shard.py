@@ -0,0 +1,73 @@
+# -*- coding : utf-8 -*-
+
+import asyncio
+import threading
+import unittest
+
+from asyncpubsub import Hub, Publisher, Subscriber, ShardGroup, get_hub
+
+
+class TestExplicitHub(unittest.IsolatedAsyncioTestCase):
+
+    async def test_entities_are_scoped_to_their_hub(self):
+        hub = Hub()
+        received = []
+        publisher = Publisher("int-channel", hub=hub)
+        subscriber = Subscriber("int-channel", received.append, hub=hub)
+        other = Subscriber("int-channel", lambda msg: self.fail("delivered to another hub"))
+        self.assertEqual(len(publisher.subscribers), 1)
+        self.assertIsNone(get_hub().get_publisher("int-channel"))
+
+        publisher.publish_nowait(1)
+        await asyncio.sleep(0.01)
+        self.assertEqual(received, [1])
+
+    def tearDown(self):
+        get_hub().reset()
+
+
+class TestShardGroup(unittest.TestCase):
+
+    def setUp(self):
+        self.shards = ShardGroup(2)
+        self.shards.start()
+
+    def test_owner_is_stable(self):
+        self.assertIs(self.shards.owner("orders"), self.shards.owner("orders"))
+        self.assertEqual({self.shards.owner(f"channel-{i}").index for i in range(16)}, {0, 1})
+
+    def test_linked_channel_is_delivered_across_shards(self):
+        owner = self.shards.owner("orders")
+        other = self.shards[1 - owner.index]
+        publisher = owner.call(Publisher, "orders", hub=owner.hub).result()
+        self.shards.link("orders", other)
+        self.shards.link("orders", other)
+
+        received = {}
+        done = threading.Event()
+
+        def subscribe(shard):
+            messages = received[shard.index] = []
+
+            def callback(message):
+                messages.append((message, threading.current_thread().name))
+                if all(len(messages) == 100 for messages in received.values()):
+                    done.set()
+
+            return Subscriber("orders", callback, hub=shard.hub)
+
+        subscribers = [shard.call(subscribe, shard).result() for shard in self.shards]
+
+        publisher.publish_many_threadsafe(range(100))
+        self.assertTrue(done.wait(5))
+        for shard in self.shards:
+            self.assertEqual([message for message, _ in received[shard.index]], list(range(100)))
+            self.assertEqual({thread for _, thread in received[shard.index]}, {f"asyncpubsub-shard-{shard.index}"})
+
+        with self.assertRaises(RuntimeError):
+            other.call(self.shards.link, "orders", other).result()
+        self.assertEqual(len(subscribers), 2)
+
+    def tearDown(self):
+        self.shards.stop()
+        self.assertFalse(any(shard.running for shard in self.shards))
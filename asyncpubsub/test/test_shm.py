@@ -0,0 +1,167 @@
+# -*- coding : utf-8 -*-
+
+import asyncio
+import multiprocessing
+import os
+import pickle
+import unittest
+
+from asyncpubsub import Publisher, Subscriber, CodecRegistry, get_hub
+from asyncpubsub.core.shm import SharedRing, SharedMemorySender, SharedMemoryReceiver, segment_name
+
+
+def _receive(channel_name, n_messages, conn):
+    async def run():
+        received = []
+        done = asyncio.get_running_loop().create_future()
+
+        def callback(msg):
+            received.append(msg)
+            if len(received) == n_messages:
+                done.set_result(None)
+
+        receiver = SharedMemoryReceiver(channel_name)
+        subscriber = Subscriber(channel_name, callback)
+        conn.send("ready")
+        await asyncio.wait_for(done, 10)
+        conn.send(received)
+        receiver.close()
+        del subscriber
+
+    asyncio.run(run())
+
+
+class TestSharedRing(unittest.TestCase):
+
+    def setUp(self):
+        self.ring = SharedRing(f"aps_test_{os.getpid()}", 256, create=True)
+        self.remote = SharedRing(self.ring.name)
+
+    def test_invalid_capacity_raises_error(self):
+        with self.assertRaises(ValueError):
+            SharedRing("aps_test_invalid", 8, create=True)
+
+    def test_roundtrip(self):
+        reader = self.remote.reader()
+        self.assertTrue(reader.empty())
+        self.ring.write_many([[b"bytes"], [bytearray(b"byte"), memoryview(b"array")], []])
+        self.assertEqual(reader.read_many(), [b"bytes", b"bytearray", b""])
+        self.assertEqual(reader.read_many(), [])
+
+    def test_records_wrap_around(self):
+        reader = self.remote.reader()
+        for i in range(100):
+            self.ring.write_many([[b"x" * i]])
+            self.assertEqual(reader.read_many(), [b"x" * i])
+        self.assertEqual(reader.missed, 0)
+
+    def test_lagging_reader_misses_overwritten_records(self):
+        overruns = []
+        reader = self.remote.reader(on_overrun=overruns.append)
+        self.ring.write_many([[bytes([i])] for i in range(100)])
+        records = reader.read_many()
+        self.assertEqual(records, [bytes([i]) for i in range(100 - len(records), 100)])
+        self.assertEqual(reader.missed, 100 - len(records))
+        self.assertEqual(overruns, [reader.missed])
+
+    def test_records_are_decoded_from_the_segment(self):
+        reader = self.remote.reader()
+        self.ring.write_many([[b"hello"], [b"invalid"], [b"world"]])
+        views, errors = [], []
+
+        def decode(view):
+            # the record is not copied before decode
+            self.assertIs(view.obj, self.remote._shm.buf.obj)
+            views.append(view)
+            if view == b"invalid":
+                raise ValueError("invalid record")
+            return view.tobytes().upper()
+
+        self.assertEqual(reader.read_many(decode, errors.append), [b"HELLO", b"WORLD"])
+        self.assertEqual([str(error) for error in errors], ["invalid record"])
+        # the views are released once the records are decoded
+        for view in views:
+            with self.assertRaises(ValueError):
+                len(view)
+
+        self.ring.write_many([[b"invalid"], [b"again"]])
+        with self.assertRaises(ValueError):
+            reader.read_many(decode)
+        self.assertEqual(reader.read_many(decode), [b"AGAIN"])
+
+    def test_decoded_messages_do_not_reference_the_segment(self):
+        codecs = CodecRegistry()
+        reader = self.remote.reader()
+        self.ring.write_many([codecs.encode("c", pickle.PickleBuffer(b"A" * 64))])
+        message = reader.read_many(lambda view: codecs.decode("c", view, transient=True)[0])[0]
+
+        # the writer wraps around the ring and overwrites the record
+        for _ in range(4):
+            self.ring.write_many([[b"B" * 64]])
+            reader.read_many()
+        self.assertEqual(bytes(message), b"A" * 64)
+
+    def test_too_large_record_raises_error(self):
+        with self.assertRaises(ValueError):
+            self.ring.write_many([[b"x" * 256]])
+
+    def tearDown(self):
+        self.remote.close()
+        self.ring.close()
+
+
+class TestSharedMemoryChannel(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.hub = get_hub()
+        self.channel_name = f"shm-channel-{os.getpid()}"
+
+    def test_sender_with_wildcards_raises_error(self):
+        with self.assertRaises(ValueError):
+            SharedMemorySender("shm.*")
+
+    async def test_receiver_publishes_locally(self):
+        publisher = Publisher(self.channel_name)
+        received, local = [], []
+        local_subscriber = Subscriber(self.channel_name, local.append)
+        sender = SharedMemorySender(self.channel_name)
+        self.hub.reset()
+
+        receiver = SharedMemoryReceiver(self.channel_name)
+        subscriber = Subscriber(self.channel_name, received.append)
+        self.assertEqual(receiver.segment.name, segment_name(self.channel_name))
+        sender._forward([b"hello", "world"])
+        while len(received) < 2:
+            await asyncio.sleep(0.01)
+        self.assertEqual(received, [b"hello", "world"])
+        self.assertEqual(local, [])
+
+        receiver.close()
+        sender.close()
+        del publisher
+
+    async def test_cross_process_delivery(self):
+        messages = [b"x" * 1024, "hello", 42]
+        ctx = multiprocessing.get_context("spawn")
+        parent_conn, child_conn = ctx.Pipe()
+
+        local = []
+        publisher = Publisher(self.channel_name)
+        local_subscriber = Subscriber(self.channel_name, local.append)
+        sender = SharedMemorySender(self.channel_name)
+
+        process = ctx.Process(target=_receive, args=(self.channel_name, len(messages), child_conn))
+        process.start()
+        loop = asyncio.get_running_loop()
+        self.assertEqual(await loop.run_in_executor(None, parent_conn.recv), "ready")
+
+        await publisher.publish_many(messages)
+        received = await loop.run_in_executor(None, parent_conn.recv)
+        await loop.run_in_executor(None, process.join)
+
+        self.assertEqual(received, messages)
+        self.assertEqual(local, messages)
+        sender.close()
+
+    def tearDown(self):
+        self.hub.reset()
@@ -0,0 +1,87 @@
+# -*- coding : utf-8 -*-
+
+import asyncio
+import unittest
+
+from asyncpubsub import Publisher, Subscriber, get_hub
+from asyncpubsub.core.stats import Histogram
+
+
+async def _wait_for(predicate):
+    while not predicate():
+        await asyncio.sleep(0.01)
+
+
+class TestHistogram(unittest.TestCase):
+
+    def test_record(self):
+        histogram = Histogram(buckets=(1, 10, float('inf')))
+        for value in (0.5, 1, 5, 100):
+            histogram.record(value)
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot["counts"], (2, 1, 1))
+        self.assertEqual(snapshot["count"], 4)
+        self.assertEqual(snapshot["sum"], 106.5)
+
+
+class TestStats(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.hub = get_hub()
+
+    async def test_hub_stats_snapshot(self):
+        received = []
+        pub = Publisher("int-channel")
+        subs = [Subscriber("int-channel", received.append) for _ in range(2)]
+        pub.publish_many_nowait(range(10))
+        await asyncio.wait_for(_wait_for(lambda: len(received) == 20), timeout=3)
+
+        snapshot = self.hub.stats()
+        self.assertTrue(snapshot["enabled"])
+        pub_stats = snapshot["publishers"]["int-channel"]
+        self.assertEqual(pub_stats["published"], 10)
+        self.assertEqual(pub_stats["delivered"], 20)
+        self.assertEqual(pub_stats["queue_high_water"], 10)
+        self.assertEqual(pub_stats["subscribers"], 2)
+
+        sub_stats = snapshot["subscribers"]["int-channel"]
+        self.assertEqual(len(sub_stats), len(subs))
+        for stats in sub_stats:
+            self.assertEqual(stats["delivered"], 10)
+            self.assertEqual(stats["queue_high_water"], 10)
+            self.assertEqual(stats["queue_depth"], 0)
+            self.assertEqual(stats["callback_latency"]["count"], 10)
+
+    async def test_callback_errors_are_counted(self):
+        received = []
+
+        def callback(msg):
+            if msg % 2:
+                raise ValueError(msg)
+            received.append(msg)
+
+        pub = Publisher("int-channel")
+        sub = Subscriber("int-channel", callback)
+        pub.publish_many_nowait(range(10))
+        await asyncio.wait_for(_wait_for(lambda: sub.stats.callback_latency.count == 10), timeout=3)
+
+        self.assertEqual(received, [0, 2, 4, 6, 8])
+        self.assertEqual(sub.stats.errors, 5)
+        self.assertEqual(sub.stats.delivered, 5)
+
+    async def test_disabled_stats(self):
+        pub = Publisher("int-channel")
+        sub = Subscriber("int-channel", lambda msg: None)
+        self.hub.disable_stats()
+        try:
+            self.assertIsNone(pub.stats)
+            self.assertIsNone(sub.stats)
+            late_sub = Subscriber("int-channel", lambda msg: None)
+            self.assertIsNone(late_sub.stats)
+            self.assertEqual(self.hub.stats(), {"enabled": False, "publishers": {}, "subscribers": {}})
+        finally:
+            self.hub.enable_stats()
+        self.assertIsNotNone(late_sub.stats)
+
+    def tearDown(self):
+        self.hub.reset()
@@ -1,9 +1,13 @@
 # -*- coding : utf-8 -*-
 
+import asyncio
 import random
+import threading
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
-from asyncpubsub import Publisher, Subscriber, get_hub
+from asyncpubsub import Publisher, Subscriber, ExecutorKind, get_hub
 from asyncpubsub.test.support import TrackedSubscriber
 
 
@@ -44,5 +48,176 @@ class TestSubscriber(unittest.IsolatedAsyncioTestCase):
         await self.subscriber.wait_for_queue_empty()
         self.assertTrue(all(i == j for i, j in zip(messages, self.subscriber.notified_messages)))
 
+    async def test_subscriber_message_notify_many(self):
+        publisher = Publisher("int-channel")
+        messages = random.sample(range(100), random.randint(10, 20))
+        publisher.publish_many_nowait(messages)
+
+        while len(self.subscriber.notified_messages) != len(messages):
+            await asyncio.sleep(0.01)
+        self.assertEqual(messages, self.subscriber.notified_messages)
+
+    def test_subscriber_raises_error_for_callback_and_batch_callback(self):
+        with self.assertRaises(ValueError):
+            Subscriber("int-channel", lambda msg: None, batch_callback=lambda msgs: None)
+
+    def test_subscriber_raises_error_for_invalid_max_batch(self):
+        with self.assertRaises(ValueError):
+            Subscriber("int-channel", batch_callback=lambda msgs: None, max_batch=-1)
+
+    async def test_subscriber_batch_callback(self):
+        batches = []
+        subscriber = Subscriber("int-channel", batch_callback=batches.append, max_batch=4)
+        messages = list(range(10))
+        subscriber.notify_many(messages)
+        while sum(map(len, batches)) != len(messages):
+            await asyncio.sleep(0.01)
+        self.assertEqual(batches, [messages[:4], messages[4:8], messages[8:]])
+
+    async def test_subscriber_async_batch_callback(self):
+        batches = []
+
+        async def callback(msgs):
+            batches.append(msgs)
+
+        subscriber = Subscriber("int-channel", batch_callback=callback)
+        subscriber.notify_many(range(5))
+        while not batches:
+            await asyncio.sleep(0.01)
+        self.assertEqual(batches, [list(range(5))])
+
+    def test_set_callback_replaces_batch_callback(self):
+        subscriber = Subscriber("int-channel", batch_callback=lambda msgs: None)
+        subscriber.set_callback(print)
+        self.assertIs(subscriber._callback, print)
+        self.assertIsNone(subscriber._batch_callback)
+
+    def test_subscriber_raises_error_for_invalid_concurrency(self):
+        for concurrency in (0, -1, 1.5):
+            with self.assertRaises(ValueError):
+                Subscriber("int-channel", concurrency=concurrency)
+
+    async def test_concurrent_async_callbacks(self):
+        running, max_running, done = 0, 0, []
+
+        async def callback(msg):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+            done.append(msg)
+
+        subscriber = Subscriber("int-channel", callback, concurrency=4)
+        publisher = Publisher("int-channel")
+        publisher.publish_many_nowait(range(10))
+        while len(done) < 10:
+            await asyncio.sleep(0.01)
+        await subscriber.wait_in_flight()
+
+        self.assertEqual(sorted(done), list(range(10)))
+        self.assertEqual(max_running, 4)
+        self.assertEqual(subscriber.in_flight, 0)
+
+    async def test_concurrent_callbacks_are_ordered_per_key(self):
+        running, max_running, done = 0, 0, []
+
+        async def callback(msg):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(random.random() / 100)
+            running -= 1
+            done.append(msg)
+
+        subscriber = Subscriber("int-channel", callback, concurrency=8, ordering_key=lambda msg: msg[0])
+        publisher = Publisher("int-channel")
+        messages = [(key, i) for i in range(10) for key in "abc"]
+        publisher.publish_many_nowait(messages)
+        while len(done) < len(messages):
+            await asyncio.sleep(0.01)
+        await subscriber.wait_in_flight()
+
+        for key in "abc":
+            self.assertEqual([msg for msg in done if msg[0] == key], [msg for msg in messages if msg[0] == key])
+        self.assertEqual(max_running, 3)
+
+    def test_subscriber_raises_error_for_invalid_executor(self):
+        with self.assertRaises(TypeError):
+            Subscriber("int-channel", print, executor="thread")
+        with self.assertRaises(TypeError):
+            Subscriber("int-channel", print, on_result=1)
+
+    def test_executor_kinds_share_hub_executor(self):
+        self.assertIsNone(Subscriber("int-channel", print).executor)
+        subscriber = Subscriber("int-channel", print, executor=ExecutorKind.THREAD)
+        self.assertIs(subscriber.executor, self.hub.get_executor(ExecutorKind.THREAD))
+        self.assertIs(Subscriber("str-channel", print, executor=ExecutorKind.THREAD).executor, subscriber.executor)
+
+        executor = ThreadPoolExecutor(1)
+        self.hub.set_executor(ExecutorKind.THREAD, executor)
+        self.assertIs(Subscriber("int-channel", print, executor=ExecutorKind.THREAD).executor, executor)
+        executor.shutdown()
+
+    async def test_executor_results_are_delivered_in_order(self):
+        threads, results = set(), []
+
+        def callback(msg):
+            threads.add(threading.get_ident())
+            time.sleep(random.random() / 100)
+            return msg * 2
+
+        subscriber = Subscriber("int-channel", callback, concurrency=4,
+                                executor=ExecutorKind.THREAD, on_result=results.append)
+        publisher = Publisher("int-channel")
+        publisher.publish_many_nowait(range(20))
+        while len(results) < 20:
+            await asyncio.sleep(0.01)
+        await subscriber.wait_in_flight()
+
+        self.assertEqual(results, [msg * 2 for msg in range(20)])
+        self.assertNotIn(threading.get_ident(), threads)
+
+    def test_pull_subscriber_raises_error_for_callbacks(self):
+        with self.assertRaises(ValueError):
+            Subscriber("int-channel", lambda msg: None, pull=True)
+        with self.assertRaises(ValueError):
+            Subscriber("int-channel", pull=True).set_batch_callback(lambda msgs: None)
+        with self.assertRaises(RuntimeError):
+            self.subscriber.get_nowait()
+
+    async def test_pull_subscriber_iteration(self):
+        publisher = Publisher("int-channel")
+        subscriber = Subscriber("int-channel", pull=True)
+        publisher.publish_many_nowait(range(5))
+
+        received = []
+        async for message in subscriber:
+            received.append(message)
+            if message == 2:
+                break
+        self.assertEqual(received, [0, 1, 2])
+        self.assertEqual(await subscriber.get_many(), [3, 4])
+        with self.assertRaises(asyncio.TimeoutError):
+            await subscriber.get_many(timeout=0.01)
+
+        publisher.publish_many_nowait(range(5, 10))
+        self.assertEqual(await subscriber.get_many(max_n=3, timeout=0.1), [5, 6, 7])
+        self.assertEqual(await subscriber.get(), 8)
+
+    async def test_cancelled_pull_keeps_messages(self):
+        publisher = Publisher("int-channel", eager=True)
+        subscriber = Subscriber("int-channel", pull=True)
+        task = asyncio.ensure_future(subscriber.get())
+        await asyncio.sleep(0)
+        with self.assertRaises(RuntimeError):
+            await subscriber.get()
+        task.cancel()
+        await asyncio.sleep(0)
+        self.assertTrue(task.cancelled())
+
+        publisher.publish_nowait(1)
+        self.assertEqual(await subscriber.get(timeout=0.1), 1)
+
     def tearDown(self):
         self.hub.reset()
@@ -0,0 +1,54 @@
+# -*- coding : utf-8 -*-
+
+import unittest
+
+from asyncpubsub.core.topic import TopicTrie, is_pattern, matches, validate_pattern
+
+
+class TestTopic(unittest.TestCase):
+
+    def test_is_pattern(self):
+        self.assertTrue(is_pattern("orders.*.fills"))
+        self.assertTrue(is_pattern("orders.#"))
+        self.assertFalse(is_pattern("orders.eu.fills"))
+
+    def test_invalid_patterns_raise_error(self):
+        for pattern in ("orders.#.fills", "orders.eu*", "orders..fills", "orders.#eu"):
+            with self.assertRaises(ValueError):
+                validate_pattern(pattern)
+
+    def test_matches(self):
+        self.assertTrue(matches("orders.*.fills", "orders.eu.fills"))
+        self.assertFalse(matches("orders.*.fills", "orders.eu.us.fills"))
+        self.assertFalse(matches("orders.*", "orders"))
+        self.assertTrue(matches("orders.#", "orders"))
+        self.assertTrue(matches("orders.#", "orders.eu.fills"))
+        self.assertTrue(matches("#", "orders"))
+        self.assertFalse(matches("orders", "orders.eu"))
+
+
+class TestTopicTrie(unittest.TestCase):
+
+    def setUp(self):
+        self.trie = TopicTrie()
+        self.patterns = ["orders.*.fills", "orders.#", "*.eu.*", "#", "orders.eu.fills", "prices.*"]
+        for pattern in self.patterns:
+            self.trie.add(pattern, pattern)
+
+    def test_match_agrees_with_matches(self):
+        for channel_name in ("orders", "orders.eu", "orders.eu.fills", "prices.eu", "prices.eu.fills", "x.eu.y"):
+            expected = {p for p in self.patterns if matches(p, channel_name)}
+            self.assertEqual(self.trie.match(channel_name), expected)
+
+    def test_remove(self):
+        self.assertEqual(len(self.trie), len(self.patterns))
+        for pattern in self.patterns:
+            self.trie.remove(pattern, pattern)
+        self.assertEqual(len(self.trie), 0)
+        self.assertEqual(self.trie.match("orders.eu.fills"), set())
+        self.assertTrue(self.trie._root.is_empty())
+
+    def test_remove_missing_value_is_ignored(self):
+        self.trie.remove("orders.*.fills", "other")
+        self.trie.remove("unknown.pattern", "other")
+        self.assertEqual(len(self.trie), len(self.patterns))